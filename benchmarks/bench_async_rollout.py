@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Rollout env-steps/sec with policy inference in the loop: N envs under DummyVecEnv,
+# SubprocVecEnv and ThreadedVecEnv (all envs step together, as in PPO's collect_rollouts),
+# plus ThreadedVecEnv pipelined, where the policy runs on whichever envs finished their
+# step while the others keep simulating.
+import os
+import sys
+import time
+import argparse
+import torch
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.vec_env import ThreadedVecEnv, make_env
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET      = "intersection/environment.net.xml"
+SUMO_ROUTE    = "intersection/episode_routes.rou.xml"
+LOG_DIR       = "logs/bench_async_rollout/"
+ENV_COUNTS    = [1, 2, 4]
+STEPS_PER_ENV = 100
+MODES         = ["dummy", "subproc", "thread", "pipelined"]
+# ────────────────────────────────────────────────────────
+
+VEC_CLASSES = {"dummy": DummyVecEnv, "subproc": SubprocVecEnv, "thread": ThreadedVecEnv, "pipelined": ThreadedVecEnv}
+
+
+def _policy(env):
+    # An untrained PPO policy: inference cost is what matters, not the actions
+    return PPO("MlpPolicy", env, verbose=0, device="cpu", seed=0).policy
+
+
+def _act(policy, obs):
+    with torch.no_grad():
+        actions, _ = policy.predict(obs, deterministic=False)
+    return actions
+
+
+def measure(mode, n_envs, steps_per_env=STEPS_PER_ENV, max_steps=1000):
+    env_fns = [make_env(rank, LOG_DIR, net_file=SUMO_NET, route_file=SUMO_ROUTE,
+                        sumo_binary="sumo", use_gui=False, max_steps=max_steps,
+                        backend="traci", reset_mode="load")
+               for rank in range(n_envs)]
+    env = VEC_CLASSES[mode](env_fns)
+    try:
+        policy = _policy(env)
+        obs = env.reset()
+        total = n_envs * steps_per_env
+        start = time.perf_counter()
+        if mode == "pipelined":
+            env.send(_act(policy, obs))
+            sent = in_flight = n_envs
+            while in_flight:
+                ready, obs, _, _, _ = env.recv()
+                in_flight -= len(ready)
+                # keep stepping the ready envs until the step budget is used up
+                ready, obs = ready[:total - sent], obs[:total - sent]
+                if len(ready):
+                    env.send(_act(policy, obs), ready)
+                    sent += len(ready)
+                    in_flight += len(ready)
+        else:
+            for _ in range(steps_per_env):
+                obs, _, _, _ = env.step(_act(policy, obs))
+        elapsed = time.perf_counter() - start
+        return total / elapsed
+    finally:
+        env.close()
+
+
+def run(env_counts=ENV_COUNTS, steps_per_env=STEPS_PER_ENV, modes=MODES):
+    results = {}
+    for n in env_counts:
+        results[n] = {mode: measure(mode, n, steps_per_env) for mode in modes}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--envs", type=int, nargs="+", default=ENV_COUNTS)
+    parser.add_argument("--steps", type=int, default=STEPS_PER_ENV)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    results = run(args.envs, args.steps, args.modes)
+    print("\nRollout env-steps/s (policy inference included)")
+    print(f"{'envs':>5} " + " ".join(f"{mode:>10}" for mode in args.modes))
+    for n, r in results.items():
+        print(f"{n:>5} " + " ".join(f"{r[mode]:>10.1f}" for mode in args.modes))
+    print(f"(cpu count: {os.cpu_count()})")
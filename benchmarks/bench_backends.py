@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Wall-clock per episode for the TraCI (socket) and libsumo (in-process) backends.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv, libsumo
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_backends/"
+EPISODES   = 5
+MAX_STEPS  = 1000
+# ────────────────────────────────────────────────────────
+
+def measure(backend, episodes=EPISODES):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=SUMO_ROUTE,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend
+    )
+    # Same action sequence for both backends so the episodes are comparable
+    rng = np.random.default_rng(0)
+    durations, rewards = [], []
+    try:
+        for _ in range(episodes):
+            start = time.perf_counter()
+            env.reset()
+            done, total = False, 0.0
+            while not done:
+                _, reward, done, _, _ = env.step(int(rng.integers(env.action_space.n)))
+                total += reward
+            durations.append(time.perf_counter() - start)
+            rewards.append(total)
+    finally:
+        env.close()
+    return {"mean_s": float(np.mean(durations)), "std_s": float(np.std(durations)), "rewards": rewards}
+
+
+def run(episodes=EPISODES):
+    backends = ["traci"] + (["libsumo"] if libsumo is not None else [])
+    return {backend: measure(backend, episodes) for backend in backends}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    args = parser.parse_args()
+
+    results = run(args.episodes)
+    print(f"\n{'backend':>8} {'s/episode':>10} {'± std':>8}")
+    for backend, r in results.items():
+        print(f"{backend:>8} {r['mean_s']:>10.3f} {r['std_s']:>8.3f}")
+    if "libsumo" in results:
+        print(f"libsumo speedup: {results['traci']['mean_s'] / results['libsumo']['mean_s']:.2f}x")
+        if results["traci"]["rewards"] != results["libsumo"]["rewards"]:
+            print("⚠️  Episode rewards differ between backends")
+    else:
+        print("libsumo not installed, only TraCI measured")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Agent-steps/sec with per-second stepping (one RPC per simulated second) vs fast-forward
+# stepping (one simulationStep(targetTime) per phase). Both modes must see the same episode.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_fast_forward/"
+EPISODES   = 3
+MAX_STEPS  = 1000
+# ────────────────────────────────────────────────────────
+
+def measure(per_second_stats, episodes=EPISODES, backend="traci", route_file=SUMO_ROUTE):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=route_file,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend,
+        use_subscriptions=True,
+        per_second_stats=per_second_stats
+    )
+    rng = np.random.default_rng(0)
+    steps, elapsed, rewards = 0, 0.0, []
+    try:
+        for _ in range(episodes):
+            env.reset()
+            done = False
+            while not done:
+                action = int(rng.integers(env.action_space.n))
+                start = time.perf_counter()
+                _, reward, done, _, _ = env.step(action)
+                elapsed += time.perf_counter() - start
+                rewards.append(reward)
+                steps += 1
+    finally:
+        env.close()
+    return {"steps_per_s": steps / elapsed, "rewards": rewards}
+
+
+def run(episodes=EPISODES, backend="traci", route_file=SUMO_ROUTE):
+    per_second = measure(True, episodes, backend, route_file)
+    fast = measure(False, episodes, backend, route_file)
+    assert per_second["rewards"] == fast["rewards"], "fast-forward changed the episode"
+    return {"per_second": per_second["steps_per_s"], "fast_forward": fast["steps_per_s"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--route", type=str, default=SUMO_ROUTE)
+    args = parser.parse_args()
+
+    results = run(args.episodes, args.backend, args.route)
+    print(f"\n[{args.backend}] identical rewards in both modes")
+    print(f"  per-second   : {results['per_second']:.1f} agent-steps/s")
+    print(f"  fast-forward : {results['fast_forward']:.1f} agent-steps/s")
+    print(f"  speedup      : {results['fast_forward'] / results['per_second']:.2f}x")
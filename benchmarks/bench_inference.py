@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Benchmark: per-decision policy latency for one-observation-at-a-time SB3 predict vs a
+# single batched predict over K envs, and the same for the NumPy export.
+import os
+import sys
+import time
+import tempfile
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.numpy_policy import NumpyPolicy, export_policy
+
+# ─── Configuration ─────────────────────────────────────
+BATCH_SIZES = [1, 8, 64]
+N_DECISIONS = 2048
+# ────────────────────────────────────────────────────────
+
+
+def _make_model(model_path=None):
+    import gymnasium as gym
+    from stable_baselines3 import PPO
+    if model_path:
+        return PPO.load(model_path, device="cpu")
+
+    class _Spaces(gym.Env):
+        # same spaces as SingleAgentCrosswalkEnv, no SUMO needed
+        observation_space = gym.spaces.Box(low=0, high=100, shape=(12,), dtype=np.float32)
+        action_space = gym.spaces.Discrete(4)
+    return PPO("MlpPolicy", _Spaces(), device="cpu", seed=0)
+
+
+def _time_per_decision(predict, obs, batch):
+    start = time.perf_counter()
+    for i in range(0, len(obs), batch):
+        predict(obs[i:i + batch] if batch > 1 else obs[i])
+    return (time.perf_counter() - start) / len(obs)
+
+
+def run(batch_sizes=BATCH_SIZES, n_decisions=N_DECISIONS, model_path=None):
+    model = _make_model(model_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        np_policy = NumpyPolicy.load(export_policy(model, os.path.join(tmp, "policy.npz")))
+
+    rng = np.random.default_rng(0)
+    obs = rng.uniform(0, 100, size=(n_decisions, 12)).astype(np.float32)
+    torch_actions, _ = model.predict(obs, deterministic=True)
+    numpy_actions, _ = np_policy.predict(obs)
+    assert np.array_equal(torch_actions, numpy_actions), "NumPy export disagrees with SB3"
+
+    results = {}
+    for batch in batch_sizes:
+        t_sb3 = _time_per_decision(lambda o: model.predict(o, deterministic=True), obs, batch)
+        t_np = _time_per_decision(np_policy.predict, obs, batch)
+        results[batch] = {
+            "sb3_us": t_sb3 * 1e6, "sb3_per_s": 1 / t_sb3,
+            "numpy_us": t_np * 1e6, "numpy_per_s": 1 / t_np,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--decisions", type=int, default=N_DECISIONS)
+    parser.add_argument("--model", type=str, default=None, help="trained .zip (default: untrained MlpPolicy)")
+    args = parser.parse_args()
+
+    results = run(args.batch, args.decisions, args.model)
+    print(f"\n{'batch':>6} {'SB3 µs/dec':>11} {'SB3 dec/s':>11} {'NumPy µs/dec':>13} {'NumPy dec/s':>12}")
+    for batch, r in results.items():
+        print(f"{batch:>6} {r['sb3_us']:>11.1f} {r['sb3_per_s']:>11.0f} "
+              f"{r['numpy_us']:>13.2f} {r['numpy_per_s']:>12.0f}")
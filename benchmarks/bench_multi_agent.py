@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Benchmark: MultiAgentCrosswalkEnv decisions/sec against the number of intersections. Builds
+# k x k traffic-light grids with sidewalks and crossings (netgenerate) plus random vehicle and
+# pedestrian trips at a fixed density per lane-km (randomTrips.py), then runs one episode per
+# grid with a shared policy: one batched predict() per tick for all ready intersections.
+import os
+import sys
+import time
+import tempfile
+import argparse
+import subprocess
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.multi_agent_crosswalk_env import MultiAgentCrosswalkEnv
+
+# ─── Configuration ─────────────────────────────────────
+GRID_SIZES = [1, 2, 4, 6, 8]      # k x k intersections; 8 x 8 = 64
+MAX_STEPS  = 1000
+DENSITY    = 60                   # trips per hour and km of lane, vehicles and pedestrians each
+LOG_DIR    = "logs/bench_multi_agent/"
+# ────────────────────────────────────────────────────────
+
+
+def _random_trips():
+    from sumo import SUMO_HOME
+    return os.path.join(SUMO_HOME, "tools", "randomTrips.py")
+
+
+def build_grid(k, out_dir, seed=0, density=DENSITY, end=MAX_STEPS):
+    net = os.path.join(out_dir, f"grid{k}.net.xml")
+    veh = os.path.join(out_dir, f"grid{k}_veh.rou.xml")
+    ped = os.path.join(out_dir, f"grid{k}_ped.rou.xml")
+    # run inside out_dir: randomTrips.py leaves intermediate files in the working directory
+    quiet = {"check": True, "cwd": out_dir, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    subprocess.run(["netgenerate", "--grid", "--grid.number", str(max(k, 2)),
+                    "-j", "traffic_light", "--sidewalks.guess", "--crossings.guess",
+                    "--walkingareas", "--seed", str(seed), "-o", net], **quiet)
+    trips = [sys.executable, _random_trips(), "-n", net, "-e", str(end), "--seed", str(seed),
+             "--insertion-density", str(density)]
+    subprocess.run(trips + ["-o", veh, "--prefix", "v"], **quiet)
+    subprocess.run(trips + ["-o", ped, "--prefix", "p", "--pedestrians"], **quiet)
+    return net, f"{veh},{ped}"
+
+
+def _make_policy(env, numpy_policy):
+    import gymnasium as gym
+    from stable_baselines3 import PPO
+
+    class _Spaces(gym.Env):
+        # the env's per-agent spaces, no SUMO needed
+        observation_space = env.observation_space(env.possible_agents[0])
+        action_space = env.action_space(env.possible_agents[0])
+    model = PPO("MlpPolicy", _Spaces(), device="cpu", seed=0)
+    if not numpy_policy:
+        return model
+    from utils.numpy_policy import NumpyPolicy, export_policy
+    with tempfile.TemporaryDirectory() as tmp:
+        return NumpyPolicy.load(export_policy(model, os.path.join(tmp, "policy.npz")))
+
+
+def measure(net, routes, max_steps=MAX_STEPS, backend="traci", numpy_policy=False, tl_ids=None):
+    env = MultiAgentCrosswalkEnv(
+        net_file=net,
+        route_file=routes,
+        use_gui=False,
+        max_steps=max_steps,
+        log_dir=LOG_DIR,
+        backend=backend,
+        tl_ids=tl_ids,
+    )
+    policy = _make_policy(env, numpy_policy)
+    try:
+        obs = env.reset_batch(seed=0)
+        ready = np.ones(len(env.possible_agents), dtype=bool)
+        ticks, forward_s, done = 0, 0.0, False
+        start = time.perf_counter()
+        while not done:
+            t = time.perf_counter()
+            actions = np.zeros(len(ready), dtype=np.int64)
+            actions[ready] = policy.predict(obs[ready], deterministic=True)[0]
+            forward_s += time.perf_counter() - t
+            obs, _, done, ready = env.step_batch(actions)
+            ticks += 1
+        wall = time.perf_counter() - start
+    finally:
+        env.close()
+    return {
+        "intersections": len(env.possible_agents),
+        "ticks": ticks,
+        "decisions": env.decisions,
+        "decisions_per_s": env.decisions / wall,
+        "sim_s_per_s": (env.sim_time - env.start_time) / wall,
+        "forward_us_per_tick": forward_s / ticks * 1e6,
+        "episode_s": wall,
+    }
+
+
+def run(grid_sizes=GRID_SIZES, max_steps=MAX_STEPS, backend="traci", numpy_policy=False):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for k in grid_sizes:
+            net, routes = build_grid(k, tmp, end=max_steps)
+            # netgenerate needs k >= 2: k = 1 controls light A0 of a 2 x 2 grid, the
+            # other three keep running their fixed-time program
+            tl_ids = ["A0"] if k == 1 else None
+            results[k] = measure(net, routes, max_steps, backend, numpy_policy, tl_ids)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=GRID_SIZES)
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--numpy", action="store_true", help="NumPy export instead of SB3 predict")
+    args = parser.parse_args()
+
+    results = run(args.grid_sizes, args.max_steps, args.backend, args.numpy)
+    print(f"\n[{args.backend}, {'numpy' if args.numpy else 'sb3'} policy, {args.max_steps} sim s]")
+    print(f"{'grid':>5} {'agents':>6} {'ticks':>6} {'decisions':>9} {'decisions/s':>11} "
+          f"{'sim s/s':>8} {'fwd µs/tick':>11} {'episode s':>9}")
+    for k, r in results.items():
+        print(f"{k:>3}x{k:<1} {r['intersections']:>6} {r['ticks']:>6} {r['decisions']:>9} "
+              f"{r['decisions_per_s']:>11.1f} {r['sim_s_per_s']:>8.1f} "
+              f"{r['forward_us_per_tick']:>11.1f} {r['episode_s']:>9.2f}")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Observation and reward cost per agent step as pedestrian demand grows. Scenarios come
+# from the route cache (generated once), timings from the env's stage profiler.
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from generator.scenario_cache import get_routefile
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET      = "intersection/environment.net.xml"
+LOG_DIR       = "logs/bench_obs_reward/"
+PEDS_PER_HOUR = [300, 1500, 6000]
+EPISODES      = 2
+MAX_STEPS     = 1000
+# ────────────────────────────────────────────────────────
+
+def measure(route_file, episodes=EPISODES, backend="traci"):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=route_file,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend,
+        reset_mode="load",
+        use_subscriptions=True,
+        profile=True
+    )
+    rng = np.random.default_rng(0)
+    live_peds = []
+    try:
+        for _ in range(episodes):
+            env.reset()
+            done = False
+            while not done:
+                _, _, done, _, _ = env.step(int(rng.integers(env.action_space.n)))
+                live_peds.append(env.persons.size)
+    finally:
+        env.close()
+    stages = env.profile_summary()["stages"]
+    return {
+        "mean_peds": float(np.mean(live_peds)),
+        "max_peds": int(np.max(live_peds)),
+        "observe_us": stages["observe"]["mean_us"],
+        "reward_us": stages["reward"]["mean_us"],
+    }
+
+
+def run(peds_per_hour=PEDS_PER_HOUR, episodes=EPISODES, backend="traci"):
+    cache_dir = tempfile.mkdtemp(prefix="obs_reward_")
+    try:
+        return {
+            pph: measure(get_routefile(cache_dir, max_steps=MAX_STEPS, peds_per_hour=pph),
+                         episodes, backend)
+            for pph in peds_per_hour
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peds-per-hour", type=int, nargs="+", default=PEDS_PER_HOUR)
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    args = parser.parse_args()
+
+    results = run(args.peds_per_hour, args.episodes, args.backend)
+    print(f"\n[{args.backend}]")
+    print(f"{'peds/h':>7} {'mean peds':>10} {'max peds':>9} {'observe µs':>11} {'reward µs':>10}")
+    for pph, r in results.items():
+        print(f"{pph:>7} {r['mean_peds']:>10.1f} {r['max_peds']:>9} {r['observe_us']:>11.1f} "
+              f"{r['reward_us']:>10.1f}")
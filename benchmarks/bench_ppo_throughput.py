@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# End-to-end PPO env-steps/sec (rollouts + updates): N envs stepped in-process by
+# DummyVecEnv vs N SUMO worker processes under SubprocVecEnv vs N worker threads under
+# ThreadedVecEnv (TraCI only).
+import os
+import sys
+import time
+import argparse
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.vec_env import ThreadedVecEnv, make_env
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET    = "intersection/environment.net.xml"
+SUMO_ROUTE  = "intersection/episode_routes.rou.xml"
+LOG_DIR     = "logs/bench_ppo_throughput/"
+ENV_COUNTS  = [1, 2, 4]
+TIMESTEPS   = 1000
+# ────────────────────────────────────────────────────────
+
+def measure(vec_cls, n_envs, timesteps=TIMESTEPS, backend="traci"):
+    env_fns = [make_env(rank, LOG_DIR, net_file=SUMO_NET, route_file=SUMO_ROUTE,
+                        sumo_binary="sumo", use_gui=False, max_steps=1000,
+                        backend=backend, reset_mode="load")
+               for rank in range(n_envs)]
+    env = vec_cls(env_fns)
+    try:
+        model = PPO("MlpPolicy", env, verbose=0, device="cpu", seed=0,
+                    n_steps=max(timesteps // (2 * n_envs), 1), batch_size=250, learning_rate=1e-4)
+        start = time.perf_counter()
+        model.learn(total_timesteps=timesteps)
+        elapsed = time.perf_counter() - start
+        return model.num_timesteps / elapsed
+    finally:
+        env.close()
+
+
+def run(env_counts=ENV_COUNTS, timesteps=TIMESTEPS, backend="traci"):
+    results = {}
+    for n in env_counts:
+        results[n] = {}
+        # libsumo is one simulation per process, so it cannot run several envs in-process
+        if n == 1 or backend != "libsumo":
+            results[n]["dummy"] = measure(DummyVecEnv, n, timesteps, backend)
+        if n > 1:
+            results[n]["subproc"] = measure(SubprocVecEnv, n, timesteps, backend)
+        if n > 1 and backend != "libsumo":
+            results[n]["thread"] = measure(ThreadedVecEnv, n, timesteps, backend)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--envs", type=int, nargs="+", default=ENV_COUNTS)
+    parser.add_argument("--timesteps", type=int, default=TIMESTEPS)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    args = parser.parse_args()
+
+    results = run(args.envs, args.timesteps, args.backend)
+    print(f"\n[{args.backend}] PPO env-steps/s")
+    print(f"{'envs':>5} {'DummyVecEnv':>12} {'SubprocVecEnv':>14} {'ThreadedVecEnv':>15}")
+    for n, r in results.items():
+        dummy = f"{r['dummy']:.1f}" if "dummy" in r else "-"
+        subproc = f"{r['subproc']:.1f}" if "subproc" in r else "-"
+        thread = f"{r['thread']:.1f}" if "thread" in r else "-"
+        print(f"{n:>5} {dummy:>12} {subproc:>14} {thread:>15}")
+    print(f"(cpu count: {os.cpu_count()})")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# reset() latency when relaunching SUMO every episode vs reloading it in place with traci.load.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import RESET_MODES, SingleAgentCrosswalkEnv
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_reset/"
+RESETS     = 10
+MAX_STEPS  = 1000
+# ────────────────────────────────────────────────────────
+
+def measure(reset_mode, resets=RESETS, backend="traci"):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=SUMO_ROUTE,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend,
+        reset_mode=reset_mode
+    )
+    latencies, rewards = [], []
+    try:
+        for _ in range(resets):
+            start = time.perf_counter()
+            env.reset()
+            latencies.append(time.perf_counter() - start)
+            # play a short fixed episode so every reset starts from a used simulation
+            rng = np.random.default_rng(0)
+            total = 0.0
+            for _ in range(5):
+                total += env.step(int(rng.integers(env.action_space.n)))[1]
+            rewards.append(total)
+    finally:
+        env.close()
+    # the first reset always launches SUMO, report it separately
+    return {"first_s": latencies[0], "mean_s": float(np.mean(latencies[1:])), "rewards": rewards}
+
+
+def run(resets=RESETS, backend="traci"):
+    results = {mode: measure(mode, resets, backend) for mode in RESET_MODES}
+    reference = results["restart"]["rewards"]
+    for mode, r in results.items():
+        assert r["rewards"] == reference, f"{mode} reset produced a different episode"
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resets", type=int, default=RESETS)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    args = parser.parse_args()
+
+    results = run(args.resets, args.backend)
+    print(f"\n[{args.backend}] identical episodes after every reset")
+    print(f"{'mode':>8} {'first ms':>9} {'reset ms':>9}")
+    for mode, r in results.items():
+        print(f"{mode:>8} {r['first_s'] * 1e3:>9.1f} {r['mean_s'] * 1e3:>9.1f}")
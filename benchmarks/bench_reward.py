@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Micro-benchmark: per-pedestrian Python reward loop vs the vectorized reward engine.
+import os
+import sys
+import timeit
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.reward import FRUSTRATION_LIMIT, compute_reward
+
+# ─── Configuration ─────────────────────────────────────
+PED_COUNTS = [10, 100, 1000]
+ALPHA, GAMMA = 0.05, 0.1
+PED_WEIGHT, VEH_WEIGHT = 0.5, 0.5
+REPEATS = 2000
+# ────────────────────────────────────────────────────────
+
+def loop_reward(ped_waits, veh_delays):
+    # The generator-based formulation the env used before the reward engine
+    total_ped_wait = sum(w for w in ped_waits)
+    total_veh_delay = sum(d for d in veh_delays)
+    total_frustration = sum(
+        min(np.exp(ALPHA * (w - 60)), FRUSTRATION_LIMIT)
+        for w in ped_waits
+        if w > 60
+    )
+    return -(PED_WEIGHT * total_ped_wait + VEH_WEIGHT * total_veh_delay + GAMMA * total_frustration)
+
+
+def run(ped_counts=PED_COUNTS, repeats=REPEATS):
+    rng = np.random.default_rng(0)
+    veh_delays = rng.uniform(0, 300, size=4)
+    results = {}
+    for n in ped_counts:
+        ped_waits = np.floor(rng.exponential(45, size=n))
+        as_list = ped_waits.tolist()
+        ref = loop_reward(as_list, veh_delays.tolist())
+        vec = compute_reward(ped_waits, veh_delays, ALPHA, GAMMA, PED_WEIGHT, VEH_WEIGHT)
+        assert np.isclose(ref, vec, rtol=1e-12), (n, ref, vec)
+
+        t_loop = timeit.timeit(lambda: loop_reward(as_list, veh_delays), number=repeats) / repeats
+        t_vec = timeit.timeit(
+            lambda: compute_reward(ped_waits, veh_delays, ALPHA, GAMMA, PED_WEIGHT, VEH_WEIGHT),
+            number=repeats) / repeats
+        results[n] = {"loop_us": t_loop * 1e6, "vectorized_us": t_vec * 1e6}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peds", type=int, nargs="+", default=PED_COUNTS)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    results = run(args.peds, args.repeats)
+    print(f"\n{'peds':>6} {'loop µs':>10} {'numpy µs':>10} {'speedup':>8}")
+    for n, r in results.items():
+        print(f"{n:>6} {r['loop_us']:>10.1f} {r['vectorized_us']:>10.1f} "
+              f"{r['loop_us'] / r['vectorized_us']:>7.1f}x")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Route generation throughput and peak memory for 1k / 100k / 1M trips, plus cache-hit latency.
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "generator")))
+from scenario_cache import get_routefile
+
+# ─── Configuration ─────────────────────────────────────
+TRIP_COUNTS   = [1_000, 100_000, 1_000_000]
+VEHS_PER_HOUR = 600
+PEDS_PER_HOUR = 300
+# ────────────────────────────────────────────────────────
+
+def measure(trips, cache_dir):
+    # pick a horizon that yields the requested number of trips at the default demand
+    max_steps = int(round(trips * 3600 / (VEHS_PER_HOUR + PEDS_PER_HOUR)))
+    params = dict(max_steps=max_steps, vehs_per_hour=VEHS_PER_HOUR, peds_per_hour=PEDS_PER_HOUR)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = get_routefile(cache_dir, **params)
+    generate_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    get_routefile(cache_dir, **params)
+    hit_s = time.perf_counter() - start
+
+    return {
+        "generate_s": generate_s,
+        "trips_per_s": trips / generate_s,
+        "peak_mb": peak / 2**20,
+        "file_mb": os.path.getsize(path) / 2**20,
+        "cache_hit_ms": hit_s * 1e3,
+    }
+
+
+def run(trip_counts=TRIP_COUNTS):
+    cache_dir = tempfile.mkdtemp(prefix="route_cache_")
+    try:
+        return {n: measure(n, cache_dir) for n in trip_counts}
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trips", type=int, nargs="+", default=TRIP_COUNTS)
+    args = parser.parse_args()
+
+    results = run(args.trips)
+    print(f"\n{'trips':>10} {'gen s':>8} {'trips/s':>10} {'peak MB':>8} {'file MB':>8} {'hit ms':>7}")
+    for n, r in results.items():
+        print(f"{n:>10} {r['generate_s']:>8.2f} {r['trips_per_s']:>10.0f} {r['peak_mb']:>8.1f} "
+              f"{r['file_mb']:>8.1f} {r['cache_hit_ms']:>7.2f}")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# SUMO startup cost across SimConfig settings: cold start (first reset launches SUMO),
+# in-place reload (reset_mode="load") and the wall time of one fixed random episode.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from env.sim_config import SimConfig
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_startup/"
+RESETS     = 5
+MAX_STEPS  = 1000
+CONFIGS = {
+    "default": {},
+    "no_logs": {"write_logs": False},
+    "threads_2": {"threads": 2},
+    "step_0.5": {"step_length": 0.5},
+    "step_2": {"step_length": 2.0},
+}
+# ────────────────────────────────────────────────────────
+
+def measure(config, resets=RESETS, backend="traci"):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=SUMO_ROUTE,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend,
+        reset_mode="load",
+        sim_config=SimConfig(**config)
+    )
+    rng = np.random.default_rng(0)
+    cold, reloads, episodes = None, [], []
+    try:
+        for i in range(resets):
+            start = time.perf_counter()
+            env.reset()
+            elapsed = time.perf_counter() - start
+            if i == 0:
+                cold = elapsed
+            else:
+                reloads.append(elapsed)
+            done, start = False, time.perf_counter()
+            while not done:
+                _, _, done, _, _ = env.step(int(rng.integers(env.action_space.n)))
+            episodes.append(time.perf_counter() - start)
+    finally:
+        env.close()
+    return {
+        "cold_start_ms": cold * 1e3,
+        "reload_ms": float(np.mean(reloads)) * 1e3 if reloads else float("nan"),
+        "episode_s": float(np.mean(episodes)),
+    }
+
+
+def run(configs=CONFIGS, resets=RESETS, backend="traci"):
+    return {name: measure(config, resets, backend) for name, config in configs.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--resets", type=int, default=RESETS)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    args = parser.parse_args()
+
+    results = run({name: CONFIGS[name] for name in args.configs}, args.resets, args.backend)
+    print(f"\n[{args.backend}]")
+    print(f"{'config':<10} {'cold ms':>8} {'reload ms':>10} {'episode s':>10}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['cold_start_ms']:>8.1f} {r['reload_ms']:>10.1f} {r['episode_s']:>10.3f}")
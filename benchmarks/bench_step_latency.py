@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# step() latency per action, split by whether the step first had to play the yellow/red
+# transition_after sequence of the previous action (e.g. action 0 -> phases 1, 2 first).
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_step_latency/"
+EPISODES   = 3
+MAX_STEPS  = 1000
+# ────────────────────────────────────────────────────────
+
+def run(episodes=EPISODES, backend="traci", route_file=SUMO_ROUTE):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=route_file,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=LOG_DIR,
+        backend=backend,
+        reset_mode="load"
+    )
+    rng = np.random.default_rng(0)
+    samples = {}   # (action, transition played) -> [(seconds, simulated seconds)]
+    try:
+        for _ in range(episodes):
+            env.reset()
+            done = False
+            while not done:
+                action = int(rng.integers(env.action_space.n))
+                transition = env.last_agent_phase in env.transition_after
+                sim_before = env.sim_time
+                start = time.perf_counter()
+                _, _, done, _, _ = env.step(action)
+                elapsed = time.perf_counter() - start
+                samples.setdefault((action, transition), []).append((elapsed, env.sim_time - sim_before))
+    finally:
+        env.close()
+
+    results = {}
+    for (action, transition), values in sorted(samples.items()):
+        elapsed, sim_seconds = np.array(values).T
+        results[f"a{action}" + ("_transition" if transition else "")] = {
+            "steps": len(values),
+            "mean_ms": float(elapsed.mean() * 1e3),
+            "p95_ms": float(np.percentile(elapsed, 95) * 1e3),
+            "sim_seconds": float(sim_seconds.mean()),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--route", type=str, default=SUMO_ROUTE)
+    args = parser.parse_args()
+
+    results = run(args.episodes, args.backend, args.route)
+    print(f"\n[{args.backend}]")
+    print(f"{'step':<16} {'steps':>6} {'mean ms':>8} {'p95 ms':>8} {'sim s':>6}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['steps']:>6} {r['mean_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['sim_seconds']:>6.1f}")
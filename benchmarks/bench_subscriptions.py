@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Runs a polling env and a subscription env in lockstep on the same actions, asserts their
+# observations and rewards are bit-identical, and reports the time spent per agent step.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_subscriptions/"
+EPISODES   = 3
+MAX_STEPS  = 1000
+# ────────────────────────────────────────────────────────
+
+def make(use_subscriptions, route_file=SUMO_ROUTE):
+    return SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=route_file,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        alpha=0.05,
+        gamma=0.1,
+        log_dir=LOG_DIR,
+        use_subscriptions=use_subscriptions
+    )
+
+
+def timed_step(env, action):
+    start = time.perf_counter()
+    result = env.step(action)
+    return result, time.perf_counter() - start
+
+
+def run(episodes=EPISODES, route_file=SUMO_ROUTE):
+    polling, subscribed = make(False, route_file), make(True, route_file)
+    rng = np.random.default_rng(0)
+    times = {"polling": [], "subscriptions": []}
+    steps = 0
+    try:
+        for _ in range(episodes):
+            obs_p, _ = polling.reset()
+            obs_s, _ = subscribed.reset()
+            assert np.array_equal(obs_p, obs_s), f"reset obs differ: {obs_p} vs {obs_s}"
+            done = False
+            while not done:
+                action = int(rng.integers(polling.action_space.n))
+                (obs_p, r_p, done, _, _), t_p = timed_step(polling, action)
+                (obs_s, r_s, done_s, _, _), t_s = timed_step(subscribed, action)
+                times["polling"].append(t_p)
+                times["subscriptions"].append(t_s)
+                steps += 1
+                assert np.array_equal(obs_p, obs_s), f"step {steps} obs differ: {obs_p} vs {obs_s}"
+                assert r_p == r_s, f"step {steps} reward differ: {r_p!r} vs {r_s!r}"
+                assert done == done_s
+    finally:
+        polling.close()
+        subscribed.close()
+    return {"steps": steps, **{k: float(np.mean(v)) for k, v in times.items()}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--route", type=str, default=SUMO_ROUTE)
+    args = parser.parse_args()
+
+    results = run(args.episodes, args.route)
+    print(f"\n✅ {results['steps']} agent steps: observations and rewards bit-identical")
+    print(f"  polling       : {results['polling'] * 1e3:.2f} ms/step")
+    print(f"  subscriptions : {results['subscriptions'] * 1e3:.2f} ms/step")
+    print(f"  speedup       : {results['polling'] / results['subscriptions']:.2f}x")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Per-step cost of telemetry=True (reward breakdown + counters in info, ring-buffer recorder)
+# vs telemetry=False. Rounds alternate between the two envs so drift hits both equally;
+# both must see the same episode.
+#
+# With telemetry=False the step is the pre-telemetry step plus DISABLED_CHECKS
+# `if self.telemetry` tests, so that difference is timed on its own (too small for an
+# episode A/B to resolve) and must stay under MAX_DISABLED_OVERHEAD of a step.
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from utils.telemetry import TELEMETRY_FIELDS, TelemetryRecorder
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_DIR    = "logs/bench_telemetry/"
+ROUNDS     = 5
+MAX_STEPS  = 1000
+DISABLED_CHECKS       = 3       # two in step(), one in _compute_reward()
+MAX_DISABLED_OVERHEAD = 0.001   # fraction of a telemetry-off step
+# ────────────────────────────────────────────────────────
+
+def _episode(env, seed=0):
+    rng = np.random.default_rng(seed)
+    env.reset()
+    done, steps, elapsed, rewards = False, 0, 0.0, []
+    while not done:
+        action = int(rng.integers(env.action_space.n))
+        start = time.perf_counter()
+        _, reward, done, _, _ = env.step(action)
+        elapsed += time.perf_counter() - start
+        rewards.append(reward)
+        steps += 1
+    return elapsed / steps, rewards
+
+
+def record_cost(repeats=100_000):
+    recorder = TelemetryRecorder()
+    row = {f: 1.0 for f in TELEMETRY_FIELDS}
+    start = time.perf_counter()
+    for _ in range(repeats):
+        recorder.record(row)
+    return (time.perf_counter() - start) / repeats
+
+
+def disabled_cost(env, repeats=1_000_000):
+    # Per-step time of the disabled path's branches, net of the loop itself
+    def checks():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            if env.telemetry:
+                pass
+        return time.perf_counter() - start
+
+    def loop():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            pass
+        return time.perf_counter() - start
+    return max(min(checks() for _ in range(3)) - min(loop() for _ in range(3)), 0.0) / repeats * DISABLED_CHECKS
+
+
+def run(rounds=ROUNDS, backend="traci", route_file=SUMO_ROUTE):
+    envs = {
+        enabled: SingleAgentCrosswalkEnv(
+            net_file=SUMO_NET,
+            route_file=route_file,
+            sumo_binary="sumo",
+            use_gui=False,
+            max_steps=MAX_STEPS,
+            log_dir=LOG_DIR,
+            backend=backend,
+            reset_mode="load",
+            telemetry=enabled
+        )
+        for enabled in (False, True)
+    }
+    times = {False: [], True: []}
+    try:
+        for _ in range(rounds):
+            rewards = {}
+            for enabled, env in envs.items():
+                per_step, rewards[enabled] = _episode(env)
+                times[enabled].append(per_step)
+            assert rewards[False] == rewards[True], "telemetry changed the episode"
+    finally:
+        for env in envs.values():
+            env.close()
+    off, on = np.median(times[False]), np.median(times[True])
+    disabled = disabled_cost(envs[False])
+    assert disabled / off <= MAX_DISABLED_OVERHEAD, \
+        f"disabled telemetry costs {disabled * 1e6:.3f} µs/step, over {MAX_DISABLED_OVERHEAD:.1%} of a step"
+    return {"off_us": off * 1e6, "on_us": on * 1e6, "record_us": record_cost() * 1e6,
+            "disabled_us": disabled * 1e6, "disabled_overhead": disabled / off}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--route", type=str, default=SUMO_ROUTE)
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.backend, args.route)
+    print(f"\n[{args.backend}] identical rewards with and without telemetry")
+    print(f"  telemetry off : {results['off_us']:.1f} µs/step (median of {args.rounds} episodes)")
+    print(f"  telemetry on  : {results['on_us']:.1f} µs/step")
+    print(f"  overhead      : {(results['on_us'] / results['off_us'] - 1) * 100:+.2f}%")
+    print(f"  recorder.record alone: {results['record_us']:.2f} µs/call")
+    print(f"  disabled vs pre-telemetry step: +{results['disabled_us']:.3f} µs/step "
+          f"({results['disabled_overhead']:+.4%}, bound {MAX_DISABLED_OVERHEAD:.1%})")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Env-steps/sec of the crosswalk env under DummyVecEnv (1 worker) and SubprocVecEnv (N workers).
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.vec_env import make_vec_env
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET      = "intersection/environment.net.xml"
+SUMO_ROUTE    = "intersection/episode_routes.rou.xml"
+LOG_DIR       = "logs/bench_vec_throughput/"
+WORKER_COUNTS = [1, 2, 4, 8]
+STEPS_PER_ENV = 200
+# ────────────────────────────────────────────────────────
+
+def measure(n_envs, steps_per_env=STEPS_PER_ENV):
+    env = make_vec_env(
+        n_envs=n_envs,
+        log_dir=LOG_DIR,
+        net_file=SUMO_NET,
+        route_file=SUMO_ROUTE,
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=1000
+    )
+    rng = np.random.default_rng(0)
+    try:
+        env.reset()
+        start = time.perf_counter()
+        for _ in range(steps_per_env):
+            env.step(rng.integers(0, env.action_space.n, size=n_envs))
+        elapsed = time.perf_counter() - start
+    finally:
+        env.close()
+    return n_envs * steps_per_env / elapsed
+
+
+def run(worker_counts=WORKER_COUNTS, steps_per_env=STEPS_PER_ENV):
+    return {n: measure(n, steps_per_env) for n in worker_counts}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKER_COUNTS)
+    parser.add_argument("--steps", type=int, default=STEPS_PER_ENV)
+    args = parser.parse_args()
+
+    results = run(args.workers, args.steps)
+    base = results.get(1)
+    print(f"\n{'workers':>8} {'env-steps/s':>12} {'speedup':>8}")
+    for n, sps in results.items():
+        speedup = f"{sps / base:.2f}x" if base else "-"
+        print(f"{n:>8} {sps:>12.1f} {speedup:>8}")
+    print(f"(cpu count: {os.cpu_count()})")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# Benchmark suite: runs the individual benchmarks with short settings, stores one JSON file
+# per run (commit, machine, metrics) and flags metrics that got worse than a baseline run
+# by more than a threshold (exit code 1), so performance can be tracked across commits.
+#
+#   python benchmarks/run_suite.py                                  # -> benchmarks/results/<time>_<commit>.json
+#   python benchmarks/run_suite.py --baseline benchmarks/results/a.json --threshold 0.15
+#   python benchmarks/run_suite.py --current b.json --baseline a.json   # compare only
+#   python benchmarks/run_suite.py --only reset step
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# ─── Configuration ─────────────────────────────────────
+RESULTS_DIR = "benchmarks/results/"
+THRESHOLD   = 0.10   # relative slowdown that counts as a regression
+# ────────────────────────────────────────────────────────
+
+
+def bench_reset(backend):
+    from benchmarks import bench_reset
+    results = bench_reset.run(resets=5, backend=backend)
+    return {f"reset_{mode}_ms": (r["mean_s"] * 1e3, "lower") for mode, r in results.items()}
+
+
+def bench_step(backend):
+    from benchmarks import bench_step_latency
+    results = bench_step_latency.run(episodes=2, backend=backend)
+    return {f"step_{name}_ms": (r["mean_ms"], "lower") for name, r in results.items()}
+
+
+def bench_obs_reward(backend):
+    from benchmarks import bench_obs_reward
+    metrics = {}
+    for pph, r in bench_obs_reward.run(episodes=1, backend=backend).items():
+        metrics[f"observe_{pph}pph_us"] = (r["observe_us"], "lower")
+        metrics[f"reward_{pph}pph_us"] = (r["reward_us"], "lower")
+    return metrics
+
+
+def bench_reward_engine(backend):
+    from benchmarks import bench_reward
+    results = bench_reward.run(repeats=500)
+    return {f"reward_engine_{n}peds_us": (r["vectorized_us"], "lower") for n, r in results.items()}
+
+
+def bench_routes(backend):
+    from benchmarks import bench_route_generation
+    results = bench_route_generation.run([1_000, 100_000])
+    return {f"route_gen_{n}_trips_per_s": (r["trips_per_s"], "higher") for n, r in results.items()}
+
+
+def bench_ppo(backend):
+    from benchmarks import bench_ppo_throughput
+    metrics = {}
+    for n, r in bench_ppo_throughput.run([1, 2], timesteps=1000, backend=backend).items():
+        for kind, steps_per_s in r.items():
+            metrics[f"ppo_{kind}_{n}env_steps_per_s"] = (steps_per_s, "higher")
+    return metrics
+
+
+BENCHMARKS = {
+    "reset": bench_reset,
+    "step": bench_step,
+    "obs_reward": bench_obs_reward,
+    "reward_engine": bench_reward_engine,
+    "routes": bench_routes,
+    "ppo": bench_ppo,
+}
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_suite(names=None, backend="traci"):
+    metrics = {}
+    for name in names or BENCHMARKS:
+        print(f"⏱️  {name} ...")
+        start = time.perf_counter()
+        for metric, (value, better) in BENCHMARKS[name](backend).items():
+            metrics[metric] = {"value": float(value), "better": better, "benchmark": name}
+        print(f"   done in {time.perf_counter() - start:.1f}s")
+    commit = _git("rev-parse", "--short", "HEAD")
+    return {
+        "meta": {
+            "commit": commit + ("-dirty" if _git("status", "--porcelain", "--untracked-files=no") else ""),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": socket.gethostname(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "backend": backend,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    # Relative change per shared metric, positive = worse; regressions exceed the threshold
+    rows = []
+    for name, cur in current["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = change if cur["better"] == "lower" else -change
+        rows.append({"metric": name, "baseline": base["value"], "current": cur["value"],
+                     "worse_by": worse, "regression": worse > threshold})
+    return rows
+
+
+def print_comparison(rows, threshold):
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        flag = "  ❌ regression" if row["regression"] else ""
+        print(f"{row['metric']:<40} {row['baseline']:>12.2f} {row['current']:>12.2f} "
+              f"{-row['worse_by']:>+8.1%}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%} (positive change = better)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--out", type=str, default=None, help="result file (default: results dir)")
+    parser.add_argument("--current", type=str, default=None, help="compare this stored result instead of running")
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            result = json.load(f)
+    else:
+        result = run_suite(args.only, args.backend)
+        out = args.out or os.path.join(
+            RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{result['meta']['commit'] or 'nogit'}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n📄 Results written to {out}")
+        for name, m in result["metrics"].items():
+            print(f"  {name:<40} {m['value']:>12.2f}  ({m['better']} is better)")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = print_comparison(compare(result, baseline, args.threshold), args.threshold)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,320 @@
+import collections
+import os
+
+import gymnasium as gym
+import numpy as np
+import traci.constants as tc
+
+from env.net_topology import discover_intersections
+from env.reward import frustration, weighted_terms
+from env.sim_config import SimConfig
+from env.single_agent_crosswalk_env import (RESET_MODES, _TRACI_ERRORS, _instance_ids,
+                                            resolve_backend, start_sumo)
+
+try:
+    from pettingzoo import ParallelEnv
+except ImportError:
+    # Same interface without the dependency; pettingzoo only adds the base class
+    ParallelEnv = object
+
+
+class MultiAgentCrosswalkEnv(ParallelEnv):
+    # Every signalized intersection in the net is one agent, all in one SUMO instance.
+    # Intersections, their incoming edges, walking areas and signal programs are discovered
+    # from the net file (env/net_topology.py), so corridors and grids work unchanged.
+    #
+    # Observations use the single-agent layout per intersection, zero-padded to the largest
+    # one: [num_wait, max_wait] per walking area, then the vehicle count per incoming edge.
+    # Actions index the intersection's own action phases (phases without yellow), modulo
+    # their number where programs differ. Rewards are the single-agent reward restricted to
+    # the intersection: pedestrians waiting on its walking areas, crossings and incoming
+    # edges, and the waiting time on its incoming edges.
+    #
+    # Agents decide asynchronously: an action starts the same (clearance + phase) schedule as
+    # in the single-agent env, and the simulation runs until the next agent finishes its
+    # schedule. step() returns then; info[agent]["ready"] says who needs a new action (others'
+    # actions are ignored) and rewards are reported at each agent's own decision points.
+    # With one intersection this is exactly the single-agent env.
+    #
+    # step()/reset() are the PettingZoo parallel API (dicts keyed by traffic light id);
+    # step_batch()/reset_batch() are the same on arrays in possible_agents order, so one
+    # shared policy can act for all intersections with a single batched predict() per tick.
+    metadata = {"name": "multi_agent_crosswalk_v0", "render_modes": []}
+
+    def __init__(self, net_file, route_file,
+                 sumo_binary="sumo", use_gui=False,
+                 max_steps=1000, alpha=0.01, gamma=0.0,
+                 ped_weight=1.0, veh_weight=1.0,
+                 label=None, log_dir=None, backend="traci",
+                 reset_mode="restart", tl_ids=None, sim_config=None):
+        self.sumo_binary = sumo_binary
+        self.use_gui = use_gui
+        self.max_steps = max_steps
+        self.backend = resolve_backend(backend, use_gui)
+        self.net_file = net_file
+        self.route_file = route_file
+        if reset_mode not in RESET_MODES:
+            raise ValueError(f"Unknown reset_mode {reset_mode!r}, expected one of {RESET_MODES}")
+        self.reset_mode = reset_mode
+
+        self.label = label or f"multi_crosswalk_{os.getpid()}_{next(_instance_ids)}"
+        self.log_dir = log_dir or "."
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.conn = None
+
+        self.intersections = discover_intersections(net_file)
+        if tl_ids is not None:
+            tl_ids = set(tl_ids)
+            self.intersections = [i for i in self.intersections if i.tl_id in tl_ids]
+        if not self.intersections:
+            raise ValueError(f"No signalized intersections found in {net_file}")
+        self.possible_agents = [i.tl_id for i in self.intersections]
+        self.agents = []
+
+        if isinstance(sim_config, dict):
+            sim_config = SimConfig(**sim_config)
+        self.sim_config = sim_config or SimConfig()
+        self.sim_config.validate([w for i in self.intersections for w in i.crosswalk_ids])
+
+        self.alpha = alpha
+        self.gamma = gamma
+        self.ped_weight = ped_weight
+        self.veh_weight = veh_weight
+
+        # Per-intersection action maps and compiled (previous action, action) schedules
+        self.action_maps = [dict(enumerate(i.program.action_phases)) for i in self.intersections]
+        self.schedules = [i.program.compile(m) for i, m in zip(self.intersections, self.action_maps)]
+
+        self.max_crosswalks = max(len(i.crosswalk_ids) for i in self.intersections)
+        self.max_edges = max(len(i.vehicle_edges) for i in self.intersections)
+        self._observation_space = gym.spaces.Box(
+            low=0, high=100, shape=(2 * self.max_crosswalks + self.max_edges,), dtype=np.float32)
+        self._action_space = gym.spaces.Discrete(max(len(m) for m in self.action_maps))
+
+        # Lookup tables that scatter subscription results into the batched arrays:
+        # edge -> agent index for pedestrian waits, walking area -> (agent, slot) for the
+        # observation, and (agent, slot) of every incoming edge in _vehicle_edges order
+        self._ped_agent = {}
+        self._crosswalk_slot = {}
+        self._vehicle_edges, veh_rows, veh_cols = [], [], []
+        for agent, inter in enumerate(self.intersections):
+            for edge in inter.crossings + inter.vehicle_edges:
+                self._ped_agent[edge] = agent
+            for slot, edge in enumerate(inter.crosswalk_ids):
+                self._ped_agent[edge] = agent
+                self._crosswalk_slot[edge] = (agent, slot)
+            for slot, edge in enumerate(inter.vehicle_edges):
+                self._vehicle_edges.append(edge)
+                veh_rows.append(agent)
+                veh_cols.append(slot)
+        self._veh_index = (np.array(veh_rows, dtype=np.intp), np.array(veh_cols, dtype=np.intp))
+
+        n = len(self.intersections)
+        self._segments = [collections.deque() for _ in range(n)]
+        self._switch_at = np.full(n, np.inf)
+        self.ready = np.ones(n, dtype=bool)
+        self.last_actions = [None] * n
+        self.sim_time = 0.0
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    @property
+    def num_agents(self):
+        return len(self.agents)
+
+    @property
+    def max_num_agents(self):
+        return len(self.possible_agents)
+
+    @property
+    def sumo_cmd(self):
+        return [
+            self.sumo_binary,
+            "-n", self.net_file,
+            "-r", self.route_file,
+            "--start", "false",
+        ] + self.sim_config.args(self.log_dir, self.label)
+
+    # ─── PettingZoo parallel API ───────────────────────────
+
+    def reset(self, seed=None, options=None):
+        obs = self.reset_batch(seed)
+        return dict(zip(self.agents, obs)), {agent: {"ready": True} for agent in self.agents}
+
+    def step(self, actions):
+        batch = np.zeros(len(self.possible_agents), dtype=np.int64)
+        for index, agent in enumerate(self.possible_agents):
+            if agent in actions:
+                batch[index] = int(np.asarray(actions[agent]).item())
+        obs, rewards, done, ready = self.step_batch(batch)
+
+        agents = self.possible_agents
+        infos = {agent: {"ready": bool(r)} for agent, r in zip(agents, ready)}
+        if done:
+            for agent, total in zip(agents, self.episode_rewards):
+                infos[agent]["episode_reward"] = float(total)
+            self.agents = []
+        return (dict(zip(agents, obs)), dict(zip(agents, rewards.tolist())),
+                {agent: done for agent in agents}, {agent: False for agent in agents}, infos)
+
+    # ─── Batched API ───────────────────────────────────────
+
+    def reset_batch(self, seed=None):
+        sumo_cmd = self.sumo_cmd + (["--seed", str(seed)] if seed is not None else [])
+        if self.reset_mode == "load" and self.conn is not None:
+            self.conn.load(sumo_cmd[1:])
+        else:
+            self._close_connection()
+            self.conn = start_sumo(self.backend, sumo_cmd, self.label, self.sim_config.connect_retry_s)
+        self._subscribe()
+
+        self.agents = list(self.possible_agents)
+        for segments in self._segments:
+            segments.clear()
+        self._switch_at[:] = np.inf
+        self.ready[:] = True
+        self.last_actions = [None] * len(self.possible_agents)
+        self.sim_time = self.start_time = self.conn.simulation.getTime()
+        self.decisions = 0
+        self.episode_rewards = np.zeros(len(self.possible_agents))
+
+        obs, _ = self._observe()
+        return obs
+
+    def step_batch(self, actions):
+        # actions: one per agent in possible_agents order; only ready agents' are applied.
+        # Returns (obs, rewards, done, ready) with obs of shape (n_agents, obs_dim)
+        actions = np.asarray(actions).reshape(-1)
+        for agent in np.flatnonzero(self.ready):
+            self._apply(agent, int(actions[agent]))
+        self.decisions += int(self.ready.sum())
+        self.ready[:] = False
+
+        while not self.ready.any():
+            target = self._switch_at.min()
+            self._advance(target)
+            for agent in np.flatnonzero(self._switch_at <= target):
+                self._next_segment(agent)
+
+        done = self.sim_time - self.start_time >= self.max_steps
+        obs, rewards = self._observe()
+        # Each agent is rewarded at its own decision points (and once more at the end), as
+        # the single-agent env is after every action
+        rewards = np.where(self.ready | done, rewards, 0.0)
+        self.episode_rewards += rewards
+        if done:
+            print(f"\n🏁 [Episode Complete] {len(self.possible_agents)} intersections, "
+                  f"{self.decisions} decisions, Total Reward: {self.episode_rewards.sum():.1f}\n")
+        return obs, rewards, done, self.ready.copy()
+
+    # ─── Simulation ────────────────────────────────────────
+
+    def _apply(self, agent, action):
+        action %= len(self.action_maps[agent])
+        segments = self._segments[agent]
+        end = self.sim_time
+        for phase, duration in self.schedules[agent][(self.last_actions[agent], action)]:
+            end += duration
+            segments.append((phase, end))
+        self.last_actions[agent] = action
+        self._start_segment(agent)
+
+    def _start_segment(self, agent):
+        phase, end = self._segments[agent][0]
+        self.conn.trafficlight.setPhase(self.possible_agents[agent], phase)
+        self._switch_at[agent] = end
+
+    def _next_segment(self, agent):
+        segments = self._segments[agent]
+        segments.popleft()
+        if segments:
+            self._start_segment(agent)
+        else:
+            self._switch_at[agent] = np.inf
+            self.ready[agent] = True
+
+    def _advance(self, target_time):
+        # Jump to the next phase switch of any intersection in one RPC
+        self.conn.simulationStep(target_time)
+        self.sim_time = target_time
+        self._subscribe_departed()
+
+    def _subscribe(self):
+        for edge in self._vehicle_edges:
+            self.conn.edge.subscribe(edge, [tc.LAST_STEP_VEHICLE_NUMBER, tc.VAR_WAITING_TIME])
+        # Pedestrians are subscribed as they depart; the road id places them at an intersection
+        self.conn.simulation.subscribe([tc.VAR_DEPARTED_PERSONS_IDS])
+        for pid in self.conn.person.getIDList():
+            self.conn.person.subscribe(pid, [tc.VAR_WAITING_TIME, tc.VAR_ROAD_ID])
+
+    def _subscribe_departed(self):
+        for pid in self.conn.simulation.getSubscriptionResults()[tc.VAR_DEPARTED_PERSONS_IDS]:
+            try:
+                self.conn.person.subscribe(pid, [tc.VAR_WAITING_TIME, tc.VAR_ROAD_ID])
+            except _TRACI_ERRORS:
+                # departed and already arrived within the same simulationStep call
+                pass
+
+    def _observe(self):
+        # Observations and local rewards of all agents from one read of the subscriptions
+        n = len(self.possible_agents)
+        ped_agents, ped_waits = [], []
+        crosswalk_agents, crosswalk_slots, crosswalk_waits = [], [], []
+        for result in self.conn.person.getAllSubscriptionResults().values():
+            wait = result[tc.VAR_WAITING_TIME]
+            if wait <= 0:
+                # adds neither to the observation nor to the reward
+                continue
+            road = result[tc.VAR_ROAD_ID]
+            agent = self._ped_agent.get(road)
+            if agent is None:
+                continue
+            ped_agents.append(agent)
+            ped_waits.append(wait)
+            slot = self._crosswalk_slot.get(road)
+            if slot is not None:
+                crosswalk_agents.append(slot[0])
+                crosswalk_slots.append(slot[1])
+                crosswalk_waits.append(wait)
+
+        crosswalk_agents = np.array(crosswalk_agents, dtype=np.intp)
+        crosswalk_slots = np.array(crosswalk_slots, dtype=np.intp)
+        crosswalks = np.zeros((n, self.max_crosswalks, 2), dtype=np.float32)
+        np.add.at(crosswalks[:, :, 0], (crosswalk_agents, crosswalk_slots), 1)
+        np.maximum.at(crosswalks[:, :, 1], (crosswalk_agents, crosswalk_slots), crosswalk_waits)
+
+        edges = self.conn.edge.getAllSubscriptionResults()
+        vehicles = np.zeros((n, self.max_edges), dtype=np.float32)
+        vehicles[self._veh_index] = [edges[e][tc.LAST_STEP_VEHICLE_NUMBER] for e in self._vehicle_edges]
+        veh_delays = np.zeros((n, self.max_edges))
+        veh_delays[self._veh_index] = [edges[e][tc.VAR_WAITING_TIME] for e in self._vehicle_edges]
+
+        ped_agents = np.array(ped_agents, dtype=np.intp)
+        ped_waits = np.array(ped_waits, dtype=np.float64)
+        total_ped_wait = np.bincount(ped_agents, ped_waits, minlength=n)
+        total_frustration = np.bincount(ped_agents, frustration(ped_waits, self.alpha), minlength=n)
+        ped_term, veh_term, frust_term = weighted_terms(
+            total_ped_wait, veh_delays.sum(axis=1), total_frustration,
+            self.ped_weight, self.veh_weight, self.gamma)
+
+        obs = np.concatenate([crosswalks.reshape(n, -1), vehicles], axis=1)
+        return obs, -(ped_term + veh_term + frust_term)
+
+    def close(self):
+        self._close_connection()
+        self.agents = []
+
+    def _close_connection(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.close()
+        except _TRACI_ERRORS:
+            # SUMO already went away (crash or killed worker); nothing to flush
+            pass
+        finally:
+            self.conn = None
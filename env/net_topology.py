@@ -0,0 +1,64 @@
+import sumolib
+
+from env.phase_program import PhaseProgram
+
+
+class Intersection:
+    # One signalized intersection as the multi-agent env sees it: its traffic light and
+    # signal program, the incoming vehicle edges it controls (in link-index order, i.e.
+    # the order of the tlLogic state string) and the walking areas around its junctions
+    # (sorted by index, ":J_w0", ":J_w1", ...), where pedestrians wait to cross.
+    def __init__(self, tl_id, program, junctions, vehicle_edges, crosswalk_ids, crossings):
+        self.tl_id = tl_id
+        self.program = program
+        self.junctions = junctions
+        self.vehicle_edges = vehicle_edges
+        self.crosswalk_ids = crosswalk_ids
+        self.crossings = crossings
+
+    def __repr__(self):
+        return (f"Intersection({self.tl_id!r}, {len(self.vehicle_edges)} incoming edges, "
+                f"{len(self.crosswalk_ids)} walking areas)")
+
+
+def _internal_order(edge_id):
+    # ":B1_w10" -> (":B1", 10), so w10 sorts after w2
+    prefix, suffix = edge_id.rsplit("_", 1)
+    return prefix, int(suffix[1:])
+
+
+def discover_intersections(net_file, program_ids=None):
+    # One streaming pass over the net (edges, connections, tlLogics); the full sumolib net
+    # is not needed and its program reader chokes on some nets. program_ids optionally
+    # picks a {tl_id: programID} per traffic light, otherwise the first program is used.
+    program_ids = program_ids or {}
+    edge_to, walkingareas, crossings = {}, {}, {}
+    links, programs = {}, {}
+    for element in sumolib.xml.parse(net_file, ["edge", "connection", "tlLogic"]):
+        name = element.name
+        if name == "edge":
+            function = element.function
+            if function in ("walkingarea", "crossing"):
+                junction = element.id[1:].rsplit("_", 1)[0]
+                target = walkingareas if function == "walkingarea" else crossings
+                target.setdefault(junction, []).append(element.id)
+            elif function is None:
+                edge_to[element.id] = element.to
+        elif name == "connection":
+            if element.tl is not None and not element.attr_from.startswith(":"):
+                tl_links = links.setdefault(element.tl, {})
+                index = int(element.linkIndex)
+                tl_links[element.attr_from] = min(index, tl_links.get(element.attr_from, index))
+        elif element.id not in programs and program_ids.get(element.id, element.programID) == element.programID:
+            programs[element.id] = PhaseProgram.from_tl_logic(element)
+
+    intersections = []
+    for tl_id in sorted(programs):
+        incoming = sorted(links.get(tl_id, {}), key=links.get(tl_id, {}).get)
+        junctions = sorted({edge_to[e] for e in incoming if e in edge_to})
+        intersections.append(Intersection(
+            tl_id, programs[tl_id], junctions, incoming,
+            sorted((w for j in junctions for w in walkingareas.get(j, [])), key=_internal_order),
+            sorted((c for j in junctions for c in crossings.get(j, [])), key=_internal_order),
+        ))
+    return intersections
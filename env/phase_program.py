@@ -0,0 +1,55 @@
+import sumolib
+
+
+class PhaseProgram:
+    # The static signal program of one traffic light, read once from the .net.xml, plus
+    # the per-step schedules derived from it. Phases without any yellow ('y') are the
+    # phases an agent can hold; the yellow phases that directly follow one of them are
+    # its clearance sequence, played before the next decision takes effect.
+    def __init__(self, tl_id, states, durations):
+        self.tl_id = tl_id
+        self.states = list(states)
+        self.durations = list(durations)
+
+        self.action_phases = [i for i, state in enumerate(self.states) if "y" not in state]
+        self.transitions = {}
+        for phase in self.action_phases:
+            following = []
+            nxt = (phase + 1) % len(self.states)
+            while "y" in self.states[nxt] and nxt != phase:
+                following.append(nxt)
+                nxt = (nxt + 1) % len(self.states)
+            if following:
+                self.transitions[phase] = following
+
+    @classmethod
+    def from_net(cls, net_file, tl_id="TL", program_id=None):
+        # sumolib.xml.parse streams only the tlLogic elements instead of building the net
+        for tl in sumolib.xml.parse(net_file, "tlLogic"):
+            if tl.id == tl_id and (program_id is None or tl.programID == program_id):
+                return cls.from_tl_logic(tl)
+        raise ValueError(f"No tlLogic {tl_id!r} in {net_file}")
+
+    @classmethod
+    def from_tl_logic(cls, tl):
+        # From an already parsed <tlLogic> element
+        phases = tl.phase
+        return cls(tl.id, [p.state for p in phases], [int(float(p.duration)) for p in phases])
+
+    def segment(self, phase):
+        return (phase, self.durations[phase])
+
+    def compile(self, action_map):
+        # {(previous action, action): ((phase, duration), ...)} for every pair, with None as
+        # the previous action at the start of an episode. The previous action's clearance
+        # sequence always runs first, as the env has always done.
+        schedules = {}
+        for prev in [None] + list(action_map):
+            clearance = [] if prev is None else self.transitions.get(action_map[prev], [])
+            for action, phase in action_map.items():
+                schedules[(prev, action)] = tuple(self.segment(p) for p in clearance + [phase])
+        return schedules
+
+    def cycle(self):
+        # The fixed-time plan: every phase in program order with its own duration
+        return [self.segment(p) for p in range(len(self.states))]
@@ -0,0 +1,182 @@
+from operator import itemgetter
+
+import numpy as np
+import traci.constants as tc
+from traci.exceptions import FatalTraCIError, TraCIException
+
+try:
+    import libsumo
+except ImportError:
+    libsumo = None
+
+# TraCI errors as raised by either backend
+_TRACI_ERRORS = (FatalTraCIError, TraCIException)
+if libsumo is not None:
+    _TRACI_ERRORS += (libsumo.FatalTraCIError, libsumo.TraCIException)
+
+_WAIT = itemgetter(tc.VAR_WAITING_TIME)
+
+
+class EntityRegistry:
+    # Array-backed table of the active entities of one kind (persons or vehicles).
+    # Membership changes only through depart()/arrive(), fed from the simulation's
+    # departed/arrived ID subscriptions, so adding and removing entities costs O(changed);
+    # freed slots are reused, so the table stays as large as the peak population.
+    # Each entity is subscribed once, when it departs. (A single whole-network context
+    # subscription would save those calls, but costs SUMO far more per step.)
+    # update() copies the waiting times into the arrays in one pass (the row to slot mapping
+    # is only rebuilt when entities came or went), and everything downstream (observation,
+    # reward, statistics) is vectorized over the table instead of rebuilding dicts and ID
+    # lists every step.
+    #
+    #   wait            current waiting time (SUMO resets it when the entity moves again)
+    #   peak_wait       longest wait so far
+    #   cumulative_wait Σ of all waiting spells so far, as sampled by update()
+    #   road            index into self.roads of the watched road the entity is on, -1 when
+    #                   on none (see place(); reading every entity's road would cost a
+    #                   road-ID string per entity and step)
+    #   sampled         whether update() has seen the entity since it departed
+    #
+    # drain() hands out what changed since its last call: the IDs update() sampled for the
+    # first time and the peak waits of sampled entities that left (their "final" wait), so
+    # statistics can follow the population without rebuilding per-ID dicts every step.
+    def __init__(self, domain, capacity=256):
+        self.domain = domain
+        self.roads = []
+        self._road_index = {}
+        self._groups = {}
+        self.slot_of = {}
+        self.ids = [None] * capacity
+        self.active = np.zeros(capacity, dtype=bool)
+        self.wait = np.zeros(capacity)
+        self.peak_wait = np.zeros(capacity)
+        self.cumulative_wait = np.zeros(capacity)
+        self.road = np.full(capacity, -1, dtype=np.intp)
+        self._finished_spells = np.zeros(capacity)
+        self.sampled = np.zeros(capacity, dtype=bool)
+        self._first_sampled = []
+        self._final_peaks = []
+        self._free = list(range(capacity - 1, -1, -1))
+        self._order = []
+        self._slots = np.zeros(0, dtype=np.intp)
+
+    @property
+    def size(self):
+        return len(self.slot_of)
+
+    def _grow(self):
+        old = len(self.ids)
+        self.ids.extend([None] * old)
+        for name in ("active", "wait", "peak_wait", "cumulative_wait", "_finished_spells", "sampled"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.road = np.concatenate([self.road, np.full(old, -1, dtype=np.intp)])
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def depart(self, ids):
+        # Subscribes and registers newly departed entities
+        for eid in ids:
+            if eid in self.slot_of:
+                continue
+            try:
+                self.domain.subscribe(eid, [tc.VAR_WAITING_TIME])
+            except _TRACI_ERRORS:
+                # departed and already arrived within the same simulationStep call
+                continue
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self.slot_of[eid] = slot
+            self.ids[slot] = eid
+            self.active[slot] = True
+            self.sampled[slot] = False
+            self.wait[slot] = self.peak_wait[slot] = self.cumulative_wait[slot] = 0.0
+            self._finished_spells[slot] = 0.0
+            self.road[slot] = -1
+
+    def arrive(self, ids):
+        for eid in ids:
+            slot = self.slot_of.pop(eid, None)
+            if slot is None:
+                continue
+            if self.sampled[slot]:
+                self._final_peaks.append(self.peak_wait[slot])
+            self.ids[slot] = None
+            self.active[slot] = False
+            self.sampled[slot] = False
+            self.wait[slot] = 0.0
+            self._free.append(slot)
+
+    def update(self):
+        results = self.domain.getAllSubscriptionResults()
+        if len(results) != self.size:
+            # left without an arrival event (e.g. teleported away)
+            self.arrive([eid for eid in self.slot_of if eid not in results])
+        keys = list(results)
+        if len(keys) != self.size:
+            # rows of unknown entities, e.g. results left over from before a traci.load
+            results = {eid: results[eid] for eid in keys if eid in self.slot_of}
+            keys = list(results)
+        if keys != self._order:
+            # entities came or went since the last update: remap result rows to slots
+            self._order = keys
+            self._slots = np.fromiter(map(self.slot_of.__getitem__, keys), dtype=np.intp, count=len(keys))
+            fresh = self._slots[~self.sampled[self._slots]]
+            self.sampled[fresh] = True
+            self._first_sampled.extend(self.ids[s] for s in fresh)
+        slots = self._slots
+        waits = np.fromiter(map(_WAIT, results.values()), dtype=np.float64, count=len(keys))
+        previous = self.wait[slots]
+        # a wait that went down means the previous spell ended (and a new one may have begun)
+        ended = waits < previous
+        self._finished_spells[slots[ended]] += previous[ended]
+        self.wait[slots] = waits
+        self.cumulative_wait[slots] = self._finished_spells[slots] + waits
+        self.peak_wait[slots] = np.maximum(self.peak_wait[slots], waits)
+
+    def place(self, ids_by_road):
+        # Sets road from {road id: IDs of the entities on it}, e.g. LAST_STEP_PERSON_ID_LIST
+        # edge subscriptions of the watched roads; everyone else is on no watched road
+        self.road.fill(-1)
+        slot_of = self.slot_of
+        for road, ids in ids_by_road.items():
+            code = self._road_index.get(road)
+            if code is None:
+                code = self._road_index[road] = len(self.roads)
+                self.roads.append(road)
+            self.road[[slot_of[eid] for eid in ids if eid in slot_of]] = code
+
+    def waits(self):
+        # Current waiting times of all active entities, in slot order
+        return self.wait[self.active]
+
+    def drain(self):
+        # (IDs sampled for the first time, final peak waits of the sampled entities that
+        # left) since the last drain()
+        first, self._first_sampled = self._first_sampled, []
+        peaks, self._final_peaks = np.asarray(self._final_peaks, dtype=np.float64), []
+        return first, peaks
+
+    def active_peaks(self):
+        # Peak waits of the sampled entities still in the simulation
+        return self.peak_wait[self.active & self.sampled]
+
+    def group_of(self, groups):
+        # Per-slot group index (-1 = none) for a {road id: group index} mapping; the road
+        # lookup is rebuilt only when new roads were seen
+        cached = self._groups.get(id(groups))
+        if cached is None or len(cached[1]) != len(self.roads) + 1:
+            # index -1 (no watched road) maps to the extra last entry, group -1
+            lookup = np.array([groups.get(r, -1) for r in self.roads] + [-1], dtype=np.intp)
+            cached = self._groups[id(groups)] = (groups, lookup)
+        return cached[1][self.road]
+
+    def waiting_by_group(self, groups, n_groups):
+        # (count, max wait) of the entities currently waiting (wait > 0), per group
+        group = self.group_of(groups)
+        waiting = self.active & (self.wait > 0) & (group >= 0)
+        group, waits = group[waiting], self.wait[waiting]
+        counts = np.bincount(group, minlength=n_groups)
+        max_wait = np.zeros(n_groups)
+        np.maximum.at(max_wait, group, waits)
+        return counts, max_wait
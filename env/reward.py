@@ -0,0 +1,46 @@
+import numpy as np
+
+FRUSTRATION_THRESHOLD = 60    # seconds of waiting before frustration kicks in
+FRUSTRATION_LIMIT     = 10000 # max frustration contribution per pedestrian
+
+
+def frustration(ped_waits, alpha):
+    # Per-pedestrian frustration: exp(alpha * (w - 60)) capped at FRUSTRATION_LIMIT, only for w > 60
+    ped_waits = np.asarray(ped_waits, dtype=np.float64)
+    excess = ped_waits - FRUSTRATION_THRESHOLD
+    with np.errstate(over="ignore"):
+        values = np.minimum(np.exp(alpha * np.maximum(excess, 0.0)), FRUSTRATION_LIMIT)
+    return np.where(excess > 0, values, 0.0)
+
+
+def reward_components(ped_waits, veh_delays, alpha):
+    # Raw (unweighted) reward totals, reduced over the last axis.
+    #   ped_waits  : (..., n_peds) waiting time of every pedestrian
+    #   veh_delays : (..., n_edges) waiting time on every incoming vehicle edge
+    # A 1-D input is one simulation step; stacking steps as rows evaluates a whole
+    # recorded episode at once. Zero padding is neutral (adds no wait and no
+    # frustration), so ragged steps can be padded with 0.
+    ped_waits = np.asarray(ped_waits, dtype=np.float64)
+    veh_delays = np.asarray(veh_delays, dtype=np.float64)
+
+    total_ped_wait = ped_waits.sum(axis=-1)
+    total_veh_delay = veh_delays.sum(axis=-1)
+
+    total_frustration = frustration(ped_waits, alpha).sum(axis=-1)
+
+    return total_ped_wait, total_veh_delay, total_frustration
+
+
+def weighted_terms(total_ped_wait, total_veh_delay, total_frustration,
+                   ped_weight, veh_weight, gamma):
+    ped_term = ped_weight * total_ped_wait
+    veh_term = veh_weight * total_veh_delay
+    frust_term = gamma * total_frustration
+    return ped_term, veh_term, frust_term
+
+
+def compute_reward(ped_waits, veh_delays, alpha, gamma, ped_weight=1.0, veh_weight=1.0):
+    # reward = -(ped_weight * Σ ped wait + veh_weight * Σ veh delay + gamma * Σ frustration)
+    terms = weighted_terms(*reward_components(ped_waits, veh_delays, alpha),
+                           ped_weight, veh_weight, gamma)
+    return -sum(terms)
@@ -0,0 +1,67 @@
+import os
+
+GUI_WARMUP_MODES = ("always", "once", "skip")
+
+
+class SimConfig:
+    # SUMO startup options for SingleAgentCrosswalkEnv. The defaults reproduce the original
+    # command line; the rest are speed knobs:
+    #   step_length       seconds per SUMO step (coarser = fewer internal steps per phase)
+    #   threads           SUMO simulation threads (--threads)
+    #   routing_threads   parallel rerouting threads (--device.rerouting.threads)
+    #   write_logs        per-instance --error-log / --message-log files
+    #   no_internal_links drop junction-internal lanes; only valid for networks whose
+    #                     pedestrians and observations do not use internal edges
+    #   gui_warmup        "always" cycles every agent phase on each GUI reset, "once"
+    #                     only on the first reset of the env, "skip" never
+    #   extra_args        any further SUMO flags, appended verbatim
+    #   connect_retry_s   how often the TraCI client polls for a starting SUMO
+    #                     (traci.start waits a fixed 1 s before its first retry)
+    def __init__(self, step_length=1.0, threads=1, routing_threads=None, time_to_teleport=10000,
+                 write_logs=True, no_internal_links=False, gui_warmup="once", extra_args=(),
+                 connect_retry_s=0.02):
+        if step_length <= 0:
+            raise ValueError(f"step_length must be positive, got {step_length}")
+        if threads < 1:
+            raise ValueError(f"threads must be >= 1, got {threads}")
+        if connect_retry_s <= 0:
+            raise ValueError(f"connect_retry_s must be positive, got {connect_retry_s}")
+        if gui_warmup not in GUI_WARMUP_MODES:
+            raise ValueError(f"Unknown gui_warmup {gui_warmup!r}, expected one of {GUI_WARMUP_MODES}")
+        self.step_length = step_length
+        self.threads = threads
+        self.routing_threads = routing_threads
+        self.time_to_teleport = time_to_teleport
+        self.write_logs = write_logs
+        self.no_internal_links = no_internal_links
+        self.gui_warmup = gui_warmup
+        self.extra_args = list(extra_args)
+        self.connect_retry_s = connect_retry_s
+
+    def validate(self, observed_edges):
+        # Crossings and walking areas are internal edges (":TL_w0"), so without internal
+        # links SUMO cannot route pedestrians and the crosswalk observation has no edges
+        internal = [e for e in observed_edges if e.startswith(":")]
+        if self.no_internal_links and internal:
+            raise ValueError(f"no_internal_links is not valid here: the env observes internal "
+                             f"edges {internal} (pedestrian crossings / walking areas)")
+
+    def args(self, log_dir, label):
+        args = []
+        if self.write_logs:
+            args += ["--error-log", os.path.join(log_dir, f"sumo_crash_{label}.log"),
+                     "--message-log", os.path.join(log_dir, f"sumo_messages_{label}.log")]
+        args += [
+            "--time-to-teleport", str(self.time_to_teleport),
+            "--no-warnings", "true",
+            "--no-step-log",
+        ]
+        if self.step_length != 1.0:
+            args += ["--step-length", str(self.step_length)]
+        if self.threads > 1:
+            args += ["--threads", str(self.threads)]
+        if self.routing_threads:
+            args += ["--device.rerouting.threads", str(self.routing_threads)]
+        if self.no_internal_links:
+            args += ["--no-internal-links", "true"]
+        return args + self.extra_args
@@ -1,31 +1,124 @@
+import itertools
+import os
+import subprocess
+import time
+import warnings
+
 import gymnasium as gym
 import numpy as np
 import traci
+import traci.constants as tc
+from sumolib.miscutils import getFreeSocketPort
+from traci.exceptions import FatalTraCIError, TraCIException
+
+from env.phase_program import PhaseProgram
+from env.registry import _TRACI_ERRORS, EntityRegistry
+from env.reward import reward_components, weighted_terms
+from env.sim_config import SimConfig
+from generator.scenario_pool import ScenarioPool
+from utils.profiling import NULL_PROFILER, CountingConnection, StageProfiler
+from utils.telemetry import TelemetryRecorder
+
+try:
+    import libsumo
+except ImportError:
+    libsumo = None
+
+BACKENDS = ("traci", "libsumo")
+RESET_MODES = ("restart", "load")
+
+# Per-process counter so every env instance gets its own TraCI label
+_instance_ids = itertools.count()
+
+
+def resolve_backend(backend, use_gui):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "libsumo":
+        if use_gui:
+            # libsumo has no GUI; sumo-gui is only reachable over TraCI
+            warnings.warn("libsumo does not support the GUI, falling back to TraCI")
+            return "traci"
+        if libsumo is None:
+            raise ImportError("backend='libsumo' requires the libsumo package (pip install libsumo)")
+    return backend
+
+
+def start_sumo(backend, sumo_cmd, label, connect_retry_s=0.02, attempts=3):
+    # Returns the connection object: the libsumo module itself (SUMO runs in-process and
+    # the API lives at module level) or a labeled TraCI connection
+    if backend == "libsumo":
+        libsumo.start(sumo_cmd)
+        return libsumo
+    # Same as traci.start(), except that it polls for SUMO's port every connect_retry_s
+    # instead of sleeping a full second before the first retry
+    for attempt in range(attempts):
+        port = getFreeSocketPort()
+        proc = subprocess.Popen(sumo_cmd + ["--remote-port", str(port)])
+        try:
+            return _connect(port, proc, label, connect_retry_s)
+        except TraCIException:
+            # SUMO exited before accepting, e.g. another process took the port first
+            if attempt == attempts - 1:
+                raise
+
+
+def _connect(port, proc, label, retry_s, timeout_s=60):
+    # traci.connect prints two lines per retry, so retries happen here with single-shot
+    # connects (numRetries=0 prints nothing). It raises TraCIException once proc has exited.
+    # The port cannot be probed with a plain socket instead: SUMO takes the first client
+    # that connects as its TraCI client.
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            return traci.connect(port, numRetries=0, proc=proc, label=label)
+        except FatalTraCIError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(retry_s)
+
 
 class SingleAgentCrosswalkEnv(gym.Env):
     def __init__(self, net_file, route_file,
              sumo_binary="sumo", use_gui=True,
              max_steps=1000, alpha=0.01, gamma=0.0,
-             ped_weight=1.0, veh_weight=1.0):
+             ped_weight=1.0, veh_weight=1.0,
+             label=None, log_dir=None, backend="traci",
+             use_subscriptions=False, per_second_stats=False,
+             reset_mode="restart", scenario_pool=None, track_vehicles=False,
+             telemetry=False, profile=False, profile_trace=None, sim_config=None):
         super().__init__()
         self.sumo_binary = sumo_binary
         self.use_gui = use_gui
         self.max_steps = max_steps
         self.step_count = 0
-        self.traci = traci
+        self.sim_time = 0.0
+        self.backend = resolve_backend(backend, use_gui)
+        self.traci = libsumo if self.backend == "libsumo" else traci
         self.net_file = net_file
         self.route_file = route_file
-        self.sumo_cmd = [
-            self.sumo_binary,
-            "-n", self.net_file,
-            "-r", self.route_file,
-            "--start", "false",  # Added comma here
-            "--error-log", "sumo_crash.log",
-            "--message-log", "sumo_messages.log",
-            "--time-to-teleport", "10000",
-            "--no-warnings", "true",
-            "--no-step-log"
-        ]
+
+        # Each instance owns a labeled connection and its own SUMO log files,
+        # so several envs can live side by side (e.g. under SubprocVecEnv).
+        # "restart" relaunches SUMO on every reset; "load" keeps the process alive and
+        # reloads network and routes in place with traci.load (same result, no launch cost)
+        if reset_mode not in RESET_MODES:
+            raise ValueError(f"Unknown reset_mode {reset_mode!r}, expected one of {RESET_MODES}")
+        self.reset_mode = reset_mode
+
+        self.label = label or f"crosswalk_{os.getpid()}_{next(_instance_ids)}"
+        self.log_dir = log_dir or "."
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.conn = None
+
+        # Optional pool of pregenerated route files; reset() swaps in one per episode and
+        # keeps route_file when none is ready. A dict builds the pool inside this process,
+        # which is what SubprocVecEnv workers need (a live pool cannot be pickled).
+        self._owns_pool = isinstance(scenario_pool, dict)
+        if self._owns_pool:
+            scenario_pool = ScenarioPool(**scenario_pool)
+        self.scenario_pool = scenario_pool
+        self._pool_route = None   # route file held from the pool until the next episode
 
         self.agent_action_map = {
             0: 0,
@@ -34,10 +127,16 @@ class SingleAgentCrosswalkEnv(gym.Env):
             3: 7
         }
 
+        # Phase durations and clearance (yellow) sequences come from the net's tlLogic, read
+        # once; every (previous action, action) pair is compiled into a fixed list of
+        # (phase, duration) segments so a step needs no getPhaseDuration RPCs.
+        self.phase_program = PhaseProgram.from_net(net_file)
         self.transition_after = {
-            0: [1, 2],
-            2: [5, 6],
+            action: self.phase_program.transitions[phase]
+            for action, phase in self.agent_action_map.items()
+            if phase in self.phase_program.transitions
         }
+        self.schedules = self.phase_program.compile(self.agent_action_map)
 
         self.action_space = gym.spaces.Discrete(len(self.agent_action_map))
         self.observation_space = gym.spaces.Box(low=0, high=100, shape=(12,), dtype=np.float32)
@@ -45,26 +144,110 @@ class SingleAgentCrosswalkEnv(gym.Env):
         self.crosswalk_ids = [":TL_w0", ":TL_w1", ":TL_w2", ":TL_w3"]
         self.vehicle_edges = ["N2TL", "E2TL", "S2TL", "W2TL"]
 
+        # SUMO startup options (step length, threads, log files, ...); a dict is accepted
+        # too, e.g. from a sweep spec
+        if isinstance(sim_config, dict):
+            sim_config = SimConfig(**sim_config)
+        self.sim_config = sim_config or SimConfig()
+        self.sim_config.validate(self.crosswalk_ids)
+        self._warmed_up = False
+
         self.alpha = alpha
         self.gamma = gamma
         self.ped_weight = ped_weight
         self.veh_weight = veh_weight
         self.last_agent_phase = None
 
+        # Subscription state: results arrive with every simulationStep reply, so
+        # observation and reward are read locally instead of one RPC per entity. SUMO
+        # evaluates subscriptions every simulated second, though, also inside a
+        # fast-forwarded phase, and at this intersection's demand that costs more than the
+        # RPCs it saves (bench_subscriptions.py: ~0.85x), so polling stays the default.
+        # Subscriptions pay off where every entity is read each step (evaluation with
+        # track_vehicles) and are required for per_second_stats.
+        self.use_subscriptions = use_subscriptions
+        self._edge_results = {}
+        # Active pedestrians (and vehicles) are kept in EntityRegistry tables, rebuilt on
+        # every reset; the crosswalk walking areas group pedestrians for the observation.
+        self.persons = None
+        self.vehicles = None
+        self._crosswalk_group = {eid: i for i, eid in enumerate(self.crosswalk_ids)}
+        # Per-vehicle waiting times are only needed for evaluation statistics, and every
+        # subscribed vehicle costs SUMO time per simulated second, so they are opt-in.
+        self.track_vehicles = track_vehicles
+
+        # By default each phase is simulated with a single simulationStep(targetTime).
+        # per_second_stats steps one second at a time and accumulates interval_stats
+        # from the subscription results of every intermediate second instead.
+        if per_second_stats and not use_subscriptions:
+            raise ValueError("per_second_stats requires use_subscriptions=True")
+        self.per_second_stats = per_second_stats
+        self.interval_stats = {}
+
+        # Optional per-step reward breakdown and simulator counters in info["telemetry"],
+        # aggregated per episode by a ring-buffer recorder. Disabled, the only cost is
+        # the `if self.telemetry` checks.
+        self.telemetry = telemetry
+        self.recorder = TelemetryRecorder() if telemetry else None
+        self._reward_terms = None
+        # (ped_waits, veh_delays) the last reward was computed from, e.g. for
+        # utils/transition_store.py to re-weight recorded rewards later
+        self.last_reward_inputs = None
+
+        # Optional stage timings (start/simulate/subscribe/observe/reward) and TraCI call
+        # counts; profile_trace also keeps every call and writes a Chrome trace on close()
+        # (a "{label}" in the path keeps traces of parallel envs apart)
+        self.profile_trace = profile_trace
+        if profile or profile_trace:
+            self.profiler = StageProfiler(trace=profile_trace is not None)
+        else:
+            self.profiler = NULL_PROFILER
+
+    @property
+    def sumo_cmd(self):
+        return [
+            self.sumo_binary,
+            "-n", self.net_file,
+            "-r", self.route_file,
+            "--start", "false",  # Added comma here
+        ] + self.sim_config.args(self.log_dir, self.label)
+
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
-        if traci.isLoaded():
-            traci.close()
         self.step_count = 0
         self.last_agent_phase = None
         self.total_episode_reward = 0.0  # ← Add this line
-        traci.start(self.sumo_cmd)
-
-        if self.use_gui:
+        previous_route = None
+        if self.scenario_pool is not None:
+            # with nothing ready, the episode reruns route_file (still held if from the pool)
+            route = self.scenario_pool.acquire()
+            if route is not None:
+                previous_route, self._pool_route, self.route_file = self._pool_route, route, route
+        sumo_cmd = self.sumo_cmd + (["--seed", str(seed)] if seed is not None else [])
+        with self.profiler.stage("start"):
+            if self.reset_mode == "load" and self.conn is not None:
+                self.conn.load(sumo_cmd[1:])
+            else:
+                self._close_connection()
+                self._start(sumo_cmd)
+            if self.use_subscriptions:
+                self._subscribe()
+        # the previous episode's simulation is gone, so its route file may be evicted
+        if previous_route is not None:
+            self.scenario_pool.release(previous_route)
+
+        warmup = self.sim_config.gui_warmup
+        if self.use_gui and (warmup == "always" or (warmup == "once" and not self._warmed_up)):
             for phase in self.agent_action_map.values():
-                traci.trafficlight.setPhase("TL", phase)
+                self.conn.trafficlight.setPhase("TL", phase)
                 for _ in range(5):
-                    traci.simulationStep()
+                    self._advance()
+            self._warmed_up = True
+        self.sim_time = self.conn.simulation.getTime()
+        self._reset_interval_stats()
+        self._reset_episode_stats()
+        if self.telemetry:
+            self.recorder.reset()
 
         obs = self._get_observation()
         # print(f"[Observation @ reset ] {obs}")
@@ -76,43 +259,211 @@ class SingleAgentCrosswalkEnv(gym.Env):
         assert self.action_space.contains(action), f"Invalid Action: {action}"
 
         mapped_phase = self.agent_action_map[action]
+        if self.per_second_stats:
+            self._reset_interval_stats()
 
-        if self.last_agent_phase in self.transition_after:
-            for phase in self.transition_after[self.last_agent_phase]:
-                self._set_phase_and_step(phase)
-
-        self._set_phase_and_step(mapped_phase)
+        for phase, duration in self.schedules[(self.last_agent_phase, action)]:
+            self._run_phase(phase, duration)
         self.last_agent_phase = action
-
+        return self._finish_step(mapped_phase)
+
+    def step_phase(self, phase_id, duration):
+        # Fixed-time control (the static baseline): runs any phase of the TL program for
+        # `duration` seconds, outside the agent's action space, and returns what step()
+        # returns. No clearance sequence is played before or after it.
+        if self.per_second_stats:
+            self._reset_interval_stats()
+        self._run_phase(phase_id, duration)
+        return self._finish_step(phase_id)
+
+    def _finish_step(self, mapped_phase):
         obs = self._get_observation()
         reward = self._compute_reward()
         self.total_episode_reward += reward  # ← Accumulate episode reward
         done = self._check_termination()
 
+        info = {}
+        if self.telemetry:
+            info["telemetry"] = self._record_telemetry(reward, obs, mapped_phase)
         if done:
             print(f"\n🏁 [Episode Complete] Total Reward: {self.total_episode_reward:.1f}\n")
+            info["episode_stats"] = self.episode_stats()
+            if self.telemetry:
+                info["telemetry_episode"] = self.recorder.episode_summary()
 
         # print(f"[Observation @ step {self.step_count:4d}] {obs}")
-        return obs, reward, done, False, {}
+        return obs, reward, done, False, info
 
 
 
     def _set_phase_and_step(self, phase_id):
-        traci.trafficlight.setPhase("TL", phase_id)
-        duration = traci.trafficlight.getPhaseDuration("TL")
-        for _ in range(int(duration)):
-            traci.simulationStep()
+        self._run_phase(*self.phase_program.segment(phase_id))
+
+    def _run_phase(self, phase_id, duration):
+        self.conn.trafficlight.setPhase("TL", phase_id)
+        if not self.per_second_stats:
+            # Jump straight to the end of the phase in one RPC
+            self.sim_time += duration
+            self._advance(self.sim_time)
+            self.step_count += duration
+            return
+
+        for _ in range(duration):
+            self.sim_time += 1
+            self._advance(self.sim_time)
             self.step_count += 1
+            self._accumulate_interval_stats()
+
+    def _start(self, sumo_cmd):
+        self.conn = start_sumo(self.backend, sumo_cmd, self.label, self.sim_config.connect_retry_s)
+        if self.profiler.enabled:
+            self.conn = CountingConnection(self.conn, self.profiler)
+
+    def _advance(self, target_time=0.0):
+        with self.profiler.stage("simulate"):
+            self.conn.simulationStep(target_time)
+        if self.use_subscriptions:
+            with self.profiler.stage("subscribe"):
+                self._subscribe_departed()
+
+    def _reset_interval_stats(self):
+        self.interval_stats = {
+            "sim_seconds": 0,
+            "ped_wait_seconds": 0.0,   # Σ over seconds of total pedestrian waiting time
+            "veh_wait_seconds": 0.0,   # Σ over seconds of total vehicle edge waiting time
+            "max_ped_wait": 0.0,
+            "max_waiting_peds": 0,
+        }
+
+    def _accumulate_interval_stats(self):
+        self._read_subscriptions()
+        waits = self.persons.waits()
+        stats = self.interval_stats
+        stats["sim_seconds"] += 1
+        stats["ped_wait_seconds"] += float(np.sort(waits).sum())
+        stats["veh_wait_seconds"] += sum(
+            self._edge_results[edge][tc.VAR_WAITING_TIME] for edge in self.vehicle_edges)
+        stats["max_ped_wait"] = max(stats["max_ped_wait"], float(waits.max(initial=0.0)))
+        stats["max_waiting_peds"] = max(stats["max_waiting_peds"], int((waits > 0).sum()))
+
+    def _record_telemetry(self, reward, obs, phase):
+        ped_term, veh_term, frust_term, total_ped_wait, total_veh_delay, total_frustration, \
+            n_peds, n_waiting_peds = self._reward_terms
+        row = {
+            "reward": reward,
+            "ped_term": float(ped_term),
+            "veh_term": float(veh_term),
+            "frust_term": float(frust_term),
+            "total_ped_wait": float(total_ped_wait),
+            "total_veh_delay": float(total_veh_delay),
+            "total_frustration": float(total_frustration),
+            "n_peds": n_peds,
+            "n_waiting_peds": n_waiting_peds,
+            "n_vehicles": int(obs[8:].sum()),   # vehicle counts on the incoming edges
+            "sim_time": self.sim_time,
+            "phase": phase,
+        }
+        if self.per_second_stats:
+            row.update(self.interval_stats)
+        self.recorder.record(row)
+        return row
+
+    def _reset_episode_stats(self):
+        # Sampled after every agent step, from the same arrays the reward is computed on
+        self._episode_acc = {
+            "ped_wait_sum": 0.0,
+            "ped_samples": 0,
+            "max_ped_wait": 0.0,
+            "frustration": 0.0,   # Σ weighted frustration term (gamma * frustration)
+            "veh_delay": 0.0,     # Σ vehicle edge waiting time
+            "wall_start": time.perf_counter(),
+            "sim_start": self.sim_time,
+        }
+
+    def episode_stats(self):
+        acc = self._episode_acc
+        sim_seconds = self.sim_time - acc["sim_start"]
+        wall_seconds = time.perf_counter() - acc["wall_start"]
+        return {
+            "mean_ped_wait": acc["ped_wait_sum"] / acc["ped_samples"] if acc["ped_samples"] else 0.0,
+            "max_ped_wait": acc["max_ped_wait"],
+            "frustration": acc["frustration"],
+            "veh_delay": acc["veh_delay"],
+            "sim_seconds": sim_seconds,
+            "sim_s_per_s": sim_seconds / wall_seconds if wall_seconds > 0 else float("nan"),
+        }
+
+    def _subscribe(self):
+        for eid in self.crosswalk_ids:
+            self.conn.edge.subscribe(eid, [tc.LAST_STEP_PERSON_ID_LIST])
+        for edge in self.vehicle_edges:
+            self.conn.edge.subscribe(edge, [tc.LAST_STEP_VEHICLE_NUMBER, tc.VAR_WAITING_TIME])
+
+        # Pedestrians (and optionally vehicles) enter and leave their registry through the
+        # departed/arrived lists. SUMO accumulates those over a whole
+        # simulationStep(targetTime) call, so nothing is missed when fast-forwarding.
+        self.persons = EntityRegistry(self.conn.person)
+        self._registries = [(tc.VAR_DEPARTED_PERSONS_IDS, tc.VAR_ARRIVED_PERSONS_IDS, self.persons)]
+        self.vehicles = None
+        if self.track_vehicles:
+            self.vehicles = EntityRegistry(self.conn.vehicle)
+            self._registries.append((tc.VAR_DEPARTED_VEHICLES_IDS, tc.VAR_ARRIVED_VEHICLES_IDS, self.vehicles))
+        self.conn.simulation.subscribe([var for departed, arrived, _ in self._registries
+                                        for var in (departed, arrived)])
+        for _, _, registry in self._registries:
+            registry.depart(registry.domain.getIDList())
+
+    def _subscribe_departed(self):
+        results = self.conn.simulation.getSubscriptionResults()
+        for departed, arrived, registry in self._registries:
+            registry.depart(results[departed])
+            registry.arrive(results[arrived])
+
+    def _read_subscriptions(self):
+        self._edge_results = self.conn.edge.getAllSubscriptionResults()
+        for _, _, registry in self._registries:
+            registry.update()
+        self.persons.place({eid: self._edge_results[eid][tc.LAST_STEP_PERSON_ID_LIST]
+                            for eid in self.crosswalk_ids})
+
+    def entity_registries(self):
+        # (pedestrian, vehicle) EntityRegistry tables after the last step, for per-entity
+        # statistics (utils/stats.EntityWaitTracker)
+        if not (self.use_subscriptions and self.track_vehicles):
+            raise ValueError("per-entity waits need use_subscriptions=True and track_vehicles=True")
+        return self.persons, self.vehicles
 
     def _get_observation(self):
+        with self.profiler.stage("observe"):
+            return self._gather_observation()
+
+    def _gather_observation(self):
+        if not self.use_subscriptions:
+            return self._poll_observation()
+
+        self._read_subscriptions()
+        n_crosswalks = len(self.crosswalk_ids)
+        obs = np.empty(2 * n_crosswalks + len(self.vehicle_edges), dtype=np.float32)
+
+        # 1) count & max‐wait on each pedestrian queue edge
+        counts, max_waits = self.persons.waiting_by_group(self._crosswalk_group, n_crosswalks)
+        obs[0:2 * n_crosswalks:2] = counts
+        obs[1:2 * n_crosswalks:2] = max_waits
+
+        # 2) vehicle counts on each incoming edge
+        obs[2 * n_crosswalks:] = [self._edge_results[edge][tc.LAST_STEP_VEHICLE_NUMBER]
+                                  for edge in self.vehicle_edges]
+        return obs
+
+    def _poll_observation(self):
             obs = []
 
             # 1) count & max‐wait on each pedestrian queue edge
             for eid in self.crosswalk_ids:
-                pids = traci.edge.getLastStepPersonIDs(eid)
+                pids = self.conn.edge.getLastStepPersonIDs(eid)
                 num_wait, max_wait = 0, 0
                 for pid in pids:
-                    w = traci.person.getWaitingTime(pid)
+                    w = self.conn.person.getWaitingTime(pid)
                     if w > 0:
                         num_wait  += 1
                         max_wait  = max(max_wait, w)
@@ -120,7 +471,7 @@ class SingleAgentCrosswalkEnv(gym.Env):
 
             # 2) vehicle counts on each incoming edge
             for edge in self.vehicle_edges:
-                obs.append(traci.edge.getLastStepVehicleNumber(edge))
+                obs.append(self.conn.edge.getLastStepVehicleNumber(edge))
 
             # 3) debug print to confirm
             # print(f"[Obs] ped_counts&max = {obs[:8]}, veh_counts = {obs[8:]}")
@@ -129,35 +480,44 @@ class SingleAgentCrosswalkEnv(gym.Env):
 
 
     def _compute_reward(self):
-        # 1) Compute total pedestrian waiting time
-        total_ped_wait = sum(
-            traci.person.getWaitingTime(pid)
-            for pid in traci.person.getIDList()
-        )
-
-        # 2) Compute total vehicle delay
-        total_veh_delay = sum(
-            traci.edge.getWaitingTime(edge)
-            for edge in self.vehicle_edges
-        )
-
-        # 3) Compute total frustration for pedestrians waiting over 60 seconds
-        FRUSTRATION_LIMIT = 10000  # max frustration contribution per pedestrian
-        total_frustration = sum(
-            min(np.exp(self.alpha * (traci.person.getWaitingTime(pid) - 60)), FRUSTRATION_LIMIT)
-            for pid in traci.person.getIDList()
-            if traci.person.getWaitingTime(pid) > 60
-        )
-
-        # 4) Compute each weighted component
-        ped_term = self.ped_weight * total_ped_wait
-        veh_term = self.veh_weight * total_veh_delay
-        frust_term = self.gamma * total_frustration
-
-        # 5) Sum them (and negate for minimization)
+        with self.profiler.stage("reward"):
+            return self._evaluate_reward()
+
+    def _evaluate_reward(self):
+        # Gather every input once per step, then evaluate the reward engine on arrays
+        if self.use_subscriptions:
+            # Reads the table refreshed by _get_observation() for this step
+            ped_waits = self.persons.waits()
+            veh_delays = [self._edge_results[edge][tc.VAR_WAITING_TIME] for edge in self.vehicle_edges]
+        else:
+            ped_waits = np.array([self.conn.person.getWaitingTime(pid)
+                                  for pid in self.conn.person.getIDList()], dtype=np.float64)
+            veh_delays = [self.conn.edge.getWaitingTime(edge) for edge in self.vehicle_edges]
+        # Sorted by value, so the float sums do not depend on the order entities are listed in
+        ped_waits = np.sort(ped_waits)
+
+        self.last_reward_inputs = (ped_waits, veh_delays)
+        total_ped_wait, total_veh_delay, total_frustration = reward_components(
+            ped_waits, veh_delays, self.alpha)
+        ped_term, veh_term, frust_term = weighted_terms(
+            total_ped_wait, total_veh_delay, total_frustration,
+            self.ped_weight, self.veh_weight, self.gamma)
+
+        # Sum them (and negate for minimization)
         reward = -(ped_term + veh_term + frust_term)
 
-        # 6) Debug print breakdown
+        acc = self._episode_acc
+        acc["ped_wait_sum"] += total_ped_wait
+        acc["ped_samples"] += ped_waits.size
+        if ped_waits.size:
+            acc["max_ped_wait"] = max(acc["max_ped_wait"], float(ped_waits.max()))
+        acc["frustration"] += frust_term
+        acc["veh_delay"] += total_veh_delay
+        if self.telemetry:
+            self._reward_terms = (ped_term, veh_term, frust_term, total_ped_wait, total_veh_delay,
+                                  total_frustration, ped_waits.size, int((ped_waits > 0).sum()))
+
+        # Debug print breakdown
         # print(
         #     f"[Reward Breakdown]\n"
         #     f"  ped_term   = {self.ped_weight} * {total_ped_wait:.1f} = {ped_term:.1f}\n"
@@ -166,13 +526,33 @@ class SingleAgentCrosswalkEnv(gym.Env):
         #     f"→ reward    = -({ped_term:.1f} + {veh_term:.1f} + {frust_term:.1f}) = {reward:.1f}"
         # )
 
-        return reward
+        return float(reward)
 
 
 
     def _check_termination(self):
         return self.step_count >= self.max_steps
 
+    def profile_summary(self):
+        return self.profiler.summary()
+
     def close(self):
-        if traci.isLoaded():
-            traci.close()
+        self._close_connection()
+        if self._pool_route is not None:
+            self.scenario_pool.release(self._pool_route)
+            self._pool_route = None
+        if self.profile_trace and self.profiler.events:
+            self.profiler.write_chrome_trace(self.profile_trace.format(label=self.label))
+        if self._owns_pool:
+            self.scenario_pool.close()
+
+    def _close_connection(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.close()
+        except _TRACI_ERRORS:
+            # SUMO already went away (crash or killed worker); nothing to flush
+            pass
+        finally:
+            self.conn = None
@@ -0,0 +1,454 @@
+import numpy as np
+import gymnasium as gym
+import sumolib
+from stable_baselines3.common.vec_env import VecEnv
+
+from env.net_topology import discover_intersections
+from env.reward import reward_components, weighted_terms
+
+# Saturation flow of one signalized lane (vehicles per second of green, ~2 s headway)
+SATURATION_FLOW = 0.5
+# SUMO's default pedestrian type (persons without a type="..." vType). The generator's
+# personType="pedestrian" attribute is not a SUMO attribute, so its speed="1.0" never applies.
+PED_SPEED = 1.39
+# Pedestrians in SUMO's striping model walk ~11% slower than their desired
+# speed on this net (measured per person over TraCI, see eval/calibrate_surrogate.py)
+PED_WALK_FACTOR = 1.11
+
+
+def _points(shape):
+    return np.array([[float(v) for v in point.split(",")[:2]] for point in shape.split()])
+
+
+class SurrogateNet:
+    # What the surrogate needs from the .net.xml of one signalized intersection: the agent's
+    # signal program, the incoming edges and walking areas in observation order, every
+    # vehicle movement (incoming edge -> outgoing edge) with its lanes and link indices, the
+    # link index of every crossing, edge lengths and speeds for free-flow travel times, and
+    # the pedestrian graph (which walking areas each crossing and sidewalk touch).
+    def __init__(self, net_file, tl_id="TL"):
+        (inter,) = [i for i in discover_intersections(net_file) if i.tl_id == tl_id]
+        self.program = inter.program
+        self.vehicle_edges = inter.vehicle_edges
+        self.crosswalk_ids = inter.crosswalk_ids
+        self.crossings = inter.crossings
+
+        self.lengths, self.speeds = {}, {}
+        movement_links = {}
+        crossing_links = {}
+        area_shapes, crossing_ends, self._sidewalk_ends = {}, {}, {}
+        for element in sumolib.xml.parse(net_file, ["edge", "connection"]):
+            if element.name == "edge":
+                lanes = element.lane
+                self.lengths[element.id] = float(lanes[0].length)
+                self.speeds[element.id] = max(float(lane.speed) for lane in lanes)
+                if element.id in self.crosswalk_ids:
+                    area_shapes[element.id] = _points(lanes[0].shape)
+                elif element.id in self.crossings:
+                    crossing_ends[element.id] = _points(lanes[0].shape)[[0, -1]]
+                elif element.function is None:
+                    for lane in lanes:
+                        if lane.allow and "pedestrian" in lane.allow.split():
+                            self._sidewalk_ends[element.id] = _points(lane.shape)[[0, -1]]
+            elif element.tl == tl_id:
+                index = int(element.linkIndex)
+                if element.to in self.crossings:
+                    crossing_links[element.to] = index
+                elif not element.attr_from.startswith(":"):
+                    movement_links.setdefault((element.attr_from, element.to), []).append(index)
+
+        self.movements = sorted(movement_links, key=lambda m: min(movement_links[m]))
+        self.movement_approach = np.array([self.vehicle_edges.index(m[0]) for m in self.movements])
+        self.movement_lanes = np.array([len(movement_links[m]) for m in self.movements])
+
+        # Share of a movement's links (and whether a crossing's link) is green in each phase;
+        # an extra all-red row at the end serves index -1 (env not advancing this second)
+        states = self.program.states
+        self.movement_green = np.zeros((len(states) + 1, len(self.movements)))
+        self.crossing_green = np.zeros((len(states) + 1, len(self.crossings)), dtype=bool)
+        for p, state in enumerate(states):
+            for m, movement in enumerate(self.movements):
+                links = movement_links[movement]
+                self.movement_green[p, m] = sum(state[i] in "Gg" for i in links) / len(links)
+            for c, crossing in enumerate(self.crossings):
+                self.crossing_green[p, c] = state[crossing_links[crossing]] in "Gg"
+
+        # Walking areas are joined to crossings and sidewalks by geometry (nearest corner)
+        self._area_shapes = [area_shapes[w] for w in self.crosswalk_ids]
+        self.crossing_areas = [tuple(self._nearest_area(p) for p in crossing_ends[c])
+                               for c in self.crossings]
+
+    def _nearest_area(self, point):
+        return int(np.argmin([np.linalg.norm(shape - point, axis=1).min() for shape in self._area_shapes]))
+
+    def sidewalk_area(self, edge, at_start):
+        # Walking area at the start (outgoing edge) or end (incoming edge) of a sidewalk
+        first, last = self._sidewalk_ends[edge]
+        return self._nearest_area(first if at_start else last)
+
+    def crossing_path(self, start, goal):
+        # Fewest crossings from one walking area to another: [(crossing, next area), ...]
+        paths = {start: []}
+        frontier = [start]
+        while frontier and goal not in paths:
+            area = frontier.pop(0)
+            for c, ends in enumerate(self.crossing_areas):
+                if area in ends:
+                    other = ends[1] if ends[0] == area else ends[0]
+                    if other not in paths:
+                        paths[other] = paths[area] + [(c, other)]
+                        frontier.append(other)
+        return paths.get(goal, [])
+
+
+class SurrogateDemand:
+    # The trips of one route file (as written by generator/route_generator.py) reduced to
+    # what the queueing model needs:
+    #   vehicles:    departure, arrival at the stop line (free-flow travel over the incoming
+    #                edge), movement and FIFO rank within the movement
+    #   pedestrians: departure, walking time to the first curb, then per crossing stage the
+    #                walking area (observation slot) they wait on, the crossing they wait
+    #                for and the time to walk over it to the next walking area. SUMO routes
+    #                a walk to the far side of its destination sidewalk, so a listed single
+    #                crossing can take a second one (e.g. N2TL -> TL2E crosses twice).
+    def __init__(self, route_file, net, walk_factor=PED_WALK_FACTOR):
+        v_types, p_types = {}, {}
+        vehicles, persons = [], []
+        for element in sumolib.xml.parse(route_file, ["vType", "vehicle", "person"]):
+            if element.name == "vType":
+                v_types[element.id] = float(element.maxSpeed or "inf")
+                if element.vClass == "pedestrian":
+                    p_types[element.id] = float(element.maxSpeed or element.speed or PED_SPEED)
+            elif element.name == "vehicle":
+                edges = element.route[0].edges.split()
+                max_speed = v_types.get(element.type, float("inf"))
+                travel = net.lengths[edges[0]] / min(net.speeds[edges[0]], max_speed)
+                vehicles.append((float(element.depart), travel, net.movements.index(tuple(edges[:2]))))
+            elif element.name == "person":
+                stages = self._walk_stages(element.walk[0].edges.split(), net)
+                if stages is None:
+                    continue
+                pace = walk_factor / p_types.get(element.type, PED_SPEED)
+                walk, stages = stages
+                persons.append((float(element.depart), walk * pace,
+                                [(area, c, distance * pace) for area, c, distance in stages]))
+
+        vehicles = np.array(vehicles, dtype=np.float64).reshape(-1, 3)
+        self.veh_depart = vehicles[:, 0]
+        self.veh_arrive = vehicles[:, 0] + vehicles[:, 1]
+        self.veh_movement = vehicles[:, 2].astype(np.intp)
+        # FIFO position within the movement, by stop-line arrival
+        self.veh_rank = np.zeros(len(vehicles), dtype=np.int64)
+        for m in range(len(net.movements)):
+            members = np.flatnonzero(self.veh_movement == m)
+            self.veh_rank[members[np.argsort(self.veh_arrive[members], kind="stable")]] = \
+                np.arange(len(members))
+
+        # Stage arrays get one padding column, indexed once a pedestrian is across
+        n_stages = max((len(p[2]) for p in persons), default=0) + 1
+        self.ped_depart = np.array([p[0] for p in persons], dtype=np.float64)
+        self.ped_walk = np.array([p[1] for p in persons], dtype=np.float64)
+        self.ped_stages = np.array([len(p[2]) for p in persons], dtype=np.intp)
+        self.ped_slot = np.zeros((len(persons), n_stages), dtype=np.intp)
+        self.ped_crossing = np.zeros((len(persons), n_stages), dtype=np.intp)
+        self.ped_cross_time = np.zeros((len(persons), n_stages))
+        for i, (_, _, stages) in enumerate(persons):
+            for k, (area, c, cross_time) in enumerate(stages):
+                self.ped_slot[i, k], self.ped_crossing[i, k], self.ped_cross_time[i, k] = area, c, cross_time
+
+    @staticmethod
+    def _walk_stages(edges, net):
+        # (distance to the first curb, [(walking area, crossing, crossing distance), ...]),
+        # or None for walks that never cross at this intersection
+        listed = [i for i, e in enumerate(edges) if e in net.crossings]
+        if not listed:
+            return None
+        area = net.crosswalk_ids.index(edges[listed[0] - 1])
+        path = []
+        for i in listed:
+            c = net.crossings.index(edges[i])
+            ends = net.crossing_areas[c]
+            other = ends[1] if ends[0] == area else ends[0]
+            path.append((c, other))
+            area = other
+        destination = next((e for e in edges[listed[-1]:] if e in net._sidewalk_ends), None)
+        if destination is not None:
+            path += net.crossing_path(area, net.sidewalk_area(destination, at_start=True))
+
+        area = net.crosswalk_ids.index(edges[listed[0] - 1])
+        stages = []
+        for c, other in path:
+            # over the crossing and through the walking area on the far side
+            stages.append((area, c, net.lengths[net.crossings[c]] + net.lengths[net.crosswalk_ids[other]]))
+            area = other
+        return sum(net.lengths[e] for e in edges[:listed[0]]), stages
+
+    def arrivals(self, horizon, n_movements):
+        # (horizon + 1, n_movements): vehicles that reached the stop line by second t
+        table = np.zeros((horizon + 1, n_movements), dtype=np.int64)
+        seconds = np.minimum(np.ceil(self.veh_arrive).astype(np.int64), horizon + 1)
+        np.add.at(table, (seconds[seconds <= horizon], self.veh_movement[seconds <= horizon]), 1)
+        return np.cumsum(table, axis=0)
+
+
+class SurrogateCrosswalkVecEnv(VecEnv):
+    # Pure-NumPy queueing surrogate of SingleAgentCrosswalkEnv on the intersection/ scenario,
+    # as an SB3 VecEnv of n_envs independent intersections advanced together:
+    #
+    #   vehicles     travel the incoming edge at free-flow speed, queue FIFO per movement at
+    #                the stop line and discharge at SATURATION_FLOW per lane while the
+    #                movement is green; queued vehicles wait while their movement is red
+    #   pedestrians  walk to their walking area at their walking speed (with SUMO's default
+    #                speed deviation unless ped_speed_dev=0), wait there until their
+    #                crossing is green, cross, and repeat for a second crossing if their
+    #                route has one
+    #
+    # Observation layout, action map, phase schedules (the net's signal program) and reward
+    # (env/reward.py) are the same as the SUMO env, so a policy trained here can be
+    # fine-tuned there. Each env replays one of route_files; a finished episode resets with
+    # a randomly drawn one. See eval/calibrate_surrogate.py for how close it gets to SUMO.
+    def __init__(self, net_file, route_files, n_envs=1024, max_steps=1000,
+                 alpha=0.01, gamma=0.0, ped_weight=1.0, veh_weight=1.0,
+                 saturation_flow=SATURATION_FLOW, ped_speed_dev=0.1, telemetry=False, seed=None):
+        self.render_mode = None
+        self.net = SurrogateNet(net_file)
+        self.agent_action_map = {0: 0, 1: 3, 2: 4, 3: 7}
+        self.schedules = self.net.program.compile(self.agent_action_map)
+        observation_space = gym.spaces.Box(low=0, high=100, shape=(12,), dtype=np.float32)
+        action_space = gym.spaces.Discrete(len(self.agent_action_map))
+        super().__init__(n_envs, observation_space, action_space)
+
+        self.max_steps = max_steps
+        self.alpha = alpha
+        self.gamma = gamma
+        self.ped_weight = ped_weight
+        self.veh_weight = veh_weight
+        self.ped_speed_dev = ped_speed_dev
+        self.telemetry = telemetry
+        self.rng = np.random.default_rng(seed)
+
+        # Per-second phase timelines of every (previous action, action) schedule, padded
+        # with -1; row len(action_map) of the first axis stands for "no previous action"
+        n_actions = len(self.agent_action_map)
+        longest = max(sum(d for _, d in segments) for segments in self.schedules.values())
+        self._timelines = np.full((n_actions + 1, n_actions, longest), -1, dtype=np.intp)
+        for (prev, action), segments in self.schedules.items():
+            seconds = [phase for phase, duration in segments for _ in range(duration)]
+            self._timelines[n_actions if prev is None else prev, action, :len(seconds)] = seconds
+        self._no_prev = n_actions
+
+        # Demand: one entry per route file, entity arrays padded to the largest file with
+        # trips that never arrive
+        if isinstance(route_files, str):
+            route_files = [route_files]
+        self.route_files = list(route_files)
+        demands = [SurrogateDemand(path, self.net) for path in self.route_files]
+        horizon = max_steps + longest
+        n_movements = len(self.net.movements)
+        self._horizon = horizon
+        self._arrivals = np.stack([d.arrivals(horizon, n_movements) for d in demands])
+        self._veh = self._pad(demands, ["veh_depart", "veh_arrive", "veh_movement", "veh_rank"],
+                              [np.inf, np.inf, 0, 0])
+        self._ped = self._pad(demands, ["ped_depart", "ped_walk", "ped_stages", "ped_slot",
+                                        "ped_crossing", "ped_cross_time"], [np.inf, 0.0, 0, 0, 0, 0.0])
+        self._rates = self.net.movement_lanes * saturation_flow
+
+        n = n_envs
+        self.scenario = np.arange(n) % len(demands)
+        self.t = np.zeros(n, dtype=np.int64)
+        self.phase = np.full(n, -1, dtype=np.intp)
+        self.last_action = np.full(n, self._no_prev, dtype=np.intp)
+        self.served = np.zeros((n, n_movements))
+        self.last_green = np.full((n, n_movements), -np.inf)
+        # Per pedestrian: when it reaches the curb of its current walking area (inf once
+        # across), which crossing stage it is on, and its speed factor
+        n_peds = self._ped["ped_depart"].shape[1]
+        self._ped_index = np.arange(n_peds)[None, :]
+        self.ped_ready = np.full((n, n_peds), np.inf)
+        self.ped_stage = np.zeros((n, n_peds), dtype=np.intp)
+        self.ped_pace = np.ones((n, n_peds))
+        self.episode_reward = np.zeros(n)
+        self._actions = None
+
+    @staticmethod
+    def _pad(demands, fields, fills):
+        padded = {}
+        for field, fill in zip(fields, fills):
+            rows = [getattr(d, field) for d in demands]
+            shape = np.max([row.shape for row in rows], axis=0)
+            out = np.full((len(demands), *shape), fill, dtype=rows[0].dtype)
+            for i, row in enumerate(rows):
+                out[(i, *(slice(0, n) for n in row.shape))] = row
+            padded[field] = out
+        return padded
+
+    # ─── VecEnv API ────────────────────────────────────────
+
+    def reset(self):
+        for i, seed in enumerate(self._seeds):
+            if seed is not None:
+                self.rng = np.random.default_rng(seed)
+                break
+        self._seeds = [None] * self.num_envs
+        self._reset_envs(np.arange(self.num_envs), keep_scenario=True)
+        return self._observe()[0]
+
+    def step_async(self, actions):
+        # copied: last_action keeps it, and resets write into last_action
+        self._actions = np.array(actions, dtype=np.intp).reshape(-1)
+
+    def step_wait(self):
+        actions = self._actions
+        timeline = self._timelines[self.last_action, actions]
+        for k in range(timeline.shape[1]):
+            phase = timeline[:, k]
+            active = phase >= 0
+            if not active.any():
+                break
+            self._tick(phase, active)
+        self.last_action = actions
+
+        obs, rewards, terms = self._observe()
+        self.episode_reward += rewards
+        dones = self.t >= self.max_steps
+        infos = [{} for _ in range(self.num_envs)]
+        if self.telemetry:
+            for i, row in enumerate(self._telemetry_rows(rewards, obs, terms)):
+                infos[i]["telemetry"] = row
+        done_envs = np.flatnonzero(dones)
+        if done_envs.size:
+            for i in done_envs:
+                infos[i]["terminal_observation"] = obs[i].copy()
+                infos[i]["episode_reward"] = float(self.episode_reward[i])
+            self._reset_envs(done_envs)
+            obs[done_envs] = self._observe(done_envs)[0]
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+    # ─── Model ─────────────────────────────────────────────
+
+    def _reset_envs(self, envs, keep_scenario=False):
+        if not keep_scenario:
+            self.scenario[envs] = self.rng.integers(len(self.route_files), size=len(envs))
+        self.t[envs] = 0
+        self.phase[envs] = -1
+        self.last_action[envs] = self._no_prev
+        self.served[envs] = 0.0
+        self.last_green[envs] = -np.inf
+        self.episode_reward[envs] = 0.0
+
+        scenario = self.scenario[envs]
+        pace = np.ones((len(envs), self.ped_pace.shape[1]))
+        if self.ped_speed_dev:
+            # SUMO's default speedFactor: normal(1, dev) truncated to [0.2, 2]
+            pace = 1.0 / np.clip(self.rng.normal(1.0, self.ped_speed_dev, size=pace.shape), 0.2, 2.0)
+        self.ped_pace[envs] = pace
+        self.ped_stage[envs] = 0
+        self.ped_ready[envs] = np.where(self._ped["ped_stages"][scenario] > 0,
+                                        self._ped["ped_depart"][scenario] + self._ped["ped_walk"][scenario] * pace,
+                                        np.inf)
+
+    def _tick(self, phase, active):
+        # One simulated second for every active env
+        self.t += active
+        self.phase = np.where(active, phase, self.phase)
+        green = self.net.movement_green[phase]
+        arrived = self._arrivals[self.scenario, np.minimum(self.t, self._horizon)]
+        self.served = np.minimum(self.served + self._rates * green, arrived)
+        self.last_green = np.where(green > 0, self.t[:, None], self.last_green)
+        crossing_green = self.net.crossing_green[phase]
+        if crossing_green.any():
+            self._cross(crossing_green)
+
+    def _cross(self, crossing_green):
+        # Pedestrians at the curb of a green crossing start over it
+        scenario = self.scenario[:, None]
+        stage = self.ped_stage
+        crossing = self._ped["ped_crossing"][scenario, self._ped_index, stage]
+        go = (self.ped_ready <= self.t[:, None]) & np.take_along_axis(crossing_green, crossing, axis=1)
+        if not go.any():
+            return
+        cross_time = self._ped["ped_cross_time"][scenario, self._ped_index, stage] * self.ped_pace
+        self.ped_stage = stage + go
+        across = self.ped_stage >= self._ped["ped_stages"][self.scenario]
+        self.ped_ready = np.where(go, np.where(across, np.inf, self.t[:, None] + cross_time), self.ped_ready)
+
+    def _vehicle_state(self, envs):
+        # (on the incoming edge, waiting time) of every vehicle slot
+        scenario = self.scenario[envs]
+        t = self.t[envs, None]
+        movement = self._veh["veh_movement"][scenario]
+        served = self._veh["veh_rank"][scenario] < np.floor(
+            np.take_along_axis(self.served[envs], movement, axis=1))
+        arrive = self._veh["veh_arrive"][scenario]
+        on_edge = (self._veh["veh_depart"][scenario] <= t) & ~served
+        red = np.take_along_axis(self.net.movement_green[self.phase[envs]], movement, axis=1) == 0
+        stopped = on_edge & (arrive <= t) & red
+        since = np.maximum(arrive, np.take_along_axis(self.last_green[envs], movement, axis=1))
+        waits = np.where(stopped, t - since, 0.0)
+        return on_edge, stopped, waits, self.net.movement_approach[movement]
+
+    def _pedestrian_waits(self, envs):
+        # (waiting time, walking area slot) of every pedestrian slot
+        ready = self.ped_ready[envs]
+        t = self.t[envs, None]
+        slots = self._ped["ped_slot"][self.scenario[envs, None], self._ped_index, self.ped_stage[envs]]
+        return np.where(ready <= t, t - ready, 0.0), slots
+
+    def _observe(self, envs=None):
+        envs = np.arange(self.num_envs) if envs is None else envs
+        ped_waits, slots = self._pedestrian_waits(envs)
+        on_edge, _, veh_waits, approach = self._vehicle_state(envs)
+
+        obs = np.zeros((len(envs), 12), dtype=np.float32)
+        veh_delays = np.zeros((len(envs), 4))
+        for i in range(4):
+            at_slot = (slots == i) & (ped_waits > 0)
+            obs[:, 2 * i] = at_slot.sum(axis=1)
+            obs[:, 2 * i + 1] = np.where(at_slot, ped_waits, 0.0).max(axis=1, initial=0.0)
+            on_approach = approach == i
+            obs[:, 8 + i] = (on_edge & on_approach).sum(axis=1)
+            veh_delays[:, i] = np.where(on_approach, veh_waits, 0.0).sum(axis=1)
+
+        totals = reward_components(ped_waits, veh_delays, self.alpha)
+        terms = weighted_terms(*totals, self.ped_weight, self.veh_weight, self.gamma)
+        rewards = -(terms[0] + terms[1] + terms[2])
+        return obs, rewards, (terms, totals, ped_waits)
+
+    def queue_lengths(self):
+        # (n_envs, 4) stopped vehicles per incoming edge, comparable to SUMO's halting number
+        envs = np.arange(self.num_envs)
+        _, stopped, _, approach = self._vehicle_state(envs)
+        return np.stack([(stopped & (approach == i)).sum(axis=1) for i in range(4)], axis=1)
+
+    def _telemetry_rows(self, rewards, obs, terms):
+        (ped_term, veh_term, frust_term), (total_ped_wait, total_veh_delay, total_frustration), \
+            ped_waits = terms
+        return [{
+            "reward": float(rewards[i]),
+            "ped_term": float(ped_term[i]),
+            "veh_term": float(veh_term[i]),
+            "frust_term": float(frust_term[i]),
+            "total_ped_wait": float(total_ped_wait[i]),
+            "total_veh_delay": float(total_veh_delay[i]),
+            "total_frustration": float(total_frustration[i]),
+            "n_waiting_peds": int((ped_waits[i] > 0).sum()),
+            "n_vehicles": int(obs[i, 8:].sum()),
+            "sim_time": int(self.t[i]),
+            "phase": int(self.phase[i]),
+        } for i in range(self.num_envs)]
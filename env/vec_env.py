@@ -0,0 +1,154 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from gymnasium.wrappers import TimeLimit
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from utils.transition_store import TransitionRecorder
+
+VEC_ENVS = ("dummy", "subproc", "thread")
+
+
+def make_env(rank, log_dir=None, max_episode_steps=1000, record_dir=None, resume=False, **env_kwargs):
+    # Returns a picklable thunk so SubprocVecEnv can build the env inside the worker,
+    # where it starts its own SUMO process on a free port under its own label.
+    # record_dir additionally appends every transition to a TransitionRecorder dataset.
+    # resume appends to existing monitor files instead of overwriting them.
+    def _init():
+        env = SingleAgentCrosswalkEnv(log_dir=log_dir, **env_kwargs)
+        env = TimeLimit(env, max_episode_steps=max_episode_steps)
+        if record_dir is not None:
+            env = TransitionRecorder(env, record_dir, prefix=f"env{rank}")
+        if log_dir is None:
+            return Monitor(env)
+        # Keep the historical monitor.csv name for the first worker
+        monitor_name = "monitor.csv" if rank == 0 else f"{rank}.monitor.csv"
+        return Monitor(env, filename=os.path.join(log_dir, monitor_name), override_existing=not resume)
+    return _init
+
+
+class ThreadedVecEnv(DummyVecEnv):
+    # Steps every env in its own worker thread of this process. With the TraCI backend each env
+    # drives its own SUMO process over a socket and the GIL is released while a worker waits
+    # for SUMO, so the simulations advance in parallel, and the main thread is free to run the
+    # policy meanwhile. Unlike SubprocVecEnv there is no pickling of observations and infos,
+    # and no Python process per env.
+    #
+    # step_async()/step_wait() keep the VecEnv contract (all envs step together, as PPO expects).
+    # send()/recv() additionally step any subset of envs and return whichever finished, so a
+    # rollout loop can run batched inference on the ready envs while the others simulate:
+    #
+    #   env.send(actions)                         # all envs start simulating
+    #   while collecting:
+    #       idx, obs, rewards, dones, infos = env.recv()
+    #       env.send(policy(obs), idx)
+    #
+    # libsumo is one simulation per process, so it cannot back more than one threaded env.
+    # get_attr()/env_method() touch the envs directly; call them only while no env is stepping.
+    def __init__(self, env_fns):
+        super().__init__(env_fns)
+        self._pool = ThreadPoolExecutor(max_workers=self.num_envs, thread_name_prefix="sumo-env")
+        self._pending = {}                 # env index -> Future of the step in flight
+        self._finished = queue.SimpleQueue()
+
+    def _step_env(self, env_idx, action):
+        env = self.envs[env_idx]
+        obs, reward, terminated, truncated, info = env.step(action)
+        info["TimeLimit.truncated"] = truncated and not terminated
+        reset_info = None
+        if terminated or truncated:
+            # save final observation where user can get it, then reset (as in DummyVecEnv)
+            info["terminal_observation"] = obs
+            obs, reset_info = env.reset()
+        return obs, reward, terminated or truncated, info, reset_info
+
+    def send(self, actions, indices=None):
+        # Starts stepping the given envs (default: all) without waiting for them
+        for env_idx, action in zip(self._get_indices(indices), actions):
+            if env_idx in self._pending:
+                raise RuntimeError(f"env {env_idx} is still stepping; recv() it first")
+            future = self._pool.submit(self._step_env, env_idx, action)
+            self._pending[env_idx] = future
+            future.add_done_callback(lambda _, i=env_idx: self._finished.put(i))
+
+    def recv(self, min_ready=1):
+        # Blocks until at least min_ready of the stepping envs finished, then returns
+        # (indices, obs, rewards, dones, infos) of every env that has finished by now
+        ready = [self._finished.get() for _ in range(min(min_ready, len(self._pending)))]
+        while True:
+            try:
+                ready.append(self._finished.get_nowait())
+            except queue.Empty:
+                break
+        for env_idx in ready:
+            obs, reward, done, info, reset_info = self._pending.pop(env_idx).result()
+            self.buf_rews[env_idx] = reward
+            self.buf_dones[env_idx] = done
+            self.buf_infos[env_idx] = info
+            if reset_info is not None:
+                self.reset_infos[env_idx] = reset_info
+            self._save_obs(env_idx, obs)
+        ready = np.array(ready, dtype=np.intp)
+        obs = self.buf_obs[None][ready] if None in self.buf_obs else {k: v[ready] for k, v in self.buf_obs.items()}
+        return (ready, obs, self.buf_rews[ready], self.buf_dones[ready],
+                [self.buf_infos[i] for i in ready])
+
+    def step_async(self, actions):
+        self.send(actions)
+
+    def step_wait(self):
+        self.recv(min_ready=self.num_envs)
+        return (self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones),
+                [dict(info) for info in self.buf_infos])
+
+    def _drain(self):
+        # Lets steps still in flight finish (their results are discarded)
+        while self._pending:
+            self.recv(min_ready=len(self._pending))
+
+    def reset(self):
+        self._drain()
+
+        def _reset(env_idx):
+            maybe_options = {"options": self._options[env_idx]} if self._options[env_idx] else {}
+            return self.envs[env_idx].reset(seed=self._seeds[env_idx], **maybe_options)
+
+        for env_idx, (obs, self.reset_infos[env_idx]) in enumerate(self._pool.map(_reset, range(self.num_envs))):
+            self._save_obs(env_idx, obs)
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs_from_buf()
+
+    def close(self):
+        try:
+            self._drain()
+        finally:
+            list(self._pool.map(lambda env: env.close(), self.envs))
+            self._pool.shutdown()
+
+
+def make_vec_env(n_envs=1, log_dir=None, max_episode_steps=1000, start_method=None, record_dir=None,
+                 vec_env=None, resume=False, **env_kwargs):
+    # vec_env: "dummy", "subproc" or "thread" (ThreadedVecEnv); default DummyVecEnv for a
+    # single env and SubprocVecEnv otherwise
+    env_fns = [make_env(rank, log_dir, max_episode_steps, record_dir, resume, **env_kwargs)
+               for rank in range(n_envs)]
+    if vec_env is None:
+        vec_env = "dummy" if n_envs == 1 else "subproc"
+    if vec_env not in VEC_ENVS:
+        raise ValueError(f"Unknown vec_env {vec_env!r}, expected one of {VEC_ENVS}")
+    # DummyVecEnv and ThreadedVecEnv keep every env in this process, where libsumo envs
+    # would all drive the same single simulation
+    if vec_env in ("dummy", "thread") and n_envs > 1 and env_kwargs.get("backend") == "libsumo":
+        raise ValueError(f"libsumo runs one simulation per process, so vec_env={vec_env!r} cannot "
+                         f"hold {n_envs} envs; use vec_env='subproc' or backend='traci'")
+    if vec_env == "dummy":
+        return DummyVecEnv(env_fns)
+    if vec_env == "thread":
+        return ThreadedVecEnv(env_fns)
+    return SubprocVecEnv(env_fns, start_method=start_method)
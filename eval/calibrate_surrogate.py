@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# Calibration report for the NumPy surrogate (env/surrogate.py): replays the same action
+# sequences on the same demand in SUMO and in the surrogate and compares, per agent step,
+# vehicle counts and queue lengths (halting vehicles) on the incoming edges, vehicle delay,
+# waiting pedestrians and their waits, and the reward.
+#
+#   python eval/calibrate_surrogate.py                          # bundled route file
+#   python eval/calibrate_surrogate.py --demand 300:150 600:300 1200:600 --seeds 0 1
+import os
+import sys
+import tempfile
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from env.surrogate import SATURATION_FLOW, SurrogateCrosswalkVecEnv
+from generator.route_generator import generate_routefile
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+MAX_STEPS  = 1000
+REPLICAS   = 16      # surrogate envs per run (pedestrian speeds vary), averaged per step
+OUT_DIR    = "evaluation_results"
+REWARD_KWARGS = dict(alpha=0.05, gamma=0.1, ped_weight=0.5, veh_weight=0.5)
+METRICS = ["veh_count", "veh_queue", "veh_delay", "waiting_peds", "ped_wait", "max_ped_wait", "reward"]
+# ───────────────────────────────────────────────────────
+
+
+def action_sequence(policy, seed, length=MAX_STEPS):
+    # "cycle" walks through the four actions in order, "random" draws them uniformly
+    if policy == "cycle":
+        return np.arange(length) % 4
+    return np.random.default_rng(seed).integers(4, size=length)
+
+
+def run_sumo(route, actions, log_dir, backend="traci"):
+    env = SingleAgentCrosswalkEnv(
+        net_file=SUMO_NET,
+        route_file=route,
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        log_dir=log_dir,
+        backend=backend,
+        telemetry=True,
+        **REWARD_KWARGS
+    )
+    rows = []
+    try:
+        env.reset(seed=0)
+        for action in actions:
+            obs, reward, done, _, info = env.step(int(action))
+            telemetry = info["telemetry"]
+            rows.append({
+                "sim_time": env.sim_time,
+                "veh_count": obs[8:].sum(),
+                "veh_queue": sum(env.conn.edge.getLastStepHaltingNumber(e) for e in env.vehicle_edges),
+                "veh_delay": telemetry["total_veh_delay"],
+                "waiting_peds": obs[0:8:2].sum(),
+                "ped_wait": telemetry["total_ped_wait"],
+                "max_ped_wait": obs[1:8:2].max(),
+                "reward": reward,
+            })
+            if done:
+                break
+    finally:
+        env.close()
+    return pd.DataFrame(rows)
+
+
+def run_surrogate(route, actions, replicas=REPLICAS, saturation_flow=SATURATION_FLOW):
+    env = SurrogateCrosswalkVecEnv(SUMO_NET, route, n_envs=replicas, max_steps=MAX_STEPS,
+                                   saturation_flow=saturation_flow, telemetry=True, seed=0,
+                                   **REWARD_KWARGS)
+    rows = []
+    env.reset()
+    for action in actions:
+        env.step_async(np.full(replicas, action))
+        # observe before step_wait auto-resets finished envs
+        obs, reward, done, infos = _step_without_reset(env)
+        queues = env.queue_lengths()
+        rows.append({
+            "sim_time": float(env.t.mean()),
+            "veh_count": obs[:, 8:].sum(axis=1).mean(),
+            "veh_queue": queues.sum(axis=1).mean(),
+            "veh_delay": np.mean([info["telemetry"]["total_veh_delay"] for info in infos]),
+            "waiting_peds": obs[:, 0:8:2].sum(axis=1).mean(),
+            "ped_wait": np.mean([info["telemetry"]["total_ped_wait"] for info in infos]),
+            "max_ped_wait": obs[:, 1:8:2].max(axis=1).mean(),
+            "reward": reward.mean(),
+        })
+        if done.all():
+            break
+    return pd.DataFrame(rows)
+
+
+def _step_without_reset(env):
+    # step_wait() without the auto-reset, so the last step of the episode can be compared
+    max_steps, env.max_steps = env.max_steps, np.inf
+    try:
+        obs, reward, _, infos = env.step_wait()
+    finally:
+        env.max_steps = max_steps
+    return obs, reward, env.t >= max_steps, infos
+
+
+def compare(sumo, surrogate):
+    rows = []
+    steps = min(len(sumo), len(surrogate))
+    for metric in METRICS:
+        a, b = sumo[metric].to_numpy()[:steps], surrogate[metric].to_numpy()[:steps]
+        corr = np.corrcoef(a, b)[0, 1] if a.std() > 0 and b.std() > 0 else float("nan")
+        rows.append({
+            "metric": metric,
+            "sumo_mean": a.mean(),
+            "surrogate_mean": b.mean(),
+            "mean_error": (b.mean() - a.mean()) / abs(a.mean()) if a.mean() else float("nan"),
+            "mae": np.abs(a - b).mean(),
+            "corr": corr,
+        })
+    return rows
+
+
+def calibrate(routes, policies, seeds, out_dir=OUT_DIR, backend="traci", saturation_flow=SATURATION_FLOW):
+    os.makedirs(out_dir, exist_ok=True)
+    summary, steps = [], []
+    for route_name, route in routes.items():
+        for policy in policies:
+            for seed in (seeds if policy == "random" else [0]):
+                actions = action_sequence(policy, seed)
+                print(f"🚦 {route_name} / {policy} seed={seed}")
+                sumo = run_sumo(route, actions, os.path.join(out_dir, "sumo_logs"), backend)
+                surrogate = run_surrogate(route, actions, saturation_flow=saturation_flow)
+                key = {"route": route_name, "policy": policy, "seed": seed}
+                summary += [{**key, **row} for row in compare(sumo, surrogate)]
+                for source, df in (("sumo", sumo), ("surrogate", surrogate)):
+                    steps.append(df.assign(source=source, step=np.arange(len(df)), **key))
+
+    summary = pd.DataFrame(summary)
+    summary.to_csv(os.path.join(out_dir, "surrogate_calibration.csv"), index=False)
+    pd.concat(steps).to_csv(os.path.join(out_dir, "surrogate_calibration_steps.csv"), index=False)
+    return summary
+
+
+def print_report(summary):
+    overall = summary.groupby("metric", sort=False)[["sumo_mean", "surrogate_mean", "mean_error", "mae", "corr"]].mean()
+    for route, group in summary.groupby("route", sort=False):
+        print(f"\n📊 {route}")
+        table = group.groupby("metric", sort=False)[["sumo_mean", "surrogate_mean", "mean_error", "mae", "corr"]].mean()
+        _print_table(table)
+    print("\n📊 all runs")
+    _print_table(overall)
+
+
+def _print_table(table):
+    print(f"{'metric':<14} {'SUMO':>10} {'surrogate':>10} {'mean err':>9} {'MAE':>10} {'corr':>6}")
+    for metric, r in table.iterrows():
+        print(f"{metric:<14} {r.sumo_mean:>10.1f} {r.surrogate_mean:>10.1f} {r.mean_error:>+9.1%} "
+              f"{r.mae:>10.1f} {r['corr']:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=str, nargs="*", default=[SUMO_ROUTE])
+    parser.add_argument("--demand", type=str, nargs="*", default=[],
+                        help="extra generated demands as VEHS_PER_HOUR:PEDS_PER_HOUR")
+    parser.add_argument("--policies", nargs="+", choices=["cycle", "random"], default=["cycle", "random"])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--saturation-flow", type=float, default=SATURATION_FLOW)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--out-dir", type=str, default=OUT_DIR)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        routes = {os.path.basename(r): r for r in args.routes}
+        for spec in args.demand:
+            vehs, peds = (float(x) for x in spec.split(":"))
+            path = os.path.join(tmp, f"demand_{spec.replace(':', '_')}.rou.xml")
+            generate_routefile(path, max_steps=MAX_STEPS, vehs_per_hour=vehs, peds_per_hour=peds,
+                               verbose=False)
+            routes[f"{vehs:g} veh/h, {peds:g} ped/h"] = path
+        summary = calibrate(routes, args.policies, args.seeds, args.out_dir, args.backend,
+                            args.saturation_flow)
+    print_report(summary)
+    print(f"\n📄 Results written to {args.out_dir}/surrogate_calibration.csv and surrogate_calibration_steps.csv")
@@ -1,18 +1,21 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
 import argparse
 import numpy as np
 from collections import Counter
-from stable_baselines3 import PPO
 from stable_baselines3.common.monitor import Monitor
 from gymnasium.wrappers import TimeLimit
-import traci
 import pandas as pd
 
 # so we can import env/
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from env.vec_env import make_vec_env
+from utils.numpy_policy import load_policy
+from utils.profiling import format_summary
+from utils.stats import EntityWaitTracker, RawSampleWriter
 
 # Config
 SUMO_NET = "intersection/environment.net.xml"
@@ -20,19 +23,87 @@ SUMO_ROUTE = "intersection/episode_routes.rou.xml"
 MAX_STEPS = 1000
 EVAL_EPISODES = 1
 
-def print_stats(name, data):
-    if data:
+def print_stats(name, stats):
+    if stats["count"]:
         print(f"\n{name} Wait Time Stats:")
-        print(f"  Count   : {len(data)} (samples)")
-        print(f"  Max     : {np.max(data):.2f} s")
-        print(f"  Min     : {np.min(data):.2f} s")
-        print(f"  Mean    : {np.mean(data):.2f} s")
-        print(f"  Std Dev : {np.std(data):.2f} s")
-        print(f"  95th %  : {np.percentile(data, 95):.2f} s")
+        print(f"  Count   : {stats['count']} (samples)")
+        print(f"  Max     : {stats['max']:.2f} s")
+        print(f"  Min     : {stats['min']:.2f} s")
+        print(f"  Mean    : {stats['mean']:.2f} s")
+        print(f"  Std Dev : {stats['std']:.2f} s")
+        print(f"  95th %  : {stats['p95']:.2f} s")
+        print(f"  99th %  : {stats['p99']:.2f} s")
     else:
         print(f"\n{name} Wait Time Stats: No data collected.")
 
-def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0, veh_weight=1.0):
+class StaticPlan:
+    # Fixed-time baseline: every phase of the net's TL program with its own duration,
+    # ignoring the observation (as in evaluate_baseline.py)
+    def __init__(self, env):
+        self.cycle = env.unwrapped.phase_program.cycle()
+        self.index = 0
+
+    def next_phase(self):
+        phase = self.cycle[self.index % len(self.cycle)]
+        self.index += 1
+        return phase
+
+
+class RandomPolicy:
+    # Uniform random actions from the env's (seeded) action space
+    def __init__(self, action_space, seed=None):
+        self.action_space = action_space
+        self.action_space.seed(seed)
+
+    def predict(self, obs, deterministic=True):
+        return self.action_space.sample(), None
+
+
+def make_policy(policy, env, seed=None):
+    # "static" / "random" baselines, or a saved model (.zip PPO or .npz NumPy export)
+    if policy == "static":
+        return StaticPlan(env)
+    if policy == "random":
+        return RandomPolicy(env.action_space, seed)
+    return load_policy(policy)
+
+
+def run_episode(env, policy, seed=None, trackers=None, raw_writers=None, step_offset=0):
+    # One episode of `policy` (see make_policy). trackers / raw_writers ({"ped": ...,
+    # "veh": ...}) get every step's waits; raw samples are numbered from step_offset + 1.
+    # Returns the total reward and the action taken at each step (the TL phase played
+    # for StaticPlan).
+    base = env.unwrapped
+    obs, _ = env.reset(seed=seed)
+    total_reward, actions, done = 0.0, [], False
+    while not done:
+        if isinstance(policy, StaticPlan):
+            action = policy.next_phase()
+            obs, reward, terminated, truncated, _ = base.step_phase(*action)
+            action = action[0]
+        else:
+            with base.profiler.stage("inference"):
+                action, _ = policy.predict(obs, deterministic=True)
+            obs, reward, terminated, truncated, _ = env.step(action)
+        done = terminated or truncated
+        total_reward += reward
+        actions.append(int(action))
+
+        # Collect wait times from the env's subscription results
+        if trackers:
+            for kind, registry in zip(("ped", "veh"), base.entity_registries()):
+                trackers[kind].update(registry)
+                if raw_writers and kind in raw_writers:
+                    raw_writers[kind].write(step_offset + len(actions), registry.waits())
+
+    if trackers:
+        for kind, registry in zip(("ped", "veh"), base.entity_registries()):
+            trackers[kind].finish(registry)
+    return total_reward, actions
+
+
+def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0, veh_weight=1.0,
+             backend="traci", raw_format=None, profile=False, trace_path=None):
     env = SingleAgentCrosswalkEnv(
         net_file=SUMO_NET,
         route_file=SUMO_ROUTE,
@@ -42,48 +113,43 @@ def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0,
         alpha=alpha,
         gamma=gamma,
         ped_weight=ped_weight,
-        veh_weight=veh_weight
+        veh_weight=veh_weight,
+        backend=backend,
+        use_subscriptions=True,
+        track_vehicles=True,
+        profile=profile,
+        profile_trace=trace_path
     )
     env = TimeLimit(env, max_episode_steps=MAX_STEPS)
     env = Monitor(env)
 
-    model = PPO.load(model_path, device="cpu")
+    model = load_policy(model_path)
     all_rewards = []
 
-    ped_wait_times = []
-    veh_wait_times = []
-    seen_peds = set()
-    seen_vehs = set()
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    os.makedirs("evaluation_results", exist_ok=True)
+
+    # Online stats instead of keeping every sample; raw samples only if asked for
+    trackers = {"ped": EntityWaitTracker(), "veh": EntityWaitTracker()}
+    raw_writers = {}
+    if raw_format:
+        raw_dir = f"evaluation_results/{model_name}_raw"
+        raw_writers = {kind: RawSampleWriter(os.path.join(raw_dir, kind), fmt=raw_format)
+                       for kind in trackers}
     total_actions = 0
     action_counter = Counter()
 
     for ep in range(EVAL_EPISODES):
-        obs, _ = env.reset()
-        done = False
-        total_reward = 0.0
-
-        while not done:
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, done, truncated, info = env.step(action)
-            total_reward += reward
-            total_actions += 1
-            action_counter[int(action)] += 1
-
-            # Collect wait times and unique counts
-            for person_id in traci.person.getIDList():
-                wait_time = traci.person.getWaitingTime(person_id)
-                ped_wait_times.append(wait_time)
-                seen_peds.add(person_id)
-
-            for veh_id in traci.vehicle.getIDList():
-                wait_time = traci.vehicle.getWaitingTime(veh_id)
-                veh_wait_times.append(wait_time)
-                seen_vehs.add(veh_id)
-
+        total_reward, actions = run_episode(env, model, trackers=trackers, raw_writers=raw_writers,
+                                            step_offset=total_actions)
+        total_actions += len(actions)
+        action_counter.update(actions)
         print(f"Episode {ep + 1}: total reward = {total_reward:.1f}")
         all_rewards.append(total_reward)
 
     env.close()
+    for writer in raw_writers.values():
+        writer.close()
     mean_r = np.mean(all_rewards)
     std_r  = np.std(all_rewards)
 
@@ -91,12 +157,14 @@ def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0,
     print(f"Mean Reward over {EVAL_EPISODES} episodes: {mean_r:.1f} ± {std_r:.1f}")
     
     # Wait time stats
-    print_stats("Pedestrian", ped_wait_times)
-    print_stats("Vehicle", veh_wait_times)
+    print_stats("Pedestrian", trackers["ped"].samples.summary())
+    print_stats("Vehicle", trackers["veh"].samples.summary())
+    print_stats("Pedestrian Final", trackers["ped"].final.summary())
+    print_stats("Vehicle Final", trackers["veh"].final.summary())
 
     # Unique counts
-    ped_count = len(seen_peds)
-    veh_count = len(seen_vehs)
+    ped_count = trackers["ped"].unique
+    veh_count = trackers["veh"].unique
 
     print(f"\nUnique Pedestrians: {ped_count}")
     print(f"Unique Vehicles   : {veh_count}")
@@ -106,10 +174,13 @@ def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0,
     for act, count in sorted(action_counter.items()):
         print(f"  Action {act}: {count} times")
 
-    # Save to CSV
-    os.makedirs("evaluation_results", exist_ok=True)
-    model_name = os.path.basename(model_path).replace('.zip', '')
+    if profile or trace_path:
+        print("\n=== Per-Stage Timing ===")
+        print(format_summary(env.unwrapped.profile_summary(), total_actions))
+        if trace_path:
+            print(f"Chrome trace written to {trace_path}")
 
+    # Save to CSV
     # Reward and count stats
     with open(f"evaluation_results/{model_name}_metrics.csv", "w") as f:
         f.write("metric,value\n")
@@ -123,36 +194,105 @@ def evaluate(model_path, use_gui=False, alpha=0.05, gamma=0.05, ped_weight=1.0,
     hist_df = pd.DataFrame(sorted(action_counter.items()), columns=["action", "count"])
     hist_df.to_csv(f"evaluation_results/{model_name}_action_histogram.csv", index=False)
 
-    # Wait time data
-    max_len = max(len(ped_wait_times), len(veh_wait_times))
-    ped_wait_times_padded = ped_wait_times + [np.nan] * (max_len - len(ped_wait_times))
-    veh_wait_times_padded = veh_wait_times + [np.nan] * (max_len - len(veh_wait_times))
-
-    wait_df = pd.DataFrame({
-        "ped_wait_times": ped_wait_times_padded,
-        "veh_wait_times": veh_wait_times_padded
-    })
+    # Wait time summaries: per-step samples and each entity's final (peak) wait
+    wait_df = pd.DataFrame([
+        {"entity": kind, "stat": stat, **getattr(tracker, stat).summary()}
+        for kind, tracker in trackers.items()
+        for stat in ("samples", "final")
+    ])
     wait_df.to_csv(f"evaluation_results/{model_name}_wait_stats.csv", index=False)
 
     return mean_r
 
+def evaluate_batched(model_path, n_envs, episodes=None, seed=0, alpha=0.05, gamma=0.05,
+                     ped_weight=1.0, veh_weight=1.0, backend="traci"):
+    # K envs in lockstep with one batched forward pass per tick. Each env runs one
+    # episode per round (seeded seed, seed+1, ...); reward only, no wait statistics.
+    episodes = episodes or n_envs
+    vec_env = make_vec_env(
+        n_envs=n_envs,
+        max_episode_steps=MAX_STEPS,
+        net_file=SUMO_NET,
+        route_file=SUMO_ROUTE,
+        use_gui=False,
+        max_steps=MAX_STEPS,
+        alpha=alpha,
+        gamma=gamma,
+        ped_weight=ped_weight,
+        veh_weight=veh_weight,
+        backend=backend
+    )
+    model = load_policy(model_path)
+    all_rewards = []
+    infer_s, decisions = 0.0, 0
+
+    try:
+        for first in range(0, episodes, n_envs):
+            vec_env.seed(seed + first)
+            obs = vec_env.reset()
+            totals = np.zeros(n_envs)
+            running = np.ones(n_envs, dtype=bool)
+            # envs that finish early auto-reset and keep stepping; their results are ignored
+            while running.any():
+                start = time.perf_counter()
+                actions, _ = model.predict(obs, deterministic=True)
+                infer_s += time.perf_counter() - start
+                decisions += int(running.sum())
+                obs, rewards, dones, _ = vec_env.step(actions)
+                totals[running] += rewards[running]
+                running &= ~dones
+            all_rewards.extend(totals[:min(n_envs, episodes - first)])
+    finally:
+        vec_env.close()
+
+    mean_r, std_r = np.mean(all_rewards), np.std(all_rewards)
+    print(f"\n=== Batched Evaluation Results ({n_envs} envs) ===")
+    print(f"Mean Reward over {len(all_rewards)} episodes: {mean_r:.1f} ± {std_r:.1f}")
+    print(f"Inference: {infer_s / max(decisions, 1) * 1e6:.1f} µs/decision, "
+          f"{decisions / max(infer_s, 1e-9):.0f} decisions/s")
+    return mean_r
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--model", required=True, type=str)
+    parser.add_argument("--model", required=True, type=str,
+                        help="SB3 .zip or a NumPy export (.npz) from utils/numpy_policy.py")
+    parser.add_argument("--n-envs", type=int, default=1,
+                        help="> 1: step this many envs in lockstep with batched inference")
     parser.add_argument("--gui", action="store_true")
     parser.add_argument("--episodes", type=int, default=EVAL_EPISODES)
     parser.add_argument("--alpha", type=float, default=0.05)
     parser.add_argument("--gamma", type=float, default=0.00)
     parser.add_argument("--ped-weight", type=float, default=.5)
     parser.add_argument("--veh-weight", type=float, default=.5)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    parser.add_argument("--raw", choices=["npz", "parquet"], default=None,
+                        help="also write raw per-step wait samples in chunks")
+    parser.add_argument("--profile", action="store_true", help="print per-stage timings and TraCI call counts")
+    parser.add_argument("--trace", type=str, default=None, help="write a Chrome trace (implies --profile)")
     args = parser.parse_args()
 
     EVAL_EPISODES = args.episodes
+    if args.n_envs > 1:
+        evaluate_batched(
+            model_path=args.model,
+            n_envs=args.n_envs,
+            episodes=max(args.episodes, args.n_envs),
+            alpha=args.alpha,
+            gamma=args.gamma,
+            ped_weight=args.ped_weight,
+            veh_weight=args.veh_weight,
+            backend=args.backend
+        )
+        sys.exit(0)
     evaluate(
         model_path=args.model,
         use_gui=args.gui,
         alpha=args.alpha,
         gamma=args.gamma,
         ped_weight=args.ped_weight,
-        veh_weight=args.veh_weight
+        veh_weight=args.veh_weight,
+        backend=args.backend,
+        raw_format=args.raw,
+        profile=args.profile,
+        trace_path=args.trace
     )
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Evaluation harness: runs every (policy, seed, scenario) job in its own worker process with
+# its own SUMO instance and aggregates the results into one comparison table. A policy is a
+# PPO model path, a NumPy export (.npz, utils/numpy_policy.py) or one of the baselines
+# ("static", "random"); episodes run through evaluate_policy.run_episode.
+#
+#   python eval/harness.py --models models/exp_*.zip --baselines static random --seeds 0 1 2
+#   python eval/harness.py --models "models/exp_*.zip" --routes a.rou.xml b.rou.xml --workers 8
+import os
+import sys
+import glob
+import time
+import argparse
+import itertools
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+from eval.evaluate_policy import make_policy, run_episode
+from utils.stats import EntityWaitTracker
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+MAX_STEPS  = 1000
+BASELINES  = ("static", "random")
+OUT_DIR    = "evaluation_results"
+# ───────────────────────────────────────────────────────
+
+
+def expand_jobs(models, baselines, seeds, routes):
+    # Accepts glob patterns as well as paths, so a quoted "models/exp_*.zip" works too
+    policies = list(baselines)
+    for pattern in models:
+        policies.extend(sorted(glob.glob(pattern)) or [pattern])
+    return [{"policy": p, "seed": s, "route": r}
+            for p, s, r in itertools.product(policies, seeds, routes)]
+
+
+def policy_name(policy):
+    return os.path.splitext(os.path.basename(policy))[0]
+
+
+def run_job(job, env_kwargs, out_dir):
+    # One (policy, seed, route) evaluation episode in a fresh env; returns the result row,
+    # with status "failed" and the error instead of raising
+    start = time.perf_counter()
+    row = {"policy": policy_name(job["policy"]), "seed": job["seed"], "route": job["route"]}
+    env = None
+    try:
+        env = SingleAgentCrosswalkEnv(
+            net_file=SUMO_NET,
+            route_file=job["route"],
+            use_gui=False,
+            max_steps=MAX_STEPS,
+            log_dir=os.path.join(out_dir, "sumo_logs"),
+            use_subscriptions=True,
+            track_vehicles=True,
+            **env_kwargs
+        )
+        trackers = {"ped": EntityWaitTracker(), "veh": EntityWaitTracker()}
+        policy = make_policy(job["policy"], env, job["seed"])
+        reward, actions = run_episode(env, policy, seed=job["seed"], trackers=trackers)
+        ped, veh = trackers["ped"], trackers["veh"]
+        row.update({
+            "status": "done",
+            "reward": reward,
+            "actions": len(actions),
+            "ped_mean_wait": ped.samples.mean,
+            "ped_final_mean": ped.final.mean,
+            "ped_final_p95": ped.final.quantile(0.95),
+            "veh_mean_wait": veh.samples.mean,
+            "veh_final_mean": veh.final.mean,
+            "veh_final_p95": veh.final.quantile(0.95),
+            "unique_peds": ped.unique,
+            "unique_vehs": veh.unique,
+        })
+    except Exception as e:
+        traceback.print_exc()
+        row["status"] = "failed"
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if env is not None:
+            env.close()
+    row["wall_clock_s"] = round(time.perf_counter() - start, 1)
+    return row
+
+
+SUMMARY_COLUMNS = ["policy", "jobs", "reward_mean", "reward_std", "ped_final_mean", "ped_final_p95",
+                   "veh_final_mean", "veh_final_p95", "wall_clock_s"]
+
+
+def summarize(jobs_df):
+    done = jobs_df[jobs_df["status"] == "done"]
+    if done.empty:
+        # every job failed: the metric columns do not even exist
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    summary = done.groupby("policy").agg(
+        jobs=("reward", "size"),
+        reward_mean=("reward", "mean"),
+        reward_std=("reward", lambda r: float(np.std(r))),
+        ped_final_mean=("ped_final_mean", "mean"),
+        ped_final_p95=("ped_final_p95", "mean"),
+        veh_final_mean=("veh_final_mean", "mean"),
+        veh_final_p95=("veh_final_p95", "mean"),
+        wall_clock_s=("wall_clock_s", "max"),
+    )
+    return summary.sort_values("reward_mean", ascending=False).reset_index()
+
+
+def run_harness(jobs, workers=None, out_dir=OUT_DIR, **env_kwargs):
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    print(f"🚦 Running {len(jobs)} evaluation jobs on {workers} workers")
+
+    start = time.perf_counter()
+    rows = []
+    # spawn: never fork a parent that may already hold torch or a SUMO connection
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_job, job, env_kwargs, out_dir) for job in jobs]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            print(f"{'✅' if row['status'] == 'done' else '❌'} {row['policy']} seed={row['seed']} {os.path.basename(row['route'])}: "
+                  f"{row['status']} ({row['wall_clock_s']:.1f}s)")
+    elapsed = time.perf_counter() - start
+
+    jobs_df = pd.DataFrame(rows).sort_values(["policy", "route", "seed"]).reset_index(drop=True)
+    jobs_df.to_csv(os.path.join(out_dir, "harness_jobs.csv"), index=False)
+    print_failures(jobs_df)
+    summary = summarize(jobs_df)
+    summary.to_csv(os.path.join(out_dir, "harness_summary.csv"), index=False)
+
+    print_summary(summary)
+    print(f"\n⏱️  {elapsed:.1f}s wall clock for {jobs_df['wall_clock_s'].sum():.1f}s of jobs")
+    print(f"📄 Results written to {out_dir}/harness_jobs.csv and harness_summary.csv")
+    return summary
+
+
+def print_failures(jobs_df, limit=3):
+    failed = jobs_df[jobs_df["status"] != "done"]
+    if failed.empty:
+        return
+    print(f"\n⚠️  {len(failed)} of {len(jobs_df)} job(s) failed, see harness_jobs.csv")
+    for row in failed.head(limit).itertuples():
+        print(f"   {row.policy} seed={row.seed} {os.path.basename(row.route)}: {getattr(row, 'error', '')}")
+
+
+def print_summary(summary):
+    if summary.empty:
+        print("\n❌ No job finished, nothing to summarize")
+        return
+    print(f"\n{'policy':<45} {'jobs':>4} {'reward':>22} {'ped final':>10} {'ped p95':>8} "
+          f"{'veh final':>10} {'veh p95':>8}")
+    for row in summary.itertuples():
+        reward = f"{row.reward_mean:.1f} ± {row.reward_std:.1f}"
+        print(f"{row.policy:<45} {row.jobs:>4} {reward:>22} {row.ped_final_mean:>10.1f} "
+              f"{row.ped_final_p95:>8.1f} {row.veh_final_mean:>10.1f} {row.veh_final_p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", type=str, nargs="*", default=[], help="model paths or glob patterns")
+    parser.add_argument("--baselines", type=str, nargs="*", choices=BASELINES, default=list(BASELINES))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--routes", type=str, nargs="+", default=[SUMO_ROUTE])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out-dir", type=str, default=OUT_DIR)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--gamma", type=float, default=0.00)
+    parser.add_argument("--ped-weight", type=float, default=.5)
+    parser.add_argument("--veh-weight", type=float, default=.5)
+    parser.add_argument("--backend", choices=["traci", "libsumo"], default="traci")
+    args = parser.parse_args()
+
+    jobs = expand_jobs(args.models, args.baselines, args.seeds, args.routes)
+    if not jobs:
+        parser.error("nothing to evaluate: pass --models and/or --baselines")
+    run_harness(jobs, workers=args.workers, out_dir=args.out_dir,
+                alpha=args.alpha, gamma=args.gamma, ped_weight=args.ped_weight,
+                veh_weight=args.veh_weight, backend=args.backend)
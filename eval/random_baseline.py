@@ -14,6 +14,7 @@ SUMO_ROUTE    = "intersection/episode_routes.rou.xml"
 N_EPISODES    = 1
 MAX_STEPS     = 5000
 USE_GUI       = False   # set True if you want to watch the GUI
+BACKEND       = "traci" # or "libsumo" for in-process SUMO (ignored with the GUI)
 # ────────────────────────────────────────────────────────────────
 
 def run_random_baseline(n_episodes=N_EPISODES):
@@ -22,7 +23,8 @@ def run_random_baseline(n_episodes=N_EPISODES):
         route_file = SUMO_ROUTE,
         sumo_binary= "sumo-gui",
         use_gui    = USE_GUI,
-        max_steps  = MAX_STEPS
+        max_steps  = MAX_STEPS,
+        backend    = BACKEND
     )
 
     all_rewards = []
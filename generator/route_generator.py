@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
+# Route file generator: evenly spaced vehicles and Beta-distributed pedestrian departures.
+#
+# Seeding: `seed` drives both the vehicle route choices and the pedestrian departure times,
+# and ped_beta_a/ped_beta_b shape the pedestrian distribution. The original generator always
+# drew pedestrian times with seed 42 and Beta(2, 5), whatever was passed in. Output is
+# unchanged for seed=42 with the default Beta(2, 5), e.g. intersection/episode_routes.rou.xml,
+# but differs from older files for every other seed (scenario_cache.GENERATOR_VERSION was
+# bumped so such files are regenerated instead of reused).
 import os
+import heapq
 import random
+import argparse
+import tempfile
 import numpy as np
 import sys
-import matplotlib.pyplot as plt  # For plotting
 
 def generate_beta_skewed_pedestrian_times(ped_count, max_steps, a=2.0, b=5.0, seed=42):
     np.random.seed(seed)
@@ -17,6 +27,7 @@ def generate_uniform_vehicle_times(veh_count, max_steps):
     return veh_times
 
 def plot_departure_histograms(veh_times, ped_times, max_steps):
+    import matplotlib.pyplot as plt  # only needed for plotting
     plt.figure(figsize=(10, 5))
     plt.hist(veh_times, bins=50, alpha=0.7, label='Vehicles', color='blue', edgecolor='black')
     plt.hist(ped_times, bins=50, alpha=0.7, label='Pedestrians', color='orange', edgecolor='black')
@@ -28,12 +39,37 @@ def plot_departure_histograms(veh_times, ped_times, max_steps):
     plt.tight_layout()
     plt.show()
 
+def _vehicle_trips(veh_times, valid_routes):
+    vehicle_edges = list(valid_routes.keys())
+    num_veh_edges = len(vehicle_edges)
+    for i, t in enumerate(veh_times):
+        incoming = vehicle_edges[i % num_veh_edges]
+        outgoing = random.choice(valid_routes[incoming])
+        yield t, (
+            f'  <vehicle id="veh_{i}_{t}" type="car" depart="{t}" departLane="random" departSpeed="max">\n'
+            f'    <route edges="{incoming} {outgoing}"/>\n'
+            "  </vehicle>\n"
+        )
+
+def _pedestrian_trips(ped_times, ped_crossings):
+    for i, t in enumerate(ped_times):
+        path = ped_crossings[i % len(ped_crossings)]
+        edges_str = " ".join(path)
+        yield t, (
+            f'  <person id="ped_{i}_{t}" personType="pedestrian" depart="{t}" color="1,1,0" guiShape="pedestrian">\n'
+            f'    <walk edges="{edges_str}"/>\n'
+            "  </person>\n"
+        )
+
 def generate_routefile(output_path,
                        max_steps=1000,
                        vehs_per_hour=600,
                        peds_per_hour=300,
                        seed=42,
-                       plot=False):
+                       plot=False,
+                       ped_beta_a=2.0,
+                       ped_beta_b=5.0,
+                       verbose=True):
     random.seed(seed)
     np.random.seed(seed)
 
@@ -47,8 +83,6 @@ def generate_routefile(output_path,
         '  <personType id="pedestrian" vClass="pedestrian" speed="1.0" impatience="0.0" jmCrossingGap="10.0" jmTimeGap="999"/>',
     ]
 
-    trips = []
-
     # VEHICLES
     valid_routes = {
         "N2TL": ["TL2E", "TL2S", "TL2W"],
@@ -56,20 +90,8 @@ def generate_routefile(output_path,
         "S2TL": ["TL2N", "TL2E", "TL2W"],
         "W2TL": ["TL2N", "TL2E", "TL2S"],
     }
-    vehicle_edges = list(valid_routes.keys())
-    num_veh_edges = len(vehicle_edges)
     veh_times = generate_uniform_vehicle_times(veh_count, max_steps)
 
-    for i, t in enumerate(veh_times):
-        incoming = vehicle_edges[i % num_veh_edges]
-        outgoing = random.choice(valid_routes[incoming])
-        block = [
-            f'  <vehicle id="veh_{i}_{t}" type="car" depart="{t}" departLane="random" departSpeed="max">',
-            f'    <route edges="{incoming} {outgoing}"/>',
-            "  </vehicle>",
-        ]
-        trips.append((t, block))
-
     # PEDESTRIANS
     ped_crossings = [
         (":DN_w0", "N2TL", ":TL_w0", ":TL_c0", ":TL_w1", "TL2E"),
@@ -77,37 +99,60 @@ def generate_routefile(output_path,
         (":DS_w0", "S2TL", ":TL_w2", ":TL_c2", ":TL_w3", "TL2W"),
         (":DW_w0", "W2TL", ":TL_w3", ":TL_c3", ":TL_w0", "TL2N"),
     ]
-    ped_times = generate_beta_skewed_pedestrian_times(ped_count, max_steps)
-
-    for i, t in enumerate(ped_times):
-        path = ped_crossings[i % len(ped_crossings)]
-        edges_str = " ".join(path)
-        block = [
-            f'  <person id="ped_{i}_{t}" personType="pedestrian" depart="{t}" color="1,1,0" guiShape="pedestrian">',
-            f'    <walk edges="{edges_str}"/>',
-            "  </person>",
-        ]
-        trips.append((t, block))
+    ped_times = generate_beta_skewed_pedestrian_times(
+        ped_count, max_steps, a=ped_beta_a, b=ped_beta_b, seed=seed)
 
     if plot:
         plot_departure_histograms(veh_times, ped_times, max_steps)
 
-    # Sort and write to XML
-    trips.sort(key=lambda x: x[0])
+    # Both streams are already sorted by departure time, so a heap merge replaces the full
+    # sort (ties keep vehicles first, as the old stable sort did) and each block is written
+    # as soon as it is formatted. Memory is bounded by the two departure-time arrays
+    # (8 bytes per trip) instead of every trip's XML text.
+    trips = heapq.merge(
+        _vehicle_trips(veh_times, valid_routes),
+        _pedestrian_trips(ped_times, ped_crossings),
+        key=lambda trip: trip[0],
+    )
+
+    # Write to a temp file and move it into place, so readers never see a partial file
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    with open(output_path, "w") as f:
+    # (a unique temp name, so pools in one process writing the same scenario do not collide)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or ".",
+                                    prefix=os.path.basename(output_path) + ".", suffix=".tmp")
+    with os.fdopen(fd, "w", buffering=1 << 20) as f:
         for line in header:
             f.write(line + "\n")
         for _, block in trips:
-            for line in block:
-                f.write(line + "\n")
+            f.write(block)
         f.write("</routes>\n")
+    os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+    os.replace(tmp_path, output_path)
 
-    print(f"Route file written to {output_path}")
-    print(f"Generated {veh_count} vehicles and {ped_count} pedestrians")
-    print(f"  • Vehicle spacing: ~{max_steps/veh_count:.1f} steps")
-    print(f"  • Pedestrian distribution: Beta(2,5)")
+    if verbose:
+        print(f"Route file written to {output_path}")
+        print(f"Generated {veh_count} vehicles and {ped_count} pedestrians")
+        print(f"  • Vehicle spacing: ~{max_steps/veh_count:.1f} steps")
+        print(f"  • Pedestrian distribution: Beta({ped_beta_a:g},{ped_beta_b:g})")
 
 if __name__ == "__main__":
-    # Enable plot=True to visualize both histograms
-    generate_routefile("intersection/episode_routes.rou.xml", plot=True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=str, default="intersection/episode_routes.rou.xml")
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--vehs-per-hour", type=float, default=600)
+    parser.add_argument("--peds-per-hour", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--beta-a", type=float, default=2.0)
+    parser.add_argument("--beta-b", type=float, default=5.0)
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args()
+
+    # Plots both histograms unless --no-plot
+    generate_routefile(args.output,
+                       max_steps=args.max_steps,
+                       vehs_per_hour=args.vehs_per_hour,
+                       peds_per_hour=args.peds_per_hour,
+                       seed=args.seed,
+                       plot=not args.no_plot,
+                       ped_beta_a=args.beta_a,
+                       ped_beta_b=args.beta_b)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Content-addressed cache of generated route files: one file per distinct set of
+# generate_routefile parameters, generated once and reused by every later run.
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from route_generator import generate_routefile
+
+CACHE_DIR = "intersection/scenarios/"
+# Bump when generate_routefile changes its output, so stale cache entries are not reused
+# (2: pedestrian departure times follow `seed` instead of a fixed 42)
+GENERATOR_VERSION = 2
+
+
+def scenario_params(max_steps=1000, vehs_per_hour=600, peds_per_hour=300, seed=42,
+                    ped_beta_a=2.0, ped_beta_b=5.0):
+    # Normalized so e.g. 600 and 600.0 hash to the same scenario
+    return {
+        "max_steps": int(max_steps),
+        "vehs_per_hour": float(vehs_per_hour),
+        "peds_per_hour": float(peds_per_hour),
+        "seed": int(seed),
+        "ped_beta_a": float(ped_beta_a),
+        "ped_beta_b": float(ped_beta_b),
+    }
+
+
+def scenario_key(**params):
+    payload = json.dumps({"v": GENERATOR_VERSION, **scenario_params(**params)}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def scenario_path(cache_dir=CACHE_DIR, **params):
+    return os.path.join(cache_dir, f"scenario_{scenario_key(**params)}.rou.xml")
+
+
+def get_routefile(cache_dir=CACHE_DIR, **params):
+    # Returns the cached route file for these parameters, generating it on first use.
+    # generate_routefile writes through a temp file + rename, so concurrent callers
+    # (e.g. parallel sweep workers) never read a half-written scenario.
+    path = scenario_path(cache_dir, **params)
+    if not os.path.exists(path):
+        generate_routefile(path, verbose=False, **scenario_params(**params))
+        with open(path[:-len(".rou.xml")] + ".json", "w") as f:
+            json.dump(scenario_params(**params), f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--vehs-per-hour", type=float, default=600)
+    parser.add_argument("--peds-per-hour", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--beta-a", type=float, default=2.0)
+    parser.add_argument("--beta-b", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(get_routefile(args.cache_dir,
+                        max_steps=args.max_steps,
+                        vehs_per_hour=args.vehs_per_hour,
+                        peds_per_hour=args.peds_per_hour,
+                        seed=args.seed,
+                        ped_beta_a=args.beta_a,
+                        ped_beta_b=args.beta_b))
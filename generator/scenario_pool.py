@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Pool of pregenerated route files with varied seeds and demand. A background thread keeps
+# `size` scenarios ready ahead of time, so env.reset() can pick one without waiting on
+# generation. Files the pool created are evicted least-recently-used first once the pool
+# exceeds its on-disk budget. Only scenarios that were already handed out and released
+# again are evicted, and only files this pool generated (the cache dir is shared with other
+# pools and get_routefile users); when the budget is full of unused scenarios, generation
+# pauses until acquire() frees some. Callers release(path) once SUMO is done with a route
+# file (SUMO reads routes lazily, so that is the end of the episode). If generation fails,
+# the next acquire() or wait_ready() raises the error instead of the pool going quiet.
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from scenario_cache import CACHE_DIR, get_routefile, scenario_path
+
+
+class ScenarioPool:
+    def __init__(self, cache_dir=CACHE_DIR, size=8, max_disk_mb=256,
+                 max_steps=1000, vehs_per_hour=(400, 800), peds_per_hour=(150, 450),
+                 ped_beta_a=2.0, ped_beta_b=5.0, seed=None, start=True):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_disk_bytes = int(max_disk_mb * 2**20)
+        self.max_steps = max_steps
+        self.vehs_per_hour = vehs_per_hour
+        self.peds_per_hour = peds_per_hour
+        self.ped_beta_a = ped_beta_a
+        self.ped_beta_b = ped_beta_b
+        self._rng = np.random.default_rng(seed)
+
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stop = threading.Event()
+        self._ready = {}     # path -> last time it was handed out (0.0 = never), for LRU
+        self._fresh = []     # ready paths not handed out yet, served first
+        self._in_use = {}    # path -> number of holders that have not released it, never evicted
+        self._created = {}   # path -> bytes on disk, for the files this pool generated
+        self._thread = None
+        self._error = None   # exception that stopped the background thread
+        self.generated = 0
+        if start:
+            self.start()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="scenario-pool", daemon=True)
+            self._thread.start()
+            self._wanted.set()
+
+    def close(self):
+        self._stop.set()
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def acquire(self):
+        # Non-blocking: returns a ready route file, or None if nothing is ready yet. The file
+        # is kept on disk until release(path).
+        self._raise_error()
+        with self._lock:
+            if not self._ready:
+                return None
+            if self._fresh:
+                path = self._fresh.pop()
+            else:
+                paths = list(self._ready)
+                path = paths[self._rng.integers(len(paths))]
+            self._ready[path] = time.monotonic()
+            self._in_use[path] = self._in_use.get(path, 0) + 1
+        # ask for a replacement so training keeps seeing new traffic
+        self._wanted.set()
+        return path
+
+    def release(self, path):
+        with self._lock:
+            count = self._in_use.pop(path, 0) - 1
+            if count > 0:
+                self._in_use[path] = count
+            if path in self._ready:
+                self._ready[path] = time.monotonic()   # LRU counts from the end of use
+        # a released file may be what the generator was waiting to evict
+        self._wanted.set()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Scenario pool stopped generating route files") from self._error
+
+    def wait_ready(self, n=1, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(self._ready) < n:
+            self._raise_error()
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _sample_params(self):
+        def draw(value):
+            if isinstance(value, (tuple, list)):
+                return int(self._rng.integers(value[0], value[1] + 1))
+            return value
+        with self._lock:
+            return dict(
+                max_steps=self.max_steps,
+                vehs_per_hour=draw(self.vehs_per_hour),
+                peds_per_hour=draw(self.peds_per_hour),
+                seed=int(self._rng.integers(2**31 - 1)),
+                ped_beta_a=self.ped_beta_a,
+                ped_beta_b=self.ped_beta_b,
+            )
+
+    def _run(self):
+        try:
+            self._generate()
+        except Exception as e:
+            self._error = e
+
+    def _generate(self):
+        while not self._stop.is_set():
+            self._wanted.wait()
+            self._wanted.clear()
+            # top up to `size` unused scenarios, plus one replacement per acquire, while
+            # the disk budget allows
+            while not self._stop.is_set() and len(self._fresh) < self.size and self._evict():
+                params = self._sample_params()
+                existed = os.path.exists(scenario_path(self.cache_dir, **params))
+                path = get_routefile(self.cache_dir, **params)
+                with self._lock:
+                    if path not in self._ready:
+                        self._ready[path] = 0.0
+                        self._fresh.append(path)
+                        self.generated += 1
+                    if not existed and os.path.exists(path):
+                        self._created[path] = os.path.getsize(path)
+
+    def _evict(self):
+        # Removes handed-out scenarios this pool created, least recently used first, until
+        # the pool is under budget; returns whether there is room for another scenario
+        with self._lock:
+            total = sum(self._created.values())
+            if total < self.max_disk_bytes:
+                return True
+            fresh = set(self._fresh)
+            order = sorted((p for p in self._created if p not in fresh and p not in self._in_use),
+                           key=lambda p: self._ready.get(p, 0.0))
+            for path in order:
+                if total < self.max_disk_bytes:
+                    break
+                total -= self._created.pop(path)
+                self._ready.pop(path, None)
+                for stale in (path, path[:-len(".rou.xml")] + ".json"):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+            return total < self.max_disk_bytes
+
+    def disk_usage(self):
+        with self._lock:
+            return sum(os.path.getsize(p) for p in self._ready if os.path.exists(p))
+
+    def __len__(self):
+        return len(self._ready)
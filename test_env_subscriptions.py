@@ -0,0 +1,53 @@
+# test_env_subscriptions.py
+import shutil
+
+import numpy as np
+import pytest
+
+from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
+
+pytestmark = pytest.mark.skipif(shutil.which("sumo") is None, reason="SUMO is not installed")
+
+# wall-clock dependent, so never identical between two runs
+TIMING_STATS = {"sim_s_per_s"}
+
+
+def _make(use_subscriptions, tmp_path):
+    return SingleAgentCrosswalkEnv(
+        net_file="intersection/environment.net.xml",
+        route_file="intersection/episode_routes.rou.xml",
+        sumo_binary="sumo",
+        use_gui=False,
+        max_steps=1000,
+        alpha=0.05,
+        gamma=0.1,
+        log_dir=str(tmp_path),
+        use_subscriptions=use_subscriptions,
+        reset_mode="load",
+    )
+
+
+def test_subscriptions_match_polling_exactly(tmp_path):
+    polling, subscribed = _make(False, tmp_path), _make(True, tmp_path)
+    rng = np.random.default_rng(0)
+    try:
+        for episode in range(2):
+            obs_p, _ = polling.reset(seed=episode)
+            obs_s, _ = subscribed.reset(seed=episode)
+            assert np.array_equal(obs_p, obs_s)
+            done = False
+            while not done:
+                action = int(rng.integers(polling.action_space.n))
+                obs_p, reward_p, done, _, info_p = polling.step(action)
+                obs_s, reward_s, done_s, _, info_s = subscribed.step(action)
+                assert np.array_equal(obs_p, obs_s)
+                assert reward_p == reward_s
+                assert done == done_s
+            stats_p, stats_s = info_p["episode_stats"], info_s["episode_stats"]
+            assert stats_p.keys() == stats_s.keys()
+            assert stats_p["max_ped_wait"] > 0   # pedestrians actually waited
+            for key in stats_p.keys() - TIMING_STATS:
+                assert stats_p[key] == stats_s[key], key
+    finally:
+        polling.close()
+        subscribed.close()
@@ -0,0 +1,82 @@
+# test_harness.py
+from types import SimpleNamespace
+
+import gymnasium as gym
+import numpy as np
+import pandas as pd
+
+from eval.evaluate_policy import make_policy, run_episode
+from eval.harness import SUMMARY_COLUMNS, print_failures, summarize
+from utils.profiling import NULL_PROFILER
+
+
+def _done(policy, reward):
+    return {"policy": policy, "seed": 0, "route": "r.rou.xml", "status": "done", "reward": reward,
+            "ped_final_mean": 1.0, "ped_final_p95": 2.0, "veh_final_mean": 3.0, "veh_final_p95": 4.0,
+            "wall_clock_s": 1.0}
+
+
+def _failed(policy):
+    return {"policy": policy, "seed": 0, "route": "r.rou.xml", "status": "failed",
+            "error": "FatalTraCIError: connection closed by SUMO", "wall_clock_s": 0.1}
+
+
+def test_summarize_all_failed_returns_empty_frame(capsys):
+    jobs = pd.DataFrame([_failed("a"), _failed("b")])
+    summary = summarize(jobs)
+    assert summary.empty
+    assert list(summary.columns) == SUMMARY_COLUMNS
+    print_failures(jobs)
+    out = capsys.readouterr().out
+    assert "2 of 2 job(s) failed" in out
+    assert "connection closed by SUMO" in out
+
+
+def test_summarize_skips_failed_jobs():
+    jobs = pd.DataFrame([_done("a", -10.0), _done("a", -20.0), _done("b", -5.0), _failed("c")])
+    summary = summarize(jobs)
+    assert list(summary["policy"]) == ["b", "a"]
+    assert summary.set_index("policy").loc["a", "jobs"] == 2
+    assert summary.set_index("policy").loc["a", "reward_mean"] == -15.0
+
+
+class _FakeEnv:
+    # Three-step episodes; records which entry point each step went through
+    action_space = gym.spaces.Discrete(3)
+
+    def __init__(self):
+        self.unwrapped = self
+        self.profiler = NULL_PROFILER
+        self.phase_program = SimpleNamespace(cycle=lambda: [(0, 40), (1, 10), (2, 5)])
+        self.calls = []
+
+    def reset(self, seed=None):
+        self.t = 0
+        return np.zeros(12, dtype=np.float32), {}
+
+    def _advance(self, call):
+        self.calls.append(call)
+        self.t += 1
+        return np.zeros(12, dtype=np.float32), -1.0, self.t == 3, False, {}
+
+    def step(self, action):
+        return self._advance(("step", int(action)))
+
+    def step_phase(self, phase, duration):
+        return self._advance(("step_phase", phase, duration))
+
+
+def test_run_episode_plays_the_static_plan_through_step_phase():
+    env = _FakeEnv()
+    reward, actions = run_episode(env, make_policy("static", env))
+    assert (reward, actions) == (-3.0, [0, 1, 2])
+    assert env.calls == [("step_phase", 0, 40), ("step_phase", 1, 10), ("step_phase", 2, 5)]
+
+
+def test_random_policy_is_reproducible_per_seed():
+    runs = []
+    for _ in range(2):
+        env = _FakeEnv()
+        runs.append(run_episode(env, make_policy("random", env, seed=7), seed=7)[1])
+    assert runs[0] == runs[1]
+    assert all(call[0] == "step" for call in env.calls)
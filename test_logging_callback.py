@@ -0,0 +1,64 @@
+# test_logging_callback.py
+import csv
+import os
+import signal
+import subprocess
+import sys
+
+from utils.logging_callback import RewardLoggingCallback
+
+
+def _finish_episode(callback, reward):
+    callback.locals = {"dones": [True], "infos": [{"episode": {"r": reward}, "episode_stats": {}}]}
+    callback._on_step()
+
+
+def _rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_rows_reach_the_file_before_any_flush(tmp_path):
+    callback = RewardLoggingCallback(str(tmp_path), flush_interval=3600)
+    try:
+        _finish_episode(callback, -1.5)
+        assert [row["reward"] for row in _rows(callback.csv_path)] == ["-1.5"]
+    finally:
+        callback.close()
+
+
+def test_rows_survive_sigkill(tmp_path):
+    script = (
+        "import os, signal\n"
+        "from utils.logging_callback import RewardLoggingCallback\n"
+        f"cb = RewardLoggingCallback({str(tmp_path)!r}, flush_interval=3600)\n"
+        "for r in (1.0, 2.0, 3.0):\n"
+        "    cb.locals = {'dones': [True], 'infos': [{'episode': {'r': r}}]}\n"
+        "    cb._on_step()\n"
+        "os.kill(os.getpid(), signal.SIGKILL)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert proc.returncode == -signal.SIGKILL
+    assert [row["reward"] for row in _rows(tmp_path / "rewards.csv")] == ["1.0", "2.0", "3.0"]
+
+
+def test_append_continues_episode_numbers(tmp_path):
+    callback = RewardLoggingCallback(str(tmp_path))
+    _finish_episode(callback, 1.0)
+    callback.close()
+    callback = RewardLoggingCallback(str(tmp_path), append=True)
+    _finish_episode(callback, 2.0)
+    callback.close()
+    assert [row["episode"] for row in _rows(tmp_path / "rewards.csv")] == ["0", "1"]
+
+
+def test_append_rotates_an_old_layout(tmp_path):
+    path = tmp_path / "rewards.csv"
+    path.write_text("episode,reward\n0,-5.0\n1,-4.0\n")
+    callback = RewardLoggingCallback(str(tmp_path), append=True)
+    _finish_episode(callback, -3.0)
+    callback.close()
+    assert (tmp_path / "rewards.csv.0.bak").read_text() == "episode,reward\n0,-5.0\n1,-4.0\n"
+    rows = _rows(path)
+    assert list(rows[0]) == RewardLoggingCallback.HEADER
+    assert [(row["episode"], row["reward"]) for row in rows] == [("2", "-3.0")]
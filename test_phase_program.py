@@ -0,0 +1,35 @@
+# test_phase_program.py
+from env.phase_program import PhaseProgram
+
+# green / yellow / red-yellow for approach 1, a pedestrian-only phase, approach 2 likewise
+STATES = ["GGrr", "yyrr", "yrrr", "rrrr", "rrGG", "rryy"]
+DURATIONS = [40, 10, 5, 15, 40, 10]
+ACTION_MAP = {0: 0, 1: 3, 2: 4}
+
+
+def test_action_phases_and_clearance_sequences():
+    program = PhaseProgram("TL", STATES, DURATIONS)
+    assert program.action_phases == [0, 3, 4]
+    assert program.transitions == {0: [1, 2], 4: [5]}   # phase 3 has no yellow after it
+
+
+def test_compile_plays_the_previous_clearance_first():
+    schedules = PhaseProgram("TL", STATES, DURATIONS).compile(ACTION_MAP)
+    assert len(schedules) == (len(ACTION_MAP) + 1) * len(ACTION_MAP)
+    # episode start: just the chosen phase
+    assert schedules[(None, 2)] == ((4, 40),)
+    # leaving phase 0 always clears through its yellows, even when holding it
+    assert schedules[(0, 1)] == ((1, 10), (2, 5), (3, 15))
+    assert schedules[(0, 0)] == ((1, 10), (2, 5), (0, 40))
+    # wrapping around the end of the program
+    assert schedules[(2, 0)] == ((5, 10), (0, 40))
+    # no clearance after the all-red phase
+    assert schedules[(1, 2)] == ((4, 40),)
+
+
+def test_from_net_reads_the_crosswalk_program():
+    program = PhaseProgram.from_net("intersection/environment.net.xml", "TL")
+    assert program.durations == [40, 10, 5, 15, 40, 10, 5, 3]
+    assert program.action_phases == [0, 3, 4, 7]
+    assert program.transitions == {0: [1, 2], 4: [5, 6]}
+    assert program.cycle() == list(zip(range(8), program.durations))
@@ -0,0 +1,58 @@
+# test_profiling.py
+import threading
+import time
+
+import pytest
+
+from utils.profiling import StageProfiler, format_summary, merge_summaries
+
+
+def test_nested_stages_report_exclusive_self_time():
+    profiler = StageProfiler()
+    start = time.perf_counter()
+    with profiler.stage("outer"):
+        time.sleep(0.01)
+        for _ in range(2):
+            with profiler.stage("inner"):
+                time.sleep(0.01)
+                with profiler.stage("leaf"):
+                    time.sleep(0.01)
+    wall = time.perf_counter() - start
+    stages = profiler.summary()["stages"]
+
+    assert stages["outer"]["total_s"] == pytest.approx(sum(s["self_s"] for s in stages.values()), abs=1e-6)
+    assert stages["outer"]["self_s"] == pytest.approx(stages["outer"]["total_s"] - stages["inner"]["total_s"], abs=1e-6)
+    assert stages["inner"]["self_s"] == pytest.approx(stages["inner"]["total_s"] - stages["leaf"]["total_s"], abs=1e-6)
+    assert stages["leaf"]["self_s"] == stages["leaf"]["total_s"]
+    assert sum(s["self_s"] for s in stages.values()) <= wall
+
+
+def test_threads_do_not_nest_into_each_other():
+    profiler = StageProfiler()
+    inside = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with profiler.stage("worker"):
+            inside.set()
+            release.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    inside.wait()
+    with profiler.stage("main"):
+        time.sleep(0.01)
+    release.set()
+    thread.join()
+    stages = profiler.summary()["stages"]
+    assert stages["worker"]["self_s"] == stages["worker"]["total_s"]
+    assert stages["main"]["self_s"] == stages["main"]["total_s"]
+
+
+def test_add_with_child_time_and_merge():
+    profiler = StageProfiler()
+    profiler.add("rollout", 0, 5_000_000_000, child_ns=2_000_000_000)
+    merged = merge_summaries([profiler.summary(), profiler.summary()])
+    assert merged["stages"]["rollout"]["total_s"] == 10.0
+    assert merged["stages"]["rollout"]["self_s"] == 6.0
+    assert "self s" in format_summary(merged)
@@ -0,0 +1,117 @@
+# test_registry.py
+import numpy as np
+import traci.constants as tc
+from traci.exceptions import TraCIException
+
+from env.registry import EntityRegistry
+
+
+class FakeDomain:
+    # Stands in for conn.person / conn.vehicle: subscriptions and their results
+    def __init__(self):
+        self.waits = {}          # entities currently in the simulation
+        self.subscribed = set()
+
+    def subscribe(self, eid, variables):
+        if eid not in self.waits:
+            raise TraCIException(f"unknown entity {eid}")
+        self.subscribed.add(eid)
+
+    def getAllSubscriptionResults(self):
+        return {eid: {tc.VAR_WAITING_TIME: w} for eid, w in self.waits.items() if eid in self.subscribed}
+
+
+def _waits(registry):
+    return {registry.ids[s]: registry.wait[s] for s in np.flatnonzero(registry.active)}
+
+
+def test_depart_arrive_and_slot_reuse():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain, capacity=2)
+    domain.waits.update(a=0.0, b=0.0, c=0.0)
+    registry.depart(["a", "b", "c"])          # grows past the initial capacity
+    assert registry.size == 3
+    slot_b = registry.slot_of["b"]
+
+    del domain.waits["b"]
+    registry.arrive(["b"])
+    assert registry.size == 2 and "b" not in registry.slot_of
+    domain.waits["d"] = 0.0
+    registry.depart(["d"])
+    assert registry.slot_of["d"] == slot_b      # freed slot reused
+    assert registry.peak_wait[slot_b] == 0.0 and registry.cumulative_wait[slot_b] == 0.0
+
+    domain.waits.update(a=2.0, c=0.0, d=7.0)
+    registry.update()
+    assert _waits(registry) == {"a": 2.0, "c": 0.0, "d": 7.0}
+    np.testing.assert_array_equal(np.sort(registry.waits()), [0.0, 2.0, 7.0])
+
+
+def test_depart_ignores_entities_that_already_left():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain)
+    registry.depart(["gone"])                 # departed and arrived within one step
+    assert registry.size == 0
+
+
+def test_update_tracks_spells_and_drops_vanished_entities():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain)
+    domain.waits.update(a=0.0, b=0.0)
+    registry.depart(["a", "b"])
+    for wait in (1.0, 4.0, 0.0, 2.0):         # a waits 4 s, moves on, waits again
+        domain.waits["a"] = wait
+        registry.update()
+    slot = registry.slot_of["a"]
+    assert registry.peak_wait[slot] == 4.0
+    assert registry.cumulative_wait[slot] == 6.0
+
+    del domain.waits["b"]                     # teleported away without an arrival event
+    registry.update()
+    assert list(registry.slot_of) == ["a"]
+
+
+def test_update_ignores_stale_results_of_unknown_entities():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain)
+    domain.waits.update(a=1.0)
+    registry.depart(["a"])
+    domain.subscribed.add("old")              # left over from before a traci.load
+    domain.waits["old"] = 9.0
+    registry.update()
+    assert _waits(registry) == {"a": 1.0}
+
+
+def test_waiting_by_group():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain)
+    domain.waits.update(a=3.0, b=5.0, c=0.0, d=8.0)
+    registry.depart(["a", "b", "c", "d"])
+    registry.update()
+    registry.place({"cross_0": ["a", "c"], "cross_1": ["b"]})   # d is on no watched road
+    counts, max_wait = registry.waiting_by_group({"cross_0": 0, "cross_1": 1}, 2)
+    np.testing.assert_array_equal(counts, [1, 1])
+    np.testing.assert_array_equal(max_wait, [3.0, 5.0])
+
+
+def test_drain_reports_first_samples_and_final_peaks():
+    domain = FakeDomain()
+    registry = EntityRegistry(domain)
+    domain.waits.update(a=0.0, b=0.0)
+    registry.depart(["a", "b"])
+    first, peaks = registry.drain()
+    assert first == [] and peaks.size == 0          # nothing sampled yet
+    domain.waits.update(a=3.0, b=1.0)
+    registry.update()
+    first, peaks = registry.drain()
+    assert sorted(first) == ["a", "b"] and peaks.size == 0
+
+    domain.waits.update(a=1.0, c=0.0)
+    registry.depart(["c"])
+    registry.arrive(["c"])                          # left before it was ever sampled
+    del domain.waits["b"]
+    registry.arrive(["b"])
+    registry.update()
+    first, peaks = registry.drain()
+    assert first == [] and peaks.tolist() == [1.0]  # b's peak; c never counted
+    np.testing.assert_array_equal(registry.active_peaks(), [3.0])
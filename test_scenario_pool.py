@@ -0,0 +1,84 @@
+# test_scenario_pool.py
+import os
+import time
+
+import pytest
+
+from generator.scenario_cache import get_routefile
+from generator.scenario_pool import ScenarioPool
+
+
+def _settle(pool, timeout=10.0):
+    # waits until the background thread stops producing
+    deadline = time.monotonic() + timeout
+    last = -1
+    while time.monotonic() < deadline:
+        time.sleep(0.3)
+        if pool.generated == last:
+            return
+        last = pool.generated
+
+
+def test_pool_stops_at_disk_budget(tmp_path):
+    # Budget for about two scenarios, but size=4 asks for four unused ones
+    size = os.path.getsize(get_routefile(str(tmp_path / "probe"), max_steps=1000, seed=0))
+    pool = ScenarioPool(cache_dir=str(tmp_path), size=4, max_disk_mb=2.5 * size / 2**20, seed=0)
+    try:
+        _settle(pool)
+        generated = pool.generated
+        assert generated <= 3
+        assert len(pool) == generated                  # unused scenarios were not evicted
+        time.sleep(1.0)
+        assert pool.generated == generated             # and the thread is idle, not churning
+    finally:
+        pool.close()
+
+
+def test_pool_evicts_only_released_files_it_created(tmp_path):
+    shared = get_routefile(str(tmp_path), max_steps=1000, seed=12345)
+    size = os.path.getsize(shared)
+    pool = ScenarioPool(cache_dir=str(tmp_path), size=2, max_disk_mb=2.5 * size / 2**20, seed=0)
+    try:
+        _settle(pool)
+        handed_out = [pool.acquire() for _ in range(2)]
+        _settle(pool)
+        generated = pool.generated
+        assert all(os.path.exists(p) for p in handed_out)   # held files are never evicted
+        pool.release(handed_out[0])
+        _settle(pool)
+        assert os.path.exists(shared)
+        assert os.path.exists(handed_out[1])
+        assert not os.path.exists(handed_out[0])       # the released one made room
+        assert pool.generated > generated
+    finally:
+        pool.close()
+
+
+def test_shared_scenario_is_kept_until_every_holder_releases_it(tmp_path):
+    path = get_routefile(str(tmp_path), max_steps=1000, seed=0)
+    pool = ScenarioPool(cache_dir=str(tmp_path), size=1, max_disk_mb=0.5 * os.path.getsize(path) / 2**20,
+                        start=False)
+    pool._ready[path] = 0.0
+    pool._created[path] = os.path.getsize(path)
+    # two envs on one pool with a single ready scenario both get it
+    assert pool.acquire() == pool.acquire() == path
+    pool.release(path)
+    assert not pool._evict()
+    assert os.path.exists(path)
+    pool.release(path)
+    assert pool._evict()
+    assert not os.path.exists(path)
+
+
+def test_generation_error_reaches_the_consumer(tmp_path):
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    pool = ScenarioPool(cache_dir=str(not_a_dir), size=1, seed=0)
+    try:
+        with pytest.raises(RuntimeError, match="stopped generating") as info:
+            pool.wait_ready(timeout=10)
+        assert isinstance(info.value.__cause__, OSError)
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+    finally:
+        pool.close()
@@ -0,0 +1,39 @@
+# test_sim_config.py
+import pytest
+
+from env.sim_config import SimConfig
+
+
+def test_validate_accepts_internal_edges_with_internal_links():
+    SimConfig().validate([":TL_w0", ":TL_c0", "E0"])
+
+
+def test_validate_rejects_internal_edges_without_internal_links():
+    with pytest.raises(ValueError, match=":TL_w0"):
+        SimConfig(no_internal_links=True).validate([":TL_w0", "E0"])
+
+
+def test_validate_allows_no_internal_links_on_plain_edges():
+    SimConfig(no_internal_links=True).validate(["E0", "E1"])
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(step_length=0), dict(threads=0), dict(connect_retry_s=0), dict(gui_warmup="never"),
+])
+def test_constructor_rejects_bad_options(kwargs):
+    with pytest.raises(ValueError):
+        SimConfig(**kwargs)
+
+
+def test_args_default_and_speed_knobs(tmp_path):
+    default = SimConfig(write_logs=False).args(str(tmp_path), "x")
+    assert default == ["--time-to-teleport", "10000", "--no-warnings", "true", "--no-step-log"]
+
+    args = SimConfig(step_length=0.5, threads=2, routing_threads=4, no_internal_links=True,
+                     extra_args=["--seed", "1"]).args(str(tmp_path), "x")
+    assert args[:4] == ["--error-log", str(tmp_path / "sumo_crash_x.log"),
+                        "--message-log", str(tmp_path / "sumo_messages_x.log")]
+    for flag, value in [("--step-length", "0.5"), ("--threads", "2"),
+                        ("--device.rerouting.threads", "4"), ("--no-internal-links", "true")]:
+        assert args[args.index(flag) + 1] == value
+    assert args[-2:] == ["--seed", "1"]
@@ -0,0 +1,43 @@
+# test_start_sumo.py
+import shutil
+import sys
+import threading
+
+import pytest
+
+from env.single_agent_crosswalk_env import start_sumo
+
+pytestmark = pytest.mark.skipif(shutil.which("sumo") is None, reason="SUMO is not installed")
+
+SUMO_CMD = ["sumo", "-n", "intersection/environment.net.xml",
+            "-r", "intersection/episode_routes.rou.xml", "--no-step-log", "--no-warnings", "true"]
+
+
+def test_concurrent_starts_leave_stdout_alone(capsys):
+    stdout = sys.stdout
+    conns, errors = [], []
+
+    def connect(i):
+        try:
+            conns.append(start_sumo("traci", SUMO_CMD, f"test_start_{i}"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=connect, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    # another thread printing while the envs connect keeps every line
+    for i in range(200):
+        print(f"line {i}")
+    for t in threads:
+        t.join()
+    try:
+        assert not errors
+        assert sys.stdout is stdout
+        for conn in conns:
+            conn.simulationStep()
+    finally:
+        for conn in conns:
+            conn.close()
+    out = capsys.readouterr().out
+    assert out.splitlines() == [f"line {i}" for i in range(200)]
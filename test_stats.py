@@ -0,0 +1,68 @@
+# test_stats.py
+import numpy as np
+import traci.constants as tc
+
+from env.registry import EntityRegistry
+from utils.stats import EntityWaitTracker, OnlineStats
+
+
+def test_online_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    # SUMO waiting times: whole seconds, many zeros
+    values = np.where(rng.random(10_000) < 0.3, 0.0, rng.integers(0, 400, 10_000)).astype(float)
+    stats = OnlineStats(quantiles=(0.5, 0.95, 0.99))
+    for batch in np.array_split(values, [1, 7, 500, 4_000, 9_999]):
+        stats.update(batch)
+    summary = stats.summary()
+    assert summary["count"] == values.size
+    assert summary["min"] == values.min()
+    assert summary["max"] == values.max()
+    np.testing.assert_allclose(summary["mean"], values.mean(), rtol=1e-12)
+    np.testing.assert_allclose(summary["std"], values.std(), rtol=1e-10)
+    for q in (0.5, 0.95, 0.99):
+        assert summary[f"p{round(q * 100)}"] == np.quantile(values, q, method="inverted_cdf")
+
+
+def test_online_stats_empty():
+    stats = OnlineStats()
+    stats.update([])
+    summary = stats.summary()
+    assert summary["count"] == 0
+    assert np.isnan(summary["mean"]) and np.isnan(summary["std"]) and np.isnan(summary["p95"])
+
+
+class _Domain:
+    # Minimal conn.person stand-in: every subscribed entity reports its current wait
+    def __init__(self):
+        self.waits = {}
+
+    def subscribe(self, eid, variables):
+        pass
+
+    def getAllSubscriptionResults(self):
+        return {eid: {tc.VAR_WAITING_TIME: w} for eid, w in self.waits.items()}
+
+
+def _episode(tracker, steps):
+    # drives a fresh registry (as env.reset() builds one) through {id: wait} steps
+    domain = _Domain()
+    registry = EntityRegistry(domain)
+    for waits in steps:
+        registry.arrive([eid for eid in domain.waits if eid not in waits])
+        domain.waits = dict(waits)
+        registry.depart(list(waits))
+        registry.update()
+        tracker.update(registry)
+    tracker.finish(registry)
+
+
+def test_tracker_final_waits_and_unique_across_episodes():
+    tracker = EntityWaitTracker()
+    # episode 1: a waits up to 3 s and leaves, b is still there at the end
+    _episode(tracker, ({"a": 1.0, "b": 0.0}, {"a": 3.0, "b": 2.0}, {"b": 5.0}))
+    # episode 2 reuses the IDs "a" and "b" (route files repeat them) and adds "c"
+    _episode(tracker, ({"a": 0.0, "c": 4.0}, {"b": 1.0}))
+    assert (tracker.final.min, tracker.final.max, tracker.final.mean) == (0.0, 5.0, 2.6)
+    assert tracker.final.count == 5
+    assert tracker.unique == 3
+    assert tracker.samples.count == 8
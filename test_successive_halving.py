@@ -0,0 +1,45 @@
+# test_successive_halving.py
+import gymnasium as gym
+from stable_baselines3 import PPO
+
+from train.successive_halving import plan_rung, rung_budgets, saved_timesteps
+
+
+def _exp(name):
+    return {"exp_name": name, "alpha": 0.1, "gamma": 0.0, "ped_weight": 0.5, "veh_weight": 0.5}
+
+
+def _save_model(model_root, exp, num_timesteps):
+    model = PPO("MlpPolicy", gym.make("CartPole-v1"), n_steps=32, batch_size=32, device="cpu")
+    model.num_timesteps = num_timesteps
+    model.save(str(model_root / f"{exp['exp_name']}.zip"))
+
+
+def test_rung_budgets():
+    assert rung_budgets(1000, 10_000, 3) == [1000, 3000, 10_000]
+    assert rung_budgets(1000, 9000, 3) == [1000, 3000, 9000]
+    assert rung_budgets(1000, 1000, 3) == [1000]
+
+
+def test_resume_skips_configs_whose_model_reached_the_budget(tmp_path):
+    # "done" finished rung 1 but was interrupted before sh_state.json recorded it, "partial"
+    # only has its rung 0 model, "fresh" was never trained
+    done, partial, fresh = _exp("done"), _exp("partial"), _exp("fresh")
+    _save_model(tmp_path, done, 3000)
+    _save_model(tmp_path, partial, 1000)
+    state = {e["exp_name"]: {"trained": 1000 if e is not fresh else 0, "train_s": 0.0, "evals": {}}
+             for e in (done, partial, fresh)}
+
+    plan = plan_rung([done, partial, fresh], state, 3000, str(tmp_path))
+    assert [(e["exp_name"], steps, resume) for e, steps, resume in plan] == [
+        ("partial", 2000, True),
+        ("fresh", 3000, False),
+    ]
+    assert state["done"]["trained"] == 3000
+    assert saved_timesteps(fresh, str(tmp_path)) == 0
+
+
+def test_lost_model_trains_from_scratch(tmp_path):
+    exp = _exp("lost")
+    state = {"lost": {"trained": 1000, "train_s": 0.0, "evals": {}}}
+    assert [(steps, resume) for _, steps, resume in plan_rung([exp], state, 3000, str(tmp_path))] == [(3000, False)]
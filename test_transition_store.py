@@ -0,0 +1,125 @@
+# test_transition_store.py
+import os
+
+import gymnasium as gym
+import numpy as np
+
+from env.reward import compute_reward
+from utils.transition_store import COLUMNS, TransitionDataset, TransitionRecorder
+
+
+class FakeCrosswalkEnv(gym.Env):
+    # Deterministic stand-in for SingleAgentCrosswalkEnv: the obs encodes (episode, step) and
+    # every step has a different number of waiting pedestrians
+    observation_space = gym.spaces.Box(-np.inf, np.inf, (12,), np.float32)
+    action_space = gym.spaces.Discrete(3)
+
+    def __init__(self, episode_len=5):
+        self.episode_len = episode_len
+        self.alpha, self.gamma, self.ped_weight, self.veh_weight = 0.1, 0.5, 1.0, 1.0
+        self.agent_action_map = {0: 0, 1: 3, 2: 4}
+        self.episode = -1
+        self.t = 0
+
+    def _obs(self):
+        return np.full(12, self.episode * 100 + self.t, dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        self.episode += 1
+        self.t = 0
+        return self._obs(), {}
+
+    def step(self, action):
+        self.t += 1
+        ped_waits = np.arange(self.t % 4, dtype=np.float32) * 30.0 + self.episode
+        veh_delays = [float(self.t), 2.0]
+        self.last_reward_inputs = (ped_waits, veh_delays)
+        reward = compute_reward(ped_waits, veh_delays, self.alpha, self.gamma)
+        return self._obs(), reward, False, self.t >= self.episode_len, {}
+
+
+def _record(root, episodes=3, episode_len=5, **kwargs):
+    env = TransitionRecorder(FakeCrosswalkEnv(episode_len), str(root), prefix="t", **kwargs)
+    actions = []
+    for _ in range(episodes):
+        env.reset()
+        done = False
+        while not done:
+            actions.append(len(actions) % 3)
+            _, _, terminated, truncated, _ = env.step(actions[-1])
+            done = terminated or truncated
+    env.close()
+    return actions
+
+
+def test_round_trip(tmp_path):
+    actions = _record(tmp_path, episodes=3, episode_len=5, chunk_size=7, flush_every=2)
+    data = TransitionDataset(str(tmp_path))
+    assert len(data) == 15
+    assert len(data.chunks) == 2                    # rolls over at the first reset after 7 rows
+
+    batches = list(data.iter_batches(4))
+    batch = {c: np.concatenate([b[c] for b in batches]) for c in batches[0]}
+    steps = np.tile(np.arange(5), 3)
+    episodes = np.repeat(np.arange(3), 5)
+    np.testing.assert_array_equal(batch["obs"][:, 0], episodes * 100 + steps)
+    np.testing.assert_array_equal(batch["next_obs"][:, 0], episodes * 100 + steps + 1)
+    np.testing.assert_array_equal(batch["action"], actions)
+    np.testing.assert_array_equal(batch["truncated"], steps == 4)
+
+    env = FakeCrosswalkEnv()
+    expected = []
+    for episode in range(3):
+        env.reset()
+        expected.extend(env.step(0)[1] for _ in range(5))
+    np.testing.assert_allclose(batch["reward"], expected, rtol=1e-6)
+    np.testing.assert_allclose(data.episode_returns(),
+                               np.asarray(expected).reshape(3, 5).sum(axis=1), rtol=1e-6)
+
+
+def test_reweighted_rewards_match_a_fresh_env(tmp_path):
+    _record(tmp_path, episodes=2, episode_len=6)
+    data = TransitionDataset(str(tmp_path))
+    weights = dict(alpha=0.05, gamma=2.0, ped_weight=0.5, veh_weight=3.0)
+
+    env = FakeCrosswalkEnv()
+    expected = []
+    for episode in range(2):
+        env.reset()
+        for _ in range(6):
+            env.step(0)
+            expected.append(compute_reward(*env.last_reward_inputs, **weights))
+    rewards = np.concatenate([b["reward"] for b in data.iter_batches(5, **weights)])
+    np.testing.assert_allclose(rewards, expected, rtol=1e-6)
+
+    sample = data.sample(64, rng=np.random.default_rng(0), columns=("obs", "reward"), **weights)
+    rows = (sample["obs"][:, 0] // 100 * 6 + sample["obs"][:, 0] % 100).astype(int)
+    np.testing.assert_allclose(sample["reward"], np.asarray(expected)[rows], rtol=1e-6)
+
+
+def test_truncated_chunk_reads_up_to_last_complete_row(tmp_path):
+    _record(tmp_path, episodes=2, episode_len=5)
+    chunk_dir = os.path.join(tmp_path, "t_00000")
+
+    # a writer killed mid-flush: columns of unequal length and a torn last row
+    def chop(column, rows_kept, extra_bytes=0):
+        dtype, shape = COLUMNS[column]
+        row = np.dtype(dtype).itemsize * int(np.prod(shape))
+        with open(os.path.join(chunk_dir, f"{column}.bin"), "r+b") as f:
+            f.truncate(rows_kept * row + extra_bytes)
+
+    chop("reward", 7)
+    chop("obs", 5, extra_bytes=5)        # obs rows 0..4: next_obs exists for transitions 0..3
+    data = TransitionDataset(str(tmp_path))
+    assert len(data) == 4
+    batch = next(data.iter_batches())
+    np.testing.assert_array_equal(batch["next_obs"][:, 0], [1, 2, 3, 4])
+    assert len(data.episode_returns()) == 0      # the unfinished episode is left out
+
+    # steps 1, 2, 3 have 1, 2, 3 waiting pedestrians: 4 waits only complete the first two
+    chop("ped_waits", 4, extra_bytes=2)
+    data = TransitionDataset(str(tmp_path))
+    assert len(data) == 2
+    np.testing.assert_allclose(next(data.iter_batches(alpha=0.05))["reward"],
+                               [compute_reward(np.arange(t, dtype=np.float32) * 30.0, [t, 2.0], 0.05, 0.5)
+                                for t in (1, 2)], rtol=1e-6)
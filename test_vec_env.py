@@ -0,0 +1,10 @@
+# test_vec_env.py
+import pytest
+
+from env.vec_env import make_vec_env
+
+
+@pytest.mark.parametrize("vec_env", ["dummy", "thread"])
+def test_in_process_vec_envs_refuse_several_libsumo_envs(vec_env):
+    with pytest.raises(ValueError, match="libsumo"):
+        make_vec_env(n_envs=2, vec_env=vec_env, backend="libsumo")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Pretrain a PPO policy on the NumPy surrogate (env/surrogate.py) before fine-tuning in SUMO.
+# Thousands of surrogate intersections step together, so the early, trivially bad policies
+# cost no SUMO time. The saved model has the SUMO env's spaces and can be passed on as
+#   INIT_MODEL=models/surrogate_a0.01_g0.1_pw0.35_vw0.65.zip python train/train_ppo.py
+# (use the same reward weights for pretraining and fine-tuning).
+#
+#   python train/pretrain_surrogate.py --alpha 0.01 --gamma 0.1 --ped-weight 0.35
+#   python train/pretrain_surrogate.py --scenarios 32 --vehs-per-hour 300 900 --timesteps 5000000
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import VecMonitor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.surrogate import SurrogateCrosswalkVecEnv
+from generator.scenario_cache import get_routefile
+from utils.logging_callback import RewardLoggingCallback
+
+# ─── Configuration ─────────────────────────────────────
+SUMO_NET   = "intersection/environment.net.xml"
+SUMO_ROUTE = "intersection/episode_routes.rou.xml"
+LOG_ROOT   = "logs/surrogate_pretrain/"
+MODEL_ROOT = "models/"
+N_ENVS     = 1024
+N_STEPS    = 16       # per env and update: 16 * 1024 transitions per PPO update
+TIMESTEPS  = 2_000_000
+# ───────────────────────────────────────────────────────
+
+
+def scenario_routes(n_scenarios, vehs_per_hour, peds_per_hour, seed=0):
+    # The fixed training route plus n_scenarios route_generator demands from the shared
+    # scenario cache, with rates drawn uniformly from the given [low, high] ranges
+    rng = np.random.default_rng(seed)
+    routes = [SUMO_ROUTE]
+    for _ in range(n_scenarios):
+        routes.append(get_routefile(vehs_per_hour=int(rng.integers(vehs_per_hour[0], vehs_per_hour[-1] + 1)),
+                                    peds_per_hour=int(rng.integers(peds_per_hour[0], peds_per_hour[-1] + 1)),
+                                    seed=int(rng.integers(2**31 - 1))))
+    return routes
+
+
+def pretrain(alpha, gamma, ped_w, veh_w, routes, n_envs=N_ENVS, total_timesteps=TIMESTEPS,
+             log_root=LOG_ROOT, model_root=MODEL_ROOT, seed=0):
+    exp_name = f"surrogate_a{alpha}_g{gamma}_pw{ped_w}_vw{veh_w}"
+    log_dir = os.path.join(log_root, exp_name)
+    model_path = os.path.join(model_root, f"{exp_name}.zip")
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(model_root, exist_ok=True)
+
+    env = VecMonitor(SurrogateCrosswalkVecEnv(
+        SUMO_NET, routes, n_envs=n_envs, max_steps=1000,
+        alpha=alpha, gamma=gamma, ped_weight=ped_w, veh_weight=veh_w, seed=seed))
+    model = PPO(
+        policy="MlpPolicy",
+        env=env,
+        verbose=0,
+        device="cpu",
+        tensorboard_log=log_dir,
+        n_steps=N_STEPS,
+        batch_size=2048,
+        learning_rate=3e-4,
+        gamma=0.99,
+        seed=seed,
+    )
+    callback = RewardLoggingCallback(log_dir=log_dir)
+    start = time.perf_counter()
+    try:
+        model.learn(total_timesteps=total_timesteps, callback=callback, progress_bar=True)
+    finally:
+        callback.close()
+        env.close()
+    model.save(model_path)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Pretrained {exp_name}: {model.num_timesteps} steps in {elapsed:.0f}s "
+          f"({model.num_timesteps / elapsed:.0f} steps/s)")
+    print(f"📦 Saved to {model_path}")
+    return model_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--gamma", type=float, default=0.1)
+    parser.add_argument("--ped-weight", type=float, default=0.35)
+    parser.add_argument("--scenarios", type=int, default=8, help="extra generated route files")
+    parser.add_argument("--vehs-per-hour", type=int, nargs="+", default=[300, 900])
+    parser.add_argument("--peds-per-hour", type=int, nargs="+", default=[150, 450])
+    parser.add_argument("--n-envs", type=int, default=N_ENVS)
+    parser.add_argument("--timesteps", type=int, default=TIMESTEPS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    routes = scenario_routes(args.scenarios, args.vehs_per_hour, args.peds_per_hour, args.seed)
+    pretrain(args.alpha, args.gamma, args.ped_weight, round(1.0 - args.ped_weight, 10), routes,
+             n_envs=args.n_envs, total_timesteps=args.timesteps, seed=args.seed)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# Successive-halving ablation: instead of giving every (alpha, gamma, ped_weight) config the full
+# training budget, all configs train for a short first rung, are evaluated on one common
+# scenario (same route and seed, deterministic policy), and only the best 1/eta are promoted
+# to the next, eta times longer rung. Promoted configs resume from their saved model
+# (train_ppo.train_experiment(resume=True)), so no step is trained twice.
+#
+#   python train/successive_halving.py --alpha 0.01 0.05 0.1 --gamma 0 0.1 --ped-weight 0.35 0.5 0.65
+#   python train/successive_halving.py --spec sweep.yaml --eta 3 --min-timesteps 1000 --max-timesteps 10000
+#   python train/successive_halving.py ... --compare logs/ablation_crosswalk/sweep_summary.csv
+#
+# Rungs train in parallel like train/sweep.py. The state (trained steps and evaluation results
+# per rung) is kept in sh_state.json, so an interrupted run picks up where it stopped. Configs
+# are ranked by the evaluation episode reward under their own weights by default, the criterion
+# the exhaustive sweep ranks by; --metric picks another evaluation column (eval/harness.py).
+import os
+import sys
+import csv
+import json
+import math
+import time
+import argparse
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from stable_baselines3.common.save_util import load_from_zip_file
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from eval import harness
+from train import train_ppo
+from train.sweep import expand_grid, load_spec, read_summary
+
+# ─── Configuration ─────────────────────────────────────
+LOG_ROOT      = "logs/successive_halving/"
+MODEL_ROOT    = "models/successive_halving/"
+ETA           = 3
+MIN_TIMESTEPS = 1_000      # first rung: one PPO update (n_steps=1000)
+MAX_TIMESTEPS = 10_000     # the exhaustive sweep's per-config budget
+EVAL_SEED     = 0
+# ───────────────────────────────────────────────────────
+
+# evaluation columns (eval/harness.py) and whether higher is better
+METRICS = {"reward": True, "ped_final_mean": False, "ped_final_p95": False,
+           "veh_final_mean": False, "veh_final_p95": False, "ped_mean_wait": False}
+
+
+def rung_budgets(min_timesteps=MIN_TIMESTEPS, max_timesteps=MAX_TIMESTEPS, eta=ETA):
+    # Cumulative training steps per rung: min, min*eta, min*eta^2, ..., then max for the last
+    # rung (a geometric budget within a factor eta of max is merged into it)
+    budgets = []
+    budget = min_timesteps
+    while budget * eta <= max_timesteps:
+        budgets.append(budget)
+        budget *= eta
+    return budgets + [max_timesteps]
+
+
+def _train(exp, steps, resume, n_envs, log_root, model_root):
+    start = time.perf_counter()
+    try:
+        ok = train_ppo.train_experiment(
+            exp["exp_name"], exp["alpha"], exp["gamma"], exp["ped_weight"], exp["veh_weight"],
+            n_envs=n_envs, total_timesteps=steps, log_root=log_root, model_root=model_root,
+            progress_bar=False, resume=resume)
+    except Exception:
+        traceback.print_exc()
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def saved_timesteps(exp, model_root):
+    # Timesteps of the config's saved model, 0 if there is none. train_experiment saves the
+    # model before the state file is updated, so after an interruption the model can be
+    # ahead of sh_state.json; it is what a resumed run continues from.
+    path = os.path.join(model_root, f"{exp['exp_name']}.zip")
+    if not os.path.exists(path):
+        return 0
+    data, _, _ = load_from_zip_file(path, device="cpu")
+    return int(data["num_timesteps"])
+
+
+def plan_rung(survivors, state, budget, model_root):
+    # (exp, steps, resume) for every survivor still short of this rung's budget. Trained steps
+    # are synced from the saved models first, so a config whose model already reached the
+    # budget is not trained again (and past it).
+    plan = []
+    for exp in survivors:
+        entry = state[exp["exp_name"]]
+        entry["trained"] = saved_timesteps(exp, model_root)
+        if entry["trained"] < budget:
+            plan.append((exp, budget - entry["trained"], entry["trained"] > 0))
+    return plan
+
+
+def _evaluate(exp, route, seed, model_root, out_dir):
+    job = {"policy": os.path.join(model_root, f"{exp['exp_name']}.zip"), "seed": seed, "route": route}
+    env_kwargs = {"alpha": exp["alpha"], "gamma": exp["gamma"], "ped_weight": exp["ped_weight"],
+                  "veh_weight": exp["veh_weight"], "backend": train_ppo.BACKEND}
+    return harness.run_job(job, env_kwargs, out_dir)
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run_successive_halving(experiments, eta=ETA, min_timesteps=MIN_TIMESTEPS, max_timesteps=MAX_TIMESTEPS,
+                           metric="reward", route=train_ppo.SUMO_ROUTE, seed=EVAL_SEED, workers=None,
+                           n_envs=1, log_root=LOG_ROOT, model_root=MODEL_ROOT):
+    os.makedirs(log_root, exist_ok=True)
+    os.makedirs(model_root, exist_ok=True)
+    state_path = os.path.join(log_root, "sh_state.json")
+    state = load_state(state_path)
+    budgets = rung_budgets(min_timesteps, max_timesteps, eta)
+    workers = workers or max(1, (os.cpu_count() or 1) // n_envs)
+    higher_is_better = METRICS[metric]
+    eval_dir = os.path.join(log_root, "eval")
+
+    for exp in experiments:
+        state.setdefault(exp["exp_name"], {"trained": 0, "train_s": 0.0, "evals": {}})
+        # failed configs get another attempt when the run is restarted
+        state[exp["exp_name"]].pop("failed", None)
+    print(f"🚦 {len(experiments)} configs, rungs at {budgets} steps, keeping 1/{eta} per rung")
+
+    survivors = list(experiments)
+    # spawn: never fork a parent that already loaded torch
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for rung, budget in enumerate(budgets):
+            # train every survivor up to this rung's budget, resuming from its last rung
+            to_train = plan_rung(survivors, state, budget, model_root)
+            save_state(state, state_path)
+            print(f"\n🏋️  Rung {rung}: training {len(to_train)} of {len(survivors)} configs to {budget} steps")
+            futures = {pool.submit(_train, exp, steps, resume, n_envs, log_root, model_root): exp
+                       for exp, steps, resume in to_train}
+            for future in as_completed(futures):
+                exp = futures[future]
+                ok, train_s = future.result()
+                entry = state[exp["exp_name"]]
+                entry["train_s"] += train_s
+                if ok:
+                    # PPO rounds up to whole rollouts, so the model can be a little past budget
+                    entry["trained"] = saved_timesteps(exp, model_root)
+                else:
+                    entry["failed"] = True
+                save_state(state, state_path)
+            survivors = [e for e in survivors if not state[e["exp_name"]].get("failed")]
+
+            # evaluate on the common scenario
+            key = str(budget)
+            to_eval = [e for e in survivors if key not in state[e["exp_name"]]["evals"]]
+            futures = {pool.submit(_evaluate, exp, route, seed, model_root, eval_dir): exp for exp in to_eval}
+            for future in as_completed(futures):
+                exp, row = futures[future], future.result()
+                if row["status"] == "done":
+                    state[exp["exp_name"]]["evals"][key] = {"steps": row["actions"],
+                                                            **{m: float(row[m]) for m in METRICS}}
+                else:
+                    state[exp["exp_name"]]["failed"] = True
+                save_state(state, state_path)
+            survivors = [e for e in survivors if not state[e["exp_name"]].get("failed")]
+
+            survivors.sort(key=lambda e: state[e["exp_name"]]["evals"][key][metric], reverse=higher_is_better)
+            print_rung(survivors, state, key, metric)
+            if rung < len(budgets) - 1:
+                survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+
+    ranking = rank(experiments, state, budgets, metric)
+    write_ranking(ranking, os.path.join(log_root, "sh_ranking.csv"))
+    print_ranking(ranking, metric)
+    trained = sum(state[e["exp_name"]]["trained"] for e in experiments)
+    evaluated = sum(r["steps"] for e in experiments for r in state[e["exp_name"]]["evals"].values())
+    exhaustive = len(experiments) * max_timesteps
+    print(f"\n💰 Trained {trained} steps (+{evaluated} evaluation steps) vs {exhaustive} for the "
+          f"exhaustive sweep ({(trained + evaluated) / exhaustive:.0%})")
+    return ranking
+
+
+def rank(experiments, state, budgets, metric):
+    # Final ranking: configs that reached a later rung come first, then by their metric there
+    higher_is_better = METRICS[metric]
+    rows = []
+    for exp in experiments:
+        entry = state[exp["exp_name"]]
+        reached = [b for b in budgets if str(b) in entry["evals"]]
+        last = reached[-1] if reached else 0
+        value = entry["evals"][str(last)][metric] if reached else float("nan")
+        rows.append({**exp, "rung": len(reached) - 1, "timesteps": entry["trained"],
+                     "train_s": round(entry["train_s"], 1), metric: value})
+    sign = -1 if higher_is_better else 1
+    rows.sort(key=lambda r: (-r["rung"], sign * r[metric] if not math.isnan(r[metric]) else math.inf))
+    for position, row in enumerate(rows, start=1):
+        row["rank"] = position
+    return rows
+
+
+def write_ranking(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_rung(survivors, state, key, metric):
+    print(f"{'experiment':<45} {metric:>14}")
+    for exp in survivors:
+        print(f"{exp['exp_name']:<45} {state[exp['exp_name']]['evals'][key][metric]:>14.1f}")
+
+
+def print_ranking(rows, metric):
+    print(f"\n{'rank':>4} {'experiment':<45} {'rung':>4} {'steps':>7} {metric:>14}")
+    for row in rows:
+        print(f"{row['rank']:>4} {row['exp_name']:<45} {row['rung']:>4} {row['timesteps']:>7} {row[metric]:>14.1f}")
+
+
+def compare(ranking, summary_path, top=3):
+    # Agreement with an exhaustive sweep (train/sweep.py summary, ranked by final10_mean_reward)
+    # over the configs both ran: same winner, overlap of the top-k, Spearman correlation
+    summary = read_summary(summary_path)
+    shared = [r for r in ranking if r["exp_name"] in summary and summary[r["exp_name"]]["final10_mean_reward"] not in ("", "nan")]
+    if not shared:
+        print(f"⚠️  No configs in common with {summary_path}")
+        return None
+    exhaustive = sorted(shared, key=lambda r: -float(summary[r["exp_name"]]["final10_mean_reward"]))
+    ours = sorted(shared, key=lambda r: r["rank"])
+    position = {r["exp_name"]: i for i, r in enumerate(exhaustive)}
+    ranks = np.array([position[r["exp_name"]] for r in ours], dtype=float)
+    spearman = float(np.corrcoef(np.arange(len(ranks)), ranks)[0, 1]) if len(ranks) > 1 else 1.0
+    k = min(top, len(shared))
+    overlap = len({r["exp_name"] for r in ours[:k]} & {r["exp_name"] for r in exhaustive[:k]}) / k
+    same_best = ours[0]["exp_name"] == exhaustive[0]["exp_name"]
+    print(f"\n🔍 vs {summary_path} ({len(shared)} shared configs): best config "
+          f"{'matches' if same_best else 'differs'} ({exhaustive[0]['exp_name']}), "
+          f"top-{k} overlap {overlap:.0%}, Spearman {spearman:.2f}")
+    return {"same_best": same_best, "top_overlap": overlap, "spearman": spearman}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spec", type=str, help="YAML file with alpha/gamma/ped_weight lists")
+    parser.add_argument("--alpha", type=float, nargs="+", default=train_ppo.alpha_values)
+    parser.add_argument("--gamma", type=float, nargs="+", default=train_ppo.gamma_values)
+    parser.add_argument("--ped-weight", type=float, nargs="+", default=train_ppo.ped_weights)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--min-timesteps", type=int, default=MIN_TIMESTEPS)
+    parser.add_argument("--max-timesteps", type=int, default=MAX_TIMESTEPS)
+    parser.add_argument("--metric", choices=list(METRICS), default="reward")
+    parser.add_argument("--route", type=str, default=train_ppo.SUMO_ROUTE, help="evaluation scenario")
+    parser.add_argument("--seed", type=int, default=EVAL_SEED, help="evaluation SUMO seed")
+    parser.add_argument("--n-envs", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log-root", type=str, default=LOG_ROOT)
+    parser.add_argument("--model-root", type=str, default=MODEL_ROOT)
+    parser.add_argument("--compare", type=str, help="sweep_summary.csv of an exhaustive sweep")
+    args = parser.parse_args()
+
+    if args.spec:
+        experiments, _ = load_spec(args.spec)
+    else:
+        experiments = expand_grid(args.alpha, args.gamma, args.ped_weight)
+
+    ranking = run_successive_halving(
+        experiments, eta=args.eta, min_timesteps=args.min_timesteps, max_timesteps=args.max_timesteps,
+        metric=args.metric, route=args.route, seed=args.seed, workers=args.workers,
+        n_envs=args.n_envs, log_root=args.log_root, model_root=args.model_root)
+    if args.compare:
+        compare(ranking, args.compare)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# Parallel ablation sweep: runs train_ppo.train_experiment for every (alpha, gamma, ped_weight)
+# config across a process pool, skips configs whose model already exists, and writes a summary.
+#
+#   python train/sweep.py --alpha 0.01 0.05 --gamma 0.1 --ped-weight 0.35 0.4
+#   python train/sweep.py --spec sweep.yaml --workers 4
+#
+# sweep.yaml:
+#   alpha: [0.01, 0.05]
+#   gamma: [0.1]
+#   ped_weight: [0.35, 0.4]
+#   total_timesteps: 10000   # optional
+#   n_envs: 1                # optional, SUMO instances per experiment
+import os
+import sys
+import csv
+import time
+import argparse
+import itertools
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from train import train_ppo
+
+SUMMARY_FIELDS = ["exp_name", "alpha", "gamma", "ped_weight", "veh_weight", "status",
+                  "episodes", "final_reward", "final10_mean_reward", "wall_clock_s"]
+
+
+def expand_grid(alpha_values, gamma_values, ped_weights):
+    # Same order and naming as the original nested loop, so existing logs/models line up
+    experiments = []
+    for exp_id, (alpha, gamma, ped_w) in enumerate(
+            itertools.product(alpha_values, gamma_values, ped_weights)):
+        veh_w = 1.0 - ped_w
+        experiments.append({
+            "exp_name": f"exp_{exp_id}_a{alpha}_g{gamma}_pw{ped_w}_vw{veh_w}",
+            "alpha": alpha,
+            "gamma": gamma,
+            "ped_weight": ped_w,
+            "veh_weight": veh_w,
+        })
+    return experiments
+
+
+def load_spec(path):
+    import yaml  # only needed for spec files
+    with open(path) as f:
+        spec = yaml.safe_load(f)
+    experiments = expand_grid(spec["alpha"], spec["gamma"], spec["ped_weight"])
+    options = {k: spec[k] for k in ("total_timesteps", "n_envs", "workers") if k in spec}
+    return experiments, options
+
+
+def read_rewards(log_dir):
+    path = os.path.join(log_dir, "rewards.csv")
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return [float(row["reward"]) for row in csv.DictReader(f)]
+
+
+def _run_experiment(exp, n_envs, total_timesteps, log_root, model_root):
+    start = time.perf_counter()
+    try:
+        ok = train_ppo.train_experiment(
+            exp["exp_name"], exp["alpha"], exp["gamma"], exp["ped_weight"], exp["veh_weight"],
+            n_envs=n_envs, total_timesteps=total_timesteps,
+            log_root=log_root, model_root=model_root, progress_bar=False)
+    except Exception:
+        traceback.print_exc()
+        ok = False
+    return ("done" if ok else "failed"), time.perf_counter() - start
+
+
+def summarize(exp, status, wall_clock_s, log_root):
+    rewards = read_rewards(os.path.join(log_root, exp["exp_name"]))
+    return {
+        **exp,
+        "status": status,
+        "episodes": len(rewards),
+        "final_reward": rewards[-1] if rewards else float("nan"),
+        "final10_mean_reward": float(np.mean(rewards[-10:])) if rewards else float("nan"),
+        "wall_clock_s": round(wall_clock_s, 1),
+    }
+
+
+def read_summary(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="") as f:
+        return {row["exp_name"]: row for row in csv.DictReader(f)}
+
+
+def write_summary(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: row[k] for k in SUMMARY_FIELDS})
+
+
+def run_sweep(experiments, workers=None, n_envs=1, total_timesteps=10_000,
+              log_root=train_ppo.LOG_ROOT, model_root=train_ppo.MODEL_ROOT, summary_path=None):
+    os.makedirs(log_root, exist_ok=True)
+    os.makedirs(model_root, exist_ok=True)
+    summary_path = summary_path or os.path.join(log_root, "sweep_summary.csv")
+    # one SUMO process per env, so size the pool by cores / envs-per-experiment
+    workers = workers or max(1, (os.cpu_count() or 1) // n_envs)
+
+    previous = read_summary(summary_path)
+    rows = {}
+    pending = []
+    for exp in experiments:
+        if os.path.exists(os.path.join(model_root, f"{exp['exp_name']}.zip")):
+            print(f"⏭️  Skipping {exp['exp_name']} (model exists)")
+            # keep the wall-clock measured by the run that produced the model, if we have it
+            wall_clock_s = float(previous.get(exp["exp_name"], {}).get("wall_clock_s", 0.0))
+            rows[exp["exp_name"]] = summarize(exp, "skipped", wall_clock_s, log_root)
+        else:
+            pending.append(exp)
+
+    print(f"🚦 Running {len(pending)} experiments on {workers} workers "
+          f"({len(experiments) - len(pending)} already complete)")
+    # spawn: never fork a parent that already loaded torch
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(_run_experiment, exp, n_envs, total_timesteps, log_root, model_root): exp
+            for exp in pending
+        }
+        for future in as_completed(futures):
+            exp = futures[future]
+            status, wall_clock_s = future.result()
+            rows[exp["exp_name"]] = summarize(exp, status, wall_clock_s, log_root)
+            # rewrite after each experiment so an interrupted sweep still leaves a summary
+            write_summary([rows[e["exp_name"]] for e in experiments if e["exp_name"] in rows],
+                          summary_path)
+
+    ordered = [rows[e["exp_name"]] for e in experiments]
+    write_summary(ordered, summary_path)
+    print_summary(ordered)
+    print(f"\n📄 Summary written to {summary_path}")
+    return ordered
+
+
+def print_summary(rows):
+    print(f"\n{'experiment':<45} {'status':>8} {'final':>12} {'last10 mean':>12} {'wall s':>8}")
+    for row in rows:
+        print(f"{row['exp_name']:<45} {row['status']:>8} {row['final_reward']:>12.1f} "
+              f"{row['final10_mean_reward']:>12.1f} {row['wall_clock_s']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spec", type=str, help="YAML file with alpha/gamma/ped_weight lists")
+    parser.add_argument("--alpha", type=float, nargs="+", default=train_ppo.alpha_values)
+    parser.add_argument("--gamma", type=float, nargs="+", default=train_ppo.gamma_values)
+    parser.add_argument("--ped-weight", type=float, nargs="+", default=train_ppo.ped_weights)
+    parser.add_argument("--timesteps", type=int, default=10_000)
+    parser.add_argument("--n-envs", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log-root", type=str, default=train_ppo.LOG_ROOT)
+    parser.add_argument("--model-root", type=str, default=train_ppo.MODEL_ROOT)
+    args = parser.parse_args()
+
+    options = {"total_timesteps": args.timesteps, "n_envs": args.n_envs, "workers": args.workers}
+    if args.spec:
+        experiments, spec_options = load_spec(args.spec)
+        options.update(spec_options)
+    else:
+        experiments = expand_grid(args.alpha, args.gamma, args.ped_weight)
+
+    run_sweep(experiments, log_root=args.log_root, model_root=args.model_root, **options)
@@ -5,13 +5,11 @@ import traceback
 import numpy as np
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines3.common.monitor import Monitor
 from gymnasium import Env
 from gymnasium.spaces import Discrete, Box
 
-import traci
-
 # Add env module path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
@@ -26,12 +24,12 @@ os.makedirs(LOG_DIR, exist_ok=True)
 
 MAX_STEPS     = 1000
 USE_GUI       = False
-PHASE_ORDER   = [0, 1, 2, 3, 4, 5, 6, 7]
-PHASE_DURATION = {0: 40, 1: 10, 2: 5, 3: 15, 4: 40, 5: 10, 6: 5, 7: 3}
+BACKEND       = "traci"  # or "libsumo" for in-process SUMO
+N_ENVS        = 1  # >1 runs one SUMO instance per SubprocVecEnv worker
 # ────────────────────────────────────────────────────────
 
 class StaticTLBaselineEnv(Env):
-    def __init__(self):
+    def __init__(self, log_dir=None):
         super().__init__()
         self.env = SingleAgentCrosswalkEnv(
             net_file=SUMO_NET,
@@ -42,10 +40,14 @@ class StaticTLBaselineEnv(Env):
             alpha=0.05,
             gamma=0.05,
             ped_weight=0.5,
-            veh_weight=0.5
+            veh_weight=0.5,
+            log_dir=log_dir,
+            backend=BACKEND
         )
         self.action_space = Discrete(1)  # dummy single action
         self.observation_space = self.env.observation_space
+        # fixed-time plan: every phase of the net's TL program, with its own duration
+        self.cycle = self.env.phase_program.cycle()
         self.phase_idx = 0
 
     def reset(self, *, seed=None, options=None):
@@ -54,8 +56,8 @@ class StaticTLBaselineEnv(Env):
         return obs, {}
 
     def step(self, action):
-        phase = PHASE_ORDER[self.phase_idx % len(PHASE_ORDER)]
-        self.env._set_phase_and_step(phase)
+        phase, duration = self.cycle[self.phase_idx % len(self.cycle)]
+        self.env._run_phase(phase, duration)
         self.phase_idx += 1
         obs = self.env._get_observation()
         reward = self.env._compute_reward()
@@ -68,18 +70,24 @@ class StaticTLBaselineEnv(Env):
 
 # ─── Train Static Baseline ───────────────────────────────
 def train_static_baseline():
+    env = None
     try:
-        def make_env():
-            return Monitor(StaticTLBaselineEnv(), filename=os.path.join(LOG_DIR, "monitor.csv"))
+        def make_env(rank):
+            def _init():
+                monitor_name = "monitor.csv" if rank == 0 else f"{rank}.monitor.csv"
+                return Monitor(StaticTLBaselineEnv(log_dir=LOG_DIR),
+                               filename=os.path.join(LOG_DIR, monitor_name))
+            return _init
 
-        env = DummyVecEnv([make_env])
+        env_fns = [make_env(rank) for rank in range(N_ENVS)]
+        env = DummyVecEnv(env_fns) if N_ENVS == 1 else SubprocVecEnv(env_fns)
         model = PPO(
             policy="MlpPolicy",
             env=env,
             verbose=1,
             device="cpu",
             tensorboard_log=LOG_DIR,
-            n_steps=1000,
+            n_steps=max(1000 // N_ENVS, 1),
             batch_size=250,
             learning_rate=1e-4,
             gamma=0.99
@@ -93,5 +101,9 @@ def train_static_baseline():
         print("❌ Training failed")
         traceback.print_exc()
 
+    finally:
+        if env is not None:
+            env.close()
+
 if __name__ == "__main__":
     train_static_baseline()
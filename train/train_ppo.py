@@ -2,14 +2,12 @@
 import os, sys, traceback
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.env_checker import check_env
-from gymnasium.wrappers import TimeLimit
+from stable_baselines3.common.callbacks import CallbackList
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from env.single_agent_crosswalk_env import SingleAgentCrosswalkEnv
-from utils.logging_callback import RewardLoggingCallback
+from env.vec_env import make_vec_env
+from utils.logging_callback import ProfilingCallback, RewardLoggingCallback
 
 # Paths
 SUMO_NET   = "intersection/environment.net.xml"
@@ -17,70 +15,137 @@ SUMO_ROUTE = "intersection/episode_routes.rou.xml"
 LOG_ROOT   = "logs/ablation_crosswalk/"
 MODEL_ROOT = "models/"
 
-# Ensure log dirs exist
-os.makedirs(LOG_ROOT, exist_ok=True)
-os.makedirs(MODEL_ROOT, exist_ok=True)
-
 # Parameter grid
 alpha_values = [0.01, 0.05]
 gamma_values = [.1]
 ped_weights  = [.35, .4]
 
-exp_id = 0
-for alpha in alpha_values:
-    for gamma in gamma_values:
-        for ped_w in ped_weights:
-            veh_w = 1.0 - ped_w
-            exp_name = f"exp_{exp_id}_a{alpha}_g{gamma}_pw{ped_w}_vw{veh_w}"
-            log_dir = os.path.join(LOG_ROOT, exp_name)
-            model_path = os.path.join(MODEL_ROOT, f"{exp_name}.zip")
-            crash_log = os.path.join(log_dir, "crash.log")
-
-            os.makedirs(log_dir, exist_ok=True)
-            with open(crash_log, "w") as f:
-                f.write(f"🚦 SUMO RL Log Start for {exp_name}\n\n")
-
-            def log_exception(msg, exc):
-                with open(crash_log, "a") as f:
-                    f.write(f"\n❌ {msg}\n")
-                    traceback.print_exc(file=f)
-
-            try:
-                def make_env():
-                    env = SingleAgentCrosswalkEnv(
-                        net_file=SUMO_NET,
-                        route_file=SUMO_ROUTE,
-                        sumo_binary="sumo",
-                        use_gui=False,
-                        max_steps=1000,
-                        alpha=alpha,
-                        gamma=gamma,
-                        ped_weight=ped_w,
-                        veh_weight=veh_w
-                    )
-                    return Monitor(TimeLimit(env, max_episode_steps=1000),
-                                   filename=os.path.join(log_dir, "monitor.csv"))
-
-                env = DummyVecEnv([make_env])
-                model = PPO(
-                    policy="MlpPolicy",
-                    env=env,
-                    verbose=0,
-                    device="cpu",
-                    tensorboard_log=log_dir,
-                    n_steps=1000,
-                    batch_size=250,
-                    learning_rate=1e-4,
-                    gamma=0.99
-                )
-
-                callback = RewardLoggingCallback(log_dir=log_dir)
-                model.learn(total_timesteps=10_000, callback=callback, progress_bar=True)
-                model.save(model_path)
-                print(f"✅ Finished {exp_name}")
-
-            except Exception as e:
-                log_exception("Training failed", e)
-                print(f"❌ Failed {exp_name}")
-
-            exp_id += 1
+# Simulator backend: "traci" (socket) or "libsumo" (in-process, one instance per worker)
+BACKEND = os.environ.get("SUMO_BACKEND", "traci")
+
+# "load" keeps each SUMO process alive across episodes instead of relaunching it
+RESET_MODE = "load"
+
+# Per-episode randomized demand, e.g. dict(size=8, max_disk_mb=256) to train on a
+# background-generated pool of route files instead of SUMO_ROUTE (None = fixed route)
+SCENARIO_POOL = None
+
+# Parallel SUMO instances per experiment (1 keeps the old DummyVecEnv path).
+# The sweep runner already spreads experiments across cores, one SUMO each.
+N_ENVS = int(os.environ.get("N_ENVS", 1))
+
+# How the N_ENVS are stepped: "subproc" (one worker process each), "thread" (worker threads
+# over separate TraCI connections, see env/vec_env.py) or "dummy"; unset picks DummyVecEnv for
+# one env and SubprocVecEnv otherwise
+VEC_ENV = os.environ.get("VEC_ENV")
+
+# Stage timings and TraCI call counts under profile/ in TensorBoard: "1" to enable,
+# "trace" to also write Chrome traces (trace_*.json) into each experiment's log dir
+PROFILE = os.environ.get("SUMO_PROFILE", "")
+
+# Policy weights to start from, e.g. a surrogate-pretrained model from
+# train/pretrain_surrogate.py (same reward weights); None trains from scratch
+INIT_MODEL = os.environ.get("INIT_MODEL")
+
+# "1" keeps every (obs, action, reward, next_obs) transition with its reward components in
+# each experiment's transitions/ dir, for offline RL and re-weighting (utils/transition_store.py)
+RECORD_TRANSITIONS = os.environ.get("RECORD_TRANSITIONS", "")
+
+
+def train_experiment(exp_name, alpha, gamma, ped_w, veh_w,
+                     n_envs=N_ENVS, total_timesteps=10_000,
+                     log_root=LOG_ROOT, model_root=MODEL_ROOT, progress_bar=True, resume=False):
+    # resume=True continues the saved model (weights, optimizer state and timestep count) for
+    # another total_timesteps steps and appends to its logs; it starts fresh if none is saved
+    log_dir = os.path.join(log_root, exp_name)
+    model_path = os.path.join(model_root, f"{exp_name}.zip")
+    crash_log = os.path.join(log_dir, "crash.log")
+    resume = resume and os.path.exists(model_path)
+
+    os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(model_root, exist_ok=True)
+    with open(crash_log, "a" if resume else "w") as f:
+        f.write(f"🚦 SUMO RL Log Start for {exp_name}\n\n")
+
+    def log_exception(msg, exc):
+        with open(crash_log, "a") as f:
+            f.write(f"\n❌ {msg}\n")
+            traceback.print_exc(file=f)
+
+    env = None
+    callback = None
+    try:
+        env = make_vec_env(
+            n_envs=n_envs,
+            vec_env=VEC_ENV,
+            resume=resume,
+            log_dir=log_dir,
+            max_episode_steps=1000,
+            net_file=SUMO_NET,
+            route_file=SUMO_ROUTE,
+            sumo_binary="sumo",
+            use_gui=False,
+            max_steps=1000,
+            alpha=alpha,
+            gamma=gamma,
+            ped_weight=ped_w,
+            veh_weight=veh_w,
+            backend=BACKEND,
+            reset_mode=RESET_MODE,
+            scenario_pool=SCENARIO_POOL,
+            profile=bool(PROFILE),
+            profile_trace=os.path.join(log_dir, "trace_{label}.json") if PROFILE == "trace" else None,
+            record_dir=os.path.join(log_dir, "transitions") if RECORD_TRANSITIONS else None
+        )
+        if resume:
+            model = PPO.load(model_path, env=env, device="cpu", tensorboard_log=log_dir)
+            print(f"🔁 {exp_name}: resuming from {model.num_timesteps} steps")
+        else:
+            model = PPO(
+                policy="MlpPolicy",
+                env=env,
+                verbose=0,
+                device="cpu",
+                tensorboard_log=log_dir,
+                # keep 1000 transitions per update regardless of worker count
+                n_steps=max(1000 // n_envs, 1),
+                batch_size=250,
+                learning_rate=1e-4,
+                gamma=0.99
+            )
+        if INIT_MODEL and not resume:
+            # weights only: the fine-tuning hyperparameters above stay in effect
+            model.set_parameters(INIT_MODEL, device="cpu")
+            print(f"🔁 {exp_name}: starting from {INIT_MODEL}")
+
+        callback = RewardLoggingCallback(log_dir=log_dir, append=resume)
+        callbacks = [callback]
+        if PROFILE:
+            trace_path = os.path.join(log_dir, "trace_main.json") if PROFILE == "trace" else None
+            callbacks.append(ProfilingCallback(trace_path=trace_path, verbose=1))
+        model.learn(total_timesteps=total_timesteps, callback=CallbackList(callbacks),
+                    progress_bar=progress_bar, reset_num_timesteps=not resume)
+        model.save(model_path)
+        print(f"✅ Finished {exp_name}")
+        return True
+
+    except Exception as e:
+        log_exception("Training failed", e)
+        print(f"❌ Failed {exp_name}")
+        return False
+
+    finally:
+        if callback is not None:
+            callback.close()
+        if env is not None:
+            env.close()
+
+
+def main():
+    from train.sweep import expand_grid, run_sweep
+    experiments = expand_grid(alpha_values, gamma_values, ped_weights)
+    run_sweep(experiments, n_envs=N_ENVS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,172 @@
 from stable_baselines3.common.callbacks import BaseCallback
 import os
 import csv
+import time
+import atexit
+import threading
+
+from utils.profiling import StageProfiler, format_summary, merge_summaries
+
+# Per-episode fields taken from the env's info["episode_stats"], after episode and reward
+STAT_FIELDS = ["mean_ped_wait", "max_ped_wait", "frustration", "veh_delay", "sim_s_per_s"]
+
 
 class RewardLoggingCallback(BaseCallback):
-    def __init__(self, log_dir, verbose=0):
+    # Every finished episode is written to rewards.csv (and handed to the OS) right away, so a
+    # killed process (SIGKILL, OOM kill, a libsumo segfault, SIGTERM) loses no row. Only the
+    # fsync is batched, by a background thread: when flush_every rows are unsynced, at least
+    # every flush_interval seconds, at training end and at interpreter exit (atexit). What a
+    # machine crash or power loss can still take is at most those unsynced rows.
+    # append=True continues an existing rewards.csv (resumed training) instead of starting
+    # over; a file with a different header (e.g. the old episode,reward layout) is kept as
+    # rewards.csv.<n>.bak and a new rewards.csv is started, with episode numbers continuing.
+    HEADER = ["episode", "reward"] + STAT_FIELDS
+
+    def __init__(self, log_dir, verbose=0, flush_every=64, flush_interval=5.0, append=False):
         super().__init__(verbose)
         self.log_dir = log_dir
         self.episode_rewards = []
         self.csv_path = os.path.join(self.log_dir, "rewards.csv")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
 
         # Prepare CSV file
-        with open(self.csv_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["episode", "reward"])
+        if append and os.path.exists(self.csv_path):
+            # episode numbers continue where the previous run stopped
+            with open(self.csv_path, newline="") as f:
+                reader = csv.DictReader(f)
+                self.episode_rewards = [float(row["reward"]) for row in reader]
+                header = reader.fieldnames
+            if header != self.HEADER:
+                self._rotate()
+        if not (append and os.path.exists(self.csv_path)):
+            with open(self.csv_path, "w", newline="") as f:
+                csv.writer(f).writerow(self.HEADER)
+        self._file = open(self.csv_path, "a", newline="")
+        self._writer = csv.writer(self._file)
+
+        self._thread = threading.Thread(target=self._run, name="reward-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _rotate(self):
+        n = 0
+        while os.path.exists(f"{self.csv_path}.{n}.bak"):
+            n += 1
+        os.replace(self.csv_path, f"{self.csv_path}.{n}.bak")
+        print(f"⚠️  {self.csv_path} has another column layout; kept as {self.csv_path}.{n}.bak")
 
     def _on_step(self) -> bool:
         if self.locals.get("dones") is not None:
             for idx, done in enumerate(self.locals["dones"]):
                 if done:
-                    reward = self.locals["infos"][idx].get("episode", {}).get("r", None)
+                    info = self.locals["infos"][idx]
+                    reward = info.get("episode", {}).get("r", None)
                     if reward is not None:
                         episode_num = len(self.episode_rewards)
                         self.episode_rewards.append(reward)
-                        with open(self.csv_path, "a", newline="") as f:
-                            writer = csv.writer(f)
-                            writer.writerow([episode_num, reward])
+                        stats = info.get("episode_stats", {})
+                        row = [episode_num, reward] + [stats.get(k, "") for k in STAT_FIELDS]
+                        with self._lock:
+                            self._writer.writerow(row)
+                            self._file.flush()
+                            self._unsynced += 1
+                            if self._unsynced >= self.flush_every:
+                                self._wake.set()
                         if self.verbose > 0:
                             print(f"[Callback] Episode {episode_num} Reward: {reward:.2f}")
         return True
+
+    def _on_training_end(self) -> None:
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        # Rows are already written; this makes them durable
+        with self._lock:
+            if not self._unsynced or self._file.closed:
+                return
+            self._unsynced = 0
+            fd = self._file.fileno()
+        os.fsync(fd)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        atexit.unregister(self.close)
+
+
+class ProfilingCallback(BaseCallback):
+    # Times policy inference (the rollout forward passes), rollout collection and the PPO
+    # update in the training process, merges in the env workers' stage timings and TraCI
+    # call counts (env profile=True), and logs them under profile/ in TensorBoard.
+    def __init__(self, trace_path=None, verbose=0):
+        super().__init__(verbose)
+        self.trace_path = trace_path
+        self.profiler = StageProfiler(trace=trace_path is not None)
+        self.summary = None
+        self._rollout_start = None
+        self._rollout_end = None
+        self._inference_ns = 0
+
+    def _on_training_start(self) -> None:
+        policy = self.model.policy
+        forward = policy.forward
+        profiler = self.profiler
+
+        def timed_forward(*args, **kwargs):
+            with profiler.stage("inference"):
+                return forward(*args, **kwargs)
+        policy.forward = timed_forward
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter_ns()
+        if self._rollout_end is not None:
+            self.profiler.add("ppo_update", self._rollout_end, now)
+        self._rollout_start = now
+        self._inference_ns = self._stage_ns("inference")
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        self._rollout_end = time.perf_counter_ns()
+        # the forward passes ran inside this rollout, so they are not part of its self time
+        self.profiler.add("rollout", self._rollout_start, self._rollout_end,
+                          self._stage_ns("inference") - self._inference_ns)
+        self.summary = merge_summaries(
+            [self.profiler.summary()] + self.training_env.env_method("profile_summary"))
+        for name, s in self.summary["stages"].items():
+            self.logger.record(f"profile/{name}_total_s", s["total_s"])
+            self.logger.record(f"profile/{name}_self_s", s["self_s"])
+            self.logger.record(f"profile/{name}_mean_us", s["mean_us"])
+        if self.summary["traci_calls"] and self.num_timesteps:
+            self.logger.record("profile/traci_calls_per_step",
+                               sum(self.summary["traci_calls"].values()) / self.num_timesteps)
+
+    def _stage_ns(self, name):
+        stage = self.profiler.stages.get(name)
+        return stage[1] if stage else 0
+
+    def _on_training_end(self) -> None:
+        if self.trace_path:
+            self.profiler.write_chrome_trace(self.trace_path)
+        if self.summary and self.verbose > 0:
+            print(format_summary(self.summary, self.num_timesteps))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# NumPy-only inference for a trained SB3 MlpPolicy (Box observations, Discrete actions).
+# export_policy() dumps the actor weights to a small .npz; NumpyPolicy runs the same forward
+# pass without torch, for deployment or for cheap batched evaluation.
+#
+#   python utils/numpy_policy.py models/exp_0.zip          # -> models/exp_0_numpy.npz
+import os
+import argparse
+import numpy as np
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0.0),
+    "Identity": lambda x: x,
+}
+
+
+def export_policy(model, path):
+    import torch.nn as nn
+    policy = model.policy
+    if type(policy.features_extractor).__name__ != "FlattenExtractor":
+        raise ValueError("Only MlpPolicy with the default FlattenExtractor can be exported")
+    if not hasattr(policy.action_space, "n"):
+        raise ValueError("Only Discrete action spaces can be exported")
+
+    arrays, activations = {}, []
+    layers = [m for m in policy.mlp_extractor.policy_net] + [policy.action_net]
+    for module in layers:
+        if isinstance(module, nn.Linear):
+            i = len(activations)
+            # stored as (in, out) so the forward pass is x @ W + b
+            arrays[f"W{i}"] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+            arrays[f"b{i}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            activations.append("Identity")
+        else:
+            name = type(module).__name__
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {name!r}")
+            activations[-1] = name
+    np.savez(path, activations=np.array(activations), **arrays)
+    return path
+
+
+class NumpyPolicy:
+    def __init__(self, weights, biases, activations):
+        self.weights = weights
+        self.biases = biases
+        self.activations = [ACTIVATIONS[a] for a in activations]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            activations = [str(a) for a in data["activations"]]
+            n = len(activations)
+            return cls([data[f"W{i}"] for i in range(n)], [data[f"b{i}"] for i in range(n)], activations)
+
+    def logits(self, obs):
+        x = np.asarray(obs, dtype=np.float32)
+        for W, b, act in zip(self.weights, self.biases, self.activations):
+            x = act(x @ W + b)
+        return x
+
+    def predict(self, obs, deterministic=True):
+        # Same call shape as SB3: a single observation gives a scalar action, a batch an array
+        obs = np.asarray(obs, dtype=np.float32)
+        actions = self.logits(obs.reshape(-1, obs.shape[-1])).argmax(axis=1)
+        return (actions[0] if obs.ndim == 1 else actions), None
+
+
+def load_policy(path):
+    # .npz exports run on NumPy, anything else is loaded as an SB3 PPO model
+    if path.endswith(".npz"):
+        return NumpyPolicy.load(path)
+    from stable_baselines3 import PPO
+    return PPO.load(path, device="cpu")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", type=str)
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+
+    from stable_baselines3 import PPO
+    out = args.out or args.model.replace(".zip", "") + "_numpy.npz"
+    export_policy(PPO.load(args.model, device="cpu"), out)
+    print(f"💾 Exported {args.model} -> {out} ({os.path.getsize(out) / 1024:.1f} KiB)")
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+
+# Cap on buffered Chrome trace events (~100 bytes each), so tracing a long run stays bounded
+MAX_TRACE_EVENTS = 1_000_000
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._open_stages().append(0)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        child_ns = self.profiler._open_stages().pop()
+        self.profiler.add(self.name, self.start, end, child_ns)
+        return False
+
+
+class StageProfiler:
+    # Cumulative and per-call timings for named stages plus TraCI call counts. Use
+    # `with profiler.stage("observe"): ...`; with trace=True every call is also kept as a
+    # Chrome trace event (chrome://tracing, ui.perfetto.dev).
+    # Stages can nest. total_s is inclusive (a stage's own time plus its nested stages),
+    # self_s is exclusive, so self_s sums to the profiled wall time of one thread.
+    # TraCI calls are only counted, their latency is part of whichever stage is open.
+    enabled = True
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self.stages = {}   # name -> [calls, total_ns, min_ns, max_ns, self_ns]
+        self.calls = {}    # TraCI function -> call count
+        self.events = []
+
+    def _open_stages(self):
+        # this thread's open stages, innermost last, each with the ns spent in its children
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add(self, name, start_ns, end_ns, child_ns=0):
+        # child_ns: time of stages nested inside this one, left out of its self time
+        elapsed = end_ns - start_ns
+        s = self.stages.get(name)
+        if s is None:
+            self.stages[name] = [1, elapsed, elapsed, elapsed, elapsed - child_ns]
+        else:
+            s[0] += 1
+            s[1] += elapsed
+            s[2] = min(s[2], elapsed)
+            s[3] = max(s[3], elapsed)
+            s[4] += elapsed - child_ns
+        stack = self._open_stages()
+        if stack:
+            stack[-1] += elapsed
+        if self.trace and len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append({"name": name, "ph": "X", "ts": start_ns / 1e3, "dur": elapsed / 1e3,
+                                "pid": os.getpid(), "tid": threading.get_ident()})
+
+    def count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def summary(self):
+        return {
+            "stages": {name: {"calls": c, "total_s": t / 1e9, "self_s": own / 1e9,
+                              "mean_us": t / c / 1e3, "min_us": lo / 1e3, "max_us": hi / 1e3}
+                       for name, (c, t, lo, hi, own) in self.stages.items()},
+            "traci_calls": dict(self.calls),
+        }
+
+    def write_chrome_trace(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class NullProfiler:
+    # Stand-in when profiling is off: stage() hands back one shared no-op context
+    enabled = False
+    _null = nullcontext()
+
+    def stage(self, name):
+        return self._null
+
+    def summary(self):
+        return {"stages": {}, "traci_calls": {}}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _CountingDomain:
+    def __init__(self, target, prefix, profiler):
+        self._target = target
+        self._prefix = prefix
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        key = f"{self._prefix}{name}"
+        profiler = self._profiler
+
+        def counted(*args, **kwargs):
+            profiler.count(key)
+            return attr(*args, **kwargs)
+        # cache on the instance so later lookups skip __getattr__
+        setattr(self, name, counted)
+        return counted
+
+
+class CountingConnection(_CountingDomain):
+    # Wraps a TraCI connection (or the libsumo module) and counts every API call,
+    # e.g. "simulationStep", "person.getWaitingTime"
+    DOMAINS = ("edge", "person", "vehicle", "simulation", "trafficlight", "lane", "junction")
+
+    def __init__(self, conn, profiler):
+        super().__init__(conn, "", profiler)
+        for domain in self.DOMAINS:
+            setattr(self, domain, _CountingDomain(getattr(conn, domain), f"{domain}.", profiler))
+
+
+def merge_summaries(summaries):
+    # Combines summaries from several envs (e.g. SubprocVecEnv workers) into one
+    stages, calls = {}, {}
+    for summary in summaries:
+        for name, s in summary["stages"].items():
+            m = stages.setdefault(name, {"calls": 0, "total_s": 0.0, "self_s": 0.0,
+                                         "min_us": np.inf, "max_us": 0.0})
+            m["calls"] += s["calls"]
+            m["total_s"] += s["total_s"]
+            m["self_s"] += s["self_s"]
+            m["min_us"] = min(m["min_us"], s["min_us"])
+            m["max_us"] = max(m["max_us"], s["max_us"])
+        for name, n in summary["traci_calls"].items():
+            calls[name] = calls.get(name, 0) + n
+    for s in stages.values():
+        s["mean_us"] = s["total_s"] / s["calls"] * 1e6
+    return {"stages": stages, "traci_calls": calls}
+
+
+def format_summary(summary, agent_steps=None):
+    # "total s" includes nested stages (rollout contains inference), "self s" does not and
+    # is the additive column. Merged env workers run alongside the training process (in
+    # SubprocVecEnv workers, or inside rollout with DummyVecEnv), so across processes even
+    # self times overlap in wall time.
+    stages = summary["stages"]
+    lines = [f"{'stage':<14} {'calls':>8} {'total s':>9} {'self s':>9} {'mean µs':>10} {'min µs':>9} {'max µs':>10}"]
+    for name, s in sorted(stages.items(), key=lambda kv: -kv[1]["total_s"]):
+        lines.append(f"{name:<14} {s['calls']:>8} {s['total_s']:>9.3f} {s['self_s']:>9.3f} {s['mean_us']:>10.1f} "
+                     f"{s['min_us']:>9.1f} {s['max_us']:>10.1f}")
+    calls = summary["traci_calls"]
+    if calls:
+        total = sum(calls.values())
+        per_step = f" ({total / agent_steps:.1f} per agent step)" if agent_steps else ""
+        lines.append(f"\nTraCI calls: {total}{per_step}")
+        for name, n in sorted(calls.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {name:<36} {n:>10}")
+    return "\n".join(lines)
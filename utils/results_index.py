@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# Columnar index of every training run under logs/: experiment parameters parsed from the run
+# name, learning curves (monitor.csv / rewards.csv), TensorBoard scalars and evaluation metrics
+# (eval/results.csv, evaluation_results/*_metrics.csv), kept as Parquet tables in INDEX_DIR.
+#
+# Scans are incremental: a manifest keeps (size, mtime) of every ingested file, and only new or
+# changed files are read again; rows of deleted files are dropped. The per-run summary table
+# (runs.parquet) is rebuilt from the stored curves, so queries never touch the raw logs.
+#
+#   python utils/results_index.py scan
+#   python utils/results_index.py best                       # best config by final-10 mean reward
+#   python utils/results_index.py best --by run --where "gamma > 0" --top 5
+#   python utils/results_index.py runs --sort eval_mean_reward
+#   python utils/results_index.py curves "a0.05_g0.1_pw0.35" --smooth 5 --out curves.png
+import os
+import re
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# ─── Configuration ─────────────────────────────────────
+ROOTS      = ["logs", "eval", "evaluation_results"]
+INDEX_DIR  = "logs/results_index"
+FINAL_N    = 10      # episodes in the final-N mean reward
+# ───────────────────────────────────────────────────────
+
+PARAMS_RE = re.compile(r"(?:exp_(?P<exp_id>\d+)_)?a(?P<alpha>[-+\d.e]+)_g(?P<gamma>[-+\d.e]+)"
+                       r"_pw(?P<ped_weight>[-+\d.e]+)_vw(?P<veh_weight>[-+\d.e]+)")
+PARAMS = ["alpha", "gamma", "ped_weight", "veh_weight"]
+TABLES = {
+    "files":   ["path", "kind", "run", "size", "mtime_ns"],
+    "curves":  ["run", "path", "source", "worker", "episode", "reward", "length", "time"],
+    "scalars": ["run", "path", "tag", "step", "value", "wall_time"],
+    "evals":   ["key", "path", "metric", "value"],
+}
+# run directories hold these; event files belong to the run directory above their PPO_n dir
+RUN_FILES = re.compile(r"^(?:(?:\d+\.)?monitor\.csv|rewards\.csv)$")
+SKIP_DIRS = {"transitions", "sumo_logs", "__pycache__"}
+
+
+def parse_params(name):
+    # {"exp_id", "alpha", "gamma", "ped_weight", "veh_weight"} from an experiment name, e.g.
+    # exp_3_a0.05_g0.1_pw0.35_vw0.65 or surrogate_a0.01_g0.1_pw0.35_vw0.65; NaN when absent
+    match = PARAMS_RE.search(name)
+    if match is None:
+        return {"exp_id": np.nan, **{p: np.nan for p in PARAMS}}
+    params = {p: round(float(match[p]), 10) for p in PARAMS}
+    params["exp_id"] = float(match["exp_id"]) if match["exp_id"] is not None else np.nan
+    return params
+
+
+def discover(roots, index_dir=INDEX_DIR):
+    # {path: (kind, run)} for every file the index ingests
+    found = {}
+    skip = os.path.abspath(index_dir)
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS
+                           and os.path.abspath(os.path.join(dirpath, d)) != skip]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if RUN_FILES.match(name):
+                    kind = "rewards" if name == "rewards.csv" else "monitor"
+                    found[path] = (kind, dirpath)
+                elif name.startswith("events.out.tfevents."):
+                    found[path] = ("events", os.path.dirname(dirpath))
+                elif name == "results.csv" and os.path.basename(dirpath) == "eval":
+                    found[path] = ("eval_results", "")
+                elif name.endswith("_metrics.csv"):
+                    found[path] = ("eval_metrics", "")
+    return found
+
+
+def _read_monitor(path, run):
+    df = pd.read_csv(path, comment="#")
+    name = os.path.basename(path)
+    worker = 0 if name == "monitor.csv" else int(name.split(".")[0])
+    return pd.DataFrame({"run": run, "path": path, "source": "monitor", "worker": worker,
+                         "episode": np.arange(len(df)), "reward": df["r"].astype(float),
+                         "length": df["l"].astype(float), "time": df["t"].astype(float)})
+
+
+def _read_rewards(path, run):
+    df = pd.read_csv(path)
+    return pd.DataFrame({"run": run, "path": path, "source": "rewards", "worker": 0,
+                         "episode": df["episode"].astype(int), "reward": df["reward"].astype(float),
+                         "length": np.nan, "time": np.nan})
+
+
+def _read_events(path, run):
+    # Scalars from a TensorBoard event file; needs the tensorboard package
+    from tensorboard.backend.event_processing.event_file_loader import EventFileLoader
+    from tensorboard.util import tensor_util
+    rows = []
+    for event in EventFileLoader(path).Load():
+        for value in event.summary.value:
+            kind = value.WhichOneof("value")
+            if kind == "simple_value":
+                scalar = value.simple_value
+            elif kind == "tensor" and value.metadata.plugin_data.plugin_name == "scalars":
+                scalar = float(tensor_util.make_ndarray(value.tensor))
+            else:
+                continue
+            rows.append((run, path, value.tag, event.step, scalar, event.wall_time))
+    return pd.DataFrame(rows, columns=TABLES["scalars"])
+
+
+def _read_eval_results(path):
+    # eval/evaluate_all.sh output: model,mean_reward (non-numeric values for failed runs)
+    df = pd.read_csv(path)
+    return pd.DataFrame({"key": df["model"].str.replace(r"\.zip$", "", regex=True), "path": path,
+                         "metric": "eval_mean_reward",
+                         "value": pd.to_numeric(df["mean_reward"], errors="coerce")})
+
+
+def _read_eval_metrics(path):
+    # evaluate_policy.py output: <model>_metrics.csv with metric,value rows
+    df = pd.read_csv(path)
+    key = os.path.basename(path)[:-len("_metrics.csv")]
+    return pd.DataFrame({"key": key, "path": path, "metric": "eval_" + df["metric"],
+                         "value": pd.to_numeric(df["value"], errors="coerce")})
+
+
+def _read(path, kind, run):
+    if kind == "monitor":
+        return "curves", _read_monitor(path, run)
+    if kind == "rewards":
+        return "curves", _read_rewards(path, run)
+    if kind == "events":
+        return "scalars", _read_events(path, run)
+    if kind == "eval_results":
+        return "evals", _read_eval_results(path)
+    return "evals", _read_eval_metrics(path)
+
+
+def load_table(name, index_dir=INDEX_DIR):
+    path = os.path.join(index_dir, f"{name}.parquet")
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=TABLES.get(name, []))
+    return pd.read_parquet(path)
+
+
+def scan(roots=ROOTS, index_dir=INDEX_DIR, verbose=True):
+    # Brings the index up to date; returns (read, dropped) file counts
+    os.makedirs(index_dir, exist_ok=True)
+    files = load_table("files", index_dir).set_index("path")
+    found = discover(roots, index_dir)
+
+    stats = {path: os.stat(path) for path in found}
+    changed = [p for p, st in stats.items()
+               if p not in files.index or (files.at[p, "size"], files.at[p, "mtime_ns"]) != (st.st_size, st.st_mtime_ns)]
+    gone = [p for p in files.index if p not in found]
+    if not changed and not gone and os.path.exists(os.path.join(index_dir, "runs.parquet")):
+        return 0, 0
+
+    stale = set(changed) | set(gone)
+    tables = {name: load_table(name, index_dir) for name in ("curves", "scalars", "evals")}
+    tables = {name: df[~df["path"].isin(stale)] for name, df in tables.items()}
+    new = {name: [] for name in tables}
+    for path in changed:
+        kind, run = found[path]
+        try:
+            table, df = _read(path, kind, run)
+        except ImportError:
+            # not recorded, so the file is read once tensorboard is installed
+            print(f"⚠️  Skipping {path}: tensorboard is not installed")
+            stats.pop(path)
+            continue
+        except Exception as e:
+            # half-written or foreign files are retried on the next scan
+            print(f"⚠️  Skipping {path}: {e}")
+            stats.pop(path)
+            continue
+        new[table].append(df)
+
+    for name, df in tables.items():
+        frames = [df] + [f for f in new[name] if len(f)]
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else df
+        df.to_parquet(os.path.join(index_dir, f"{name}.parquet"), index=False)
+        tables[name] = df
+
+    files = pd.DataFrame([(p, found[p][0], found[p][1], st.st_size, st.st_mtime_ns) for p, st in stats.items()],
+                         columns=TABLES["files"])
+    files.to_parquet(os.path.join(index_dir, "files.parquet"), index=False)
+    summarize_runs(tables["curves"], tables["evals"], files).to_parquet(
+        os.path.join(index_dir, "runs.parquet"), index=False)
+    if verbose:
+        print(f"🔄 Indexed {len(changed)} new or changed file(s), dropped {len(gone)}")
+    return len(changed), len(gone)
+
+
+def summarize_runs(curves, evals, files):
+    # One row per run: parameters, learning-curve summary and evaluation metrics. The monitor
+    # files are preferred (episode length and time); rewards.csv is used for runs without them.
+    runs = sorted(r for r in files["run"].unique() if r)
+    rows = []
+    curves = curves.sort_values(["run", "source", "time", "worker", "episode"], kind="stable")
+    by_run = dict(list(curves.groupby("run", sort=False)))
+    for run in runs:
+        name = os.path.basename(run)
+        row = {"run": run, "group": os.path.basename(os.path.dirname(run)), "exp_name": name,
+               **parse_params(name)}
+        df = by_run.get(run)
+        if df is not None:
+            source = "monitor" if (df["source"] == "monitor").any() else "rewards"
+            rewards = df.loc[df["source"] == source, "reward"].to_numpy()
+            row.update({
+                "episodes": len(rewards),
+                "final_reward": rewards[-1] if len(rewards) else np.nan,
+                f"final{FINAL_N}_mean_reward": rewards[-FINAL_N:].mean() if len(rewards) else np.nan,
+                "best_reward": rewards.max() if len(rewards) else np.nan,
+                "mean_reward": rewards.mean() if len(rewards) else np.nan,
+                "timesteps": df.loc[df["source"] == "monitor", "length"].sum() if source == "monitor" else np.nan,
+                "train_time_s": df["time"].max(),
+            })
+        rows.append(row)
+    runs = pd.DataFrame(rows)
+    if len(evals) and len(runs):
+        wide = evals.pivot_table(index="key", columns="metric", values="value", aggfunc="last")
+        runs = runs.merge(wide, left_on="exp_name", right_index=True, how="left")
+    return runs
+
+
+def best_configs(runs, metric=f"final{FINAL_N}_mean_reward", by="config", where=None, top=10):
+    if where:
+        runs = runs.query(where)
+    runs = runs.dropna(subset=[metric])
+    if by == "run":
+        return runs.sort_values(metric, ascending=False).head(top)[
+            ["run"] + PARAMS + ["episodes", metric]]
+    # runs of the same parameters (e.g. repeated sweeps) are averaged
+    grouped = runs.groupby(PARAMS)[metric].agg(["mean", "std", "count"]).reset_index()
+    grouped = grouped.rename(columns={"mean": metric, "std": f"{metric}_std", "count": "runs"})
+    return grouped.sort_values(metric, ascending=False).head(top)
+
+
+def plot_curves(curves, runs, pattern, smooth=5, out=None):
+    import matplotlib
+    if out:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    selected = runs[runs["run"].str.contains(pattern, regex=True)]["run"]
+    if selected.empty:
+        raise SystemExit(f"No runs match {pattern!r}")
+    plt.figure()
+    for run in selected:
+        df = curves[curves["run"] == run]
+        source = "monitor" if (df["source"] == "monitor").any() else "rewards"
+        df = df[df["source"] == source].sort_values(["time", "worker", "episode"])
+        rewards = df["reward"].rolling(window=smooth, min_periods=1).mean().to_numpy()
+        plt.plot(np.arange(len(rewards)), rewards, label=os.path.basename(run))
+    plt.xlabel("Episode #")
+    plt.ylabel(f"Reward ({smooth}-ep MA)")
+    plt.title("Episode reward")
+    plt.legend(fontsize="small")
+    plt.tight_layout()
+    if out:
+        plt.savefig(out)
+        print(f"📈 Plot written to {out}")
+    else:
+        plt.show()
+
+
+def _print_frame(df):
+    with pd.option_context("display.max_rows", None, "display.width", 200, "display.float_format", "{:.6g}".format):
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roots", nargs="+", default=ROOTS)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--no-scan", action="store_true", help="query the index as it is")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("scan")
+    best = sub.add_parser("best")
+    best.add_argument("--metric", default=f"final{FINAL_N}_mean_reward")
+    best.add_argument("--by", choices=["config", "run"], default="config")
+    best.add_argument("--where", help='pandas query, e.g. "gamma > 0 and episodes >= 50"')
+    best.add_argument("--top", type=int, default=10)
+    listing = sub.add_parser("runs")
+    listing.add_argument("--where")
+    listing.add_argument("--sort", default=f"final{FINAL_N}_mean_reward")
+    listing.add_argument("--columns", nargs="+")
+    curves = sub.add_parser("curves")
+    curves.add_argument("pattern", help="regex matched against run paths")
+    curves.add_argument("--smooth", type=int, default=5)
+    curves.add_argument("--out", help="write the plot to this file instead of showing it")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if not args.no_scan or args.command == "scan":
+        scan(args.roots, args.index_dir)
+    runs = load_table("runs", args.index_dir)
+    if args.command == "scan":
+        print(f"📦 {len(runs)} runs indexed in {args.index_dir} ({time.perf_counter() - start:.2f}s)")
+    elif args.command == "best":
+        _print_frame(best_configs(runs, args.metric, args.by, args.where, args.top))
+        print(f"\n⏱️  {len(runs)} runs, {time.perf_counter() - start:.2f}s")
+    elif args.command == "runs":
+        df = runs.query(args.where) if args.where else runs
+        df = df.sort_values(args.sort, ascending=False) if args.sort in df else df
+        columns = args.columns or ["run"] + PARAMS + ["episodes", "final_reward", f"final{FINAL_N}_mean_reward"]
+        _print_frame(df[[c for c in columns if c in df]])
+    else:
+        plot_curves(load_table("curves", args.index_dir), runs, args.pattern, args.smooth, args.out)
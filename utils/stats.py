@@ -0,0 +1,138 @@
+import os
+import numpy as np
+
+
+class OnlineStats:
+    # Constant-memory count/min/max/mean/std (Chan et al. batch merge of Welford moments)
+    # plus a fixed-resolution histogram sketch for quantiles. SUMO waiting times are
+    # multiples of the step length, so with resolution == step length the quantiles are
+    # exact; memory grows only with max_value / resolution, never with the sample count.
+    def __init__(self, quantiles=(0.95, 0.99), resolution=1.0):
+        self.quantiles = quantiles
+        self.resolution = resolution
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._hist = np.zeros(0, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = values.size
+        if n == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self._m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        bins = np.maximum(np.rint(values / self.resolution).astype(np.int64), 0)
+        counts = np.bincount(bins)
+        if counts.size > self._hist.size:
+            self._hist = np.pad(self._hist, (0, counts.size - self._hist.size))
+        self._hist[:counts.size] += counts
+
+    @property
+    def std(self):
+        return float(np.sqrt(self._m2 / self.count)) if self.count else float("nan")
+
+    def quantile(self, q):
+        if not self.count:
+            return float("nan")
+        # inverted CDF: smallest value with at least q of the samples at or below it
+        rank = int(np.ceil(q * self.count))
+        idx = int(np.searchsorted(np.cumsum(self._hist), max(rank, 1)))
+        return idx * self.resolution
+
+    def summary(self):
+        row = {
+            "count": self.count,
+            "min": float(self.min) if self.count else float("nan"),
+            "max": float(self.max) if self.count else float("nan"),
+            "mean": float(self.mean) if self.count else float("nan"),
+            "std": self.std,
+        }
+        for q in self.quantiles:
+            row[f"p{round(q * 100):d}"] = self.quantile(q)
+        return row
+
+
+class EntityWaitTracker:
+    # Per-step waiting-time samples for one entity class (pedestrians or vehicles), plus
+    # each entity's peak wait, recorded once when it leaves the simulation ("final wait").
+    # Fed from the env's EntityRegistry (env/registry.py), which already keeps the peaks
+    # and reports departures. The set of IDs ever seen is kept for `unique`, which (as in
+    # the original evaluation) counts an ID that reappears in a later episode once.
+    def __init__(self, **stats_kwargs):
+        self.samples = OnlineStats(**stats_kwargs)
+        self.final = OnlineStats(**stats_kwargs)
+        self._seen = set()
+
+    def update(self, registry):
+        # registry: the entity class's EntityRegistry after the env's step
+        self.samples.update(registry.waits())
+        first, final_peaks = registry.drain()
+        self.final.update(final_peaks)
+        self._seen.update(first)
+
+    def finish(self, registry):
+        # entities still in the network when the episode ends count with their peak so far
+        first, final_peaks = registry.drain()
+        self.final.update(final_peaks)
+        self.final.update(registry.active_peaks())
+        self._seen.update(first)
+
+    @property
+    def unique(self):
+        # distinct IDs over the whole evaluation, across episodes
+        return len(self._seen)
+
+
+class RawSampleWriter:
+    # Optional raw (step, wait) output, written in fixed-size chunk files instead of one
+    # padded CSV: <prefix>_00000.npz ... or .parquet (requires pyarrow).
+    def __init__(self, prefix, fmt="npz", chunk_size=100_000):
+        if fmt not in ("npz", "parquet"):
+            raise ValueError(f"Unknown raw sample format {fmt!r}")
+        if fmt == "parquet":
+            import pyarrow  # noqa: F401  fail early if parquet output is not possible
+        self.prefix = prefix
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self._steps, self._waits = [], []
+        self._buffered = 0
+        self._chunk = 0
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+
+    def write(self, step, waits):
+        waits = np.asarray(waits, dtype=np.float32)
+        self._steps.append(np.full(waits.size, step, dtype=np.int32))
+        self._waits.append(waits)
+        self._buffered += waits.size
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered:
+            return
+        steps = np.concatenate(self._steps)
+        waits = np.concatenate(self._waits)
+        path = f"{self.prefix}_{self._chunk:05d}.{self.fmt}"
+        if self.fmt == "npz":
+            np.savez_compressed(path, step=steps, wait=waits)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.table({"step": steps, "wait": waits}), path)
+        self._steps, self._waits = [], []
+        self._buffered = 0
+        self._chunk += 1
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,48 @@
+import numpy as np
+
+# Per-step telemetry the env puts in info["telemetry"] when telemetry=True
+TELEMETRY_FIELDS = (
+    "reward", "ped_term", "veh_term", "frust_term",
+    "total_ped_wait", "total_veh_delay", "total_frustration",
+    "n_peds", "n_waiting_peds", "n_vehicles", "sim_time", "phase",
+)
+
+
+class TelemetryRecorder:
+    # Fixed-size ring buffer of the most recent `capacity` step rows plus running per-field
+    # sum/max for the whole episode, so recording costs O(1) time and memory per step no
+    # matter how long the episode runs.
+    def __init__(self, fields=TELEMETRY_FIELDS, capacity=1024):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(self.fields)))
+        self.reset()
+
+    def reset(self):
+        self.steps = 0
+        self._sum = np.zeros(len(self.fields))
+        self._max = np.full(len(self.fields), -np.inf)
+
+    def record(self, row):
+        values = np.fromiter((row[f] for f in self.fields), dtype=np.float64, count=len(self.fields))
+        self.buffer[self.steps % self.capacity] = values
+        self._sum += values
+        np.maximum(self._max, values, out=self._max)
+        self.steps += 1
+
+    def recent(self):
+        # Rows still in the buffer, oldest first
+        n = min(self.steps, self.capacity)
+        start = self.steps - n
+        idx = np.arange(start, self.steps) % self.capacity
+        return self.buffer[idx]
+
+    def episode_summary(self):
+        summary = {"steps": self.steps}
+        if not self.steps:
+            return summary
+        for i, field in enumerate(self.fields):
+            summary[f"{field}_sum"] = float(self._sum[i])
+            summary[f"{field}_mean"] = float(self._sum[i] / self.steps)
+            summary[f"{field}_max"] = float(self._max[i])
+        return summary
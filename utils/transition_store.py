@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# Transition recording for offline RL, behavior cloning and reward re-weighting.
+#
+# TransitionRecorder wraps a SingleAgentCrosswalkEnv (optionally inside TimeLimit/Monitor) and
+# appends every step to a dataset directory; TransitionDataset memory-maps it back, so datasets
+# far larger than RAM can be streamed in order or sampled at random.
+#
+# Layout: <root>/<chunk>/<column>.bin, raw little-endian arrays described by COLUMNS, plus a
+# meta.json per chunk with the env's reward weights. Chunks hold whole episodes and roll over
+# at the first reset after chunk_size transitions. Observations are stored once per step
+# (plus the reset observation of each episode) and transitions point into them, so next_obs
+# costs nothing. The pedestrian waits each reward was computed from are kept ragged
+# (ped_waits + ped_end offsets), which is what rewards() needs to recompute the frustration
+# term for new alpha/gamma values without rerunning SUMO.
+#
+#   python utils/transition_store.py logs/ablation_crosswalk/exp_0/transitions
+#   python utils/transition_store.py logs/ablation_crosswalk/exp_0/transitions --alpha 0.05 --gamma 0.2
+import os
+import sys
+import json
+import glob
+import argparse
+import numpy as np
+import gymnasium as gym
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from env.reward import frustration
+
+# column -> (dtype, shape of one row); "obs" rows are per observation, "ped_waits" rows per
+# pedestrian, every other column has one row per transition
+COLUMNS = {
+    "obs":          ("<f4", (12,)),
+    "obs_index":    ("<i4", ()),      # row of this transition's obs; next_obs is the row after
+    "action":       ("u1", ()),
+    "reward":       ("<f4", ()),
+    "terminated":   ("u1", ()),
+    "truncated":    ("u1", ()),
+    "ped_wait":     ("<f4", ()),      # raw Σ pedestrian wait
+    "veh_delay":    ("<f4", ()),      # raw Σ vehicle delay on the incoming edges
+    "frustration":  ("<f4", ()),      # raw Σ frustration at the recorded alpha
+    "ped_waits":    ("<f4", ()),
+    "ped_end":      ("<i8", ()),      # end offset of this transition's ped_waits
+}
+TRANSITION_COLUMNS = [c for c in COLUMNS if c not in ("obs", "ped_waits")]
+CHUNK_SIZE  = 100_000   # transitions per chunk (rounded up to whole episodes)
+FLUSH_EVERY = 1024      # buffered transitions per write
+
+
+class TransitionRecorder(gym.Wrapper):
+    def __init__(self, env, root, chunk_size=CHUNK_SIZE, flush_every=FLUSH_EVERY, prefix=None):
+        super().__init__(env)
+        self.root = root
+        self.chunk_size = chunk_size
+        self.flush_every = flush_every
+        # Chunk names start with the prefix (default: pid), so several recorders can share a root
+        self.prefix = prefix or f"p{os.getpid()}"
+        self._chunk_id = 0
+        self._dir = None
+        os.makedirs(root, exist_ok=True)
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        if self._dir is None or self._rows >= self.chunk_size:
+            self._open_chunk()
+        self._append_obs(obs)
+        self._episodes += 1
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        base = self.env.unwrapped
+        ped_waits, veh_delays = base.last_reward_inputs
+        ped_waits = np.asarray(ped_waits, dtype=np.float32)
+        self._ped_end += ped_waits.size
+        self._buf["obs_index"].append(self._n_obs - 1)
+        self._buf["action"].append(int(np.asarray(action).item()))
+        self._buf["reward"].append(reward)
+        self._buf["terminated"].append(terminated)
+        self._buf["truncated"].append(truncated)
+        self._buf["ped_wait"].append(ped_waits.sum(dtype=np.float64))
+        self._buf["veh_delay"].append(float(np.sum(veh_delays)))
+        self._buf["frustration"].append(frustration(ped_waits, base.alpha).sum())
+        self._buf["ped_waits"].append(ped_waits)
+        self._buf["ped_end"].append(self._ped_end)
+        self._append_obs(obs)
+        self._rows += 1
+        if len(self._buf["action"]) >= self.flush_every or terminated or truncated:
+            self.flush()
+        return obs, reward, terminated, truncated, info
+
+    def _append_obs(self, obs):
+        self._buf["obs"].append(np.asarray(obs, dtype=np.float32))
+        self._n_obs += 1
+
+    def _open_chunk(self):
+        self._close_chunk()
+        name = f"{self.prefix}_{self._chunk_id:05d}"
+        self._chunk_id += 1
+        self._dir = os.path.join(self.root, name)
+        os.makedirs(self._dir, exist_ok=True)
+        self._files = {c: open(os.path.join(self._dir, f"{c}.bin"), "ab") for c in COLUMNS}
+        self._buf = {c: [] for c in COLUMNS}
+        self._rows = self._n_obs = self._ped_end = self._episodes = 0
+        self._write_meta()
+
+    def flush(self):
+        if self._dir is None:
+            return
+        for column, (dtype, shape) in COLUMNS.items():
+            values = self._buf[column]
+            if not values:
+                continue
+            if column == "ped_waits":
+                array = np.concatenate(values).astype(dtype, copy=False)
+            else:
+                array = np.asarray(values, dtype=dtype).reshape((-1,) + shape)
+            self._files[column].write(array.tobytes())
+            self._files[column].flush()
+            values.clear()
+
+    def _write_meta(self):
+        base = self.env.unwrapped
+        meta = {
+            "transitions": self._rows,
+            "episodes": self._episodes,
+            "alpha": base.alpha, "gamma": base.gamma,
+            "ped_weight": base.ped_weight, "veh_weight": base.veh_weight,
+            "action_map": base.agent_action_map,
+        }
+        with open(os.path.join(self._dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def _close_chunk(self):
+        if self._dir is None:
+            return
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._write_meta()
+        self._dir = None
+
+    def close(self):
+        self._close_chunk()
+        super().close()
+
+
+class _Chunk:
+    # One chunk's columns as read-only memmaps. Row counts come from the file sizes, so a
+    # chunk whose writer died mid-episode is still readable up to its last complete row.
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.columns = {c: self._map(c, *spec) for c, spec in COLUMNS.items()}
+        n = min(len(self.columns[c]) for c in TRANSITION_COLUMNS)
+        # a transition needs its next_obs row and all of its pedestrian waits
+        n = min(n, int(np.searchsorted(self.columns["obs_index"][:n], len(self.columns["obs"]) - 1)))
+        n = min(n, int(np.searchsorted(self.columns["ped_end"][:n], len(self.columns["ped_waits"]), "right")))
+        self.size = n
+
+    def _map(self, column, dtype, shape):
+        path = os.path.join(self.path, f"{column}.bin")
+        row = np.dtype(dtype).itemsize * int(np.prod(shape))
+        rows = os.path.getsize(path) // row
+        if rows == 0:
+            return np.empty((0,) + shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,) + shape)
+
+    def ped_start(self, idx):
+        idx = np.asarray(idx)
+        ends = self.columns["ped_end"]
+        return np.where(idx > 0, ends[np.maximum(idx - 1, 0)], 0)
+
+    def gather(self, idx, columns, weights=None):
+        c = self.columns
+        out = {}
+        for column in columns:
+            if column == "obs":
+                out["obs"] = np.asarray(c["obs"][c["obs_index"][idx]])
+            elif column == "next_obs":
+                out["next_obs"] = np.asarray(c["obs"][c["obs_index"][idx] + 1])
+            elif column == "reward" and weights is not None:
+                out["reward"] = self.rewards(idx, **weights)
+            else:
+                out[column] = np.asarray(c[column][idx])
+        return out
+
+    def rewards(self, idx, alpha, gamma, ped_weight, veh_weight):
+        c = self.columns
+        ped_wait = c["ped_wait"][idx].astype(np.float64)
+        veh_delay = c["veh_delay"][idx].astype(np.float64)
+        if alpha == self.meta["alpha"]:
+            frust = c["frustration"][idx].astype(np.float64)
+        else:
+            # Σ frustration per transition over its slice of the ragged pedestrian waits
+            starts, ends = self.ped_start(idx), c["ped_end"][idx]
+            counts = ends - starts
+            flat = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            owner = np.repeat(np.arange(len(counts)), counts)
+            frust = np.bincount(owner, frustration(c["ped_waits"][flat], alpha), minlength=len(counts))
+        return -(ped_weight * ped_wait + veh_weight * veh_delay + gamma * frust)
+
+
+class TransitionDataset:
+    # Read side of TransitionRecorder: every chunk below root, indexed as one flat table.
+    # Batches are dicts of obs, action, reward, next_obs, terminated and truncated (plus any
+    # other COLUMNS asked for). Pass reward weights (alpha, gamma, ped_weight, veh_weight) to
+    # get rewards recomputed for those weights instead of the recorded ones.
+    DEFAULT_COLUMNS = ("obs", "action", "reward", "next_obs", "terminated", "truncated")
+
+    def __init__(self, root):
+        paths = sorted(os.path.dirname(p) for p in glob.glob(os.path.join(root, "**", "meta.json"), recursive=True))
+        self.chunks = [chunk for chunk in map(_Chunk, paths) if chunk.size]
+        if not self.chunks:
+            raise FileNotFoundError(f"No recorded transitions under {root}")
+        self.offsets = np.cumsum([0] + [chunk.size for chunk in self.chunks])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def _weights(self, weights):
+        if not weights:
+            return None
+        recorded = self.chunks[0].meta
+        return {k: weights.get(k, recorded[k]) for k in ("alpha", "gamma", "ped_weight", "veh_weight")}
+
+    def iter_batches(self, batch_size=4096, columns=DEFAULT_COLUMNS, **weights):
+        # Streams the dataset in recording order; a batch never spans two chunks
+        weights = self._weights(weights)
+        for chunk in self.chunks:
+            for start in range(0, chunk.size, batch_size):
+                idx = np.arange(start, min(start + batch_size, chunk.size))
+                yield chunk.gather(idx, columns, weights)
+
+    def sample(self, batch_size, rng=None, columns=DEFAULT_COLUMNS, **weights):
+        # Uniform sample (with replacement) over all transitions; only the touched pages are read
+        rng = rng if rng is not None else np.random.default_rng()
+        weights = self._weights(weights)
+        flat = rng.integers(len(self), size=batch_size)
+        owner = np.searchsorted(self.offsets, flat, side="right") - 1
+        parts = []
+        for i in np.unique(owner):
+            rows = flat[owner == i] - self.offsets[i]
+            order = np.argsort(rows)    # ascending reads from each memmap
+            parts.append(self.chunks[i].gather(rows[order], columns, weights))
+        return {c: np.concatenate([p[c] for p in parts]) for c in parts[0]}
+
+    def episode_returns(self, **weights):
+        # Undiscounted return of every complete episode, in recording order
+        weights = self._weights(weights) or {}
+        returns = []
+        for chunk in self.chunks:
+            idx = np.arange(chunk.size)
+            rewards = chunk.rewards(idx, **weights) if weights else chunk.columns["reward"][:chunk.size]
+            ends = np.flatnonzero(chunk.columns["terminated"][:chunk.size] | chunk.columns["truncated"][:chunk.size])
+            if ends.size:
+                # a trailing unfinished episode is left out
+                rewards = np.asarray(rewards[:ends[-1] + 1], dtype=np.float64)
+                returns.extend(np.add.reduceat(rewards, np.r_[0, ends[:-1] + 1]))
+        return np.asarray(returns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root", type=str)
+    parser.add_argument("--alpha", type=float)
+    parser.add_argument("--gamma", type=float)
+    parser.add_argument("--ped-weight", type=float)
+    parser.add_argument("--veh-weight", type=float)
+    args = parser.parse_args()
+
+    data = TransitionDataset(args.root)
+    meta = data.chunks[0].meta
+    print(f"📦 {len(data)} transitions in {len(data.chunks)} chunks under {args.root}")
+    print(f"   recorded with alpha={meta['alpha']} gamma={meta['gamma']} "
+          f"ped_weight={meta['ped_weight']} veh_weight={meta['veh_weight']}")
+    recorded = data.episode_returns()
+    print(f"🏁 {len(recorded)} episodes, mean return {recorded.mean():.1f}" if len(recorded) else "🏁 no complete episodes")
+    weights = {k: v for k, v in (("alpha", args.alpha), ("gamma", args.gamma),
+                                 ("ped_weight", args.ped_weight), ("veh_weight", args.veh_weight)) if v is not None}
+    if weights and len(recorded):
+        reweighted = data.episode_returns(**weights)
+        print(f"🔁 re-weighted {weights}: mean return {reweighted.mean():.1f}")